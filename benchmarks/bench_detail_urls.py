@@ -0,0 +1,58 @@
+"""
+Compare reversing the @id URLs of a 100 event page one by one with DetailURLBuilder.
+"""
+import time
+
+from rest_framework.request import Request
+from rest_framework.reverse import reverse
+from rest_framework.test import APIRequestFactory
+from rest_framework.versioning import URLPathVersioning
+
+from events.api import DetailURLBuilder
+
+N_EVENTS = 100
+ROUNDS = 20
+
+# the links of a single event with two keywords, audience, an image and two languages
+EVENT_LINKS = (
+    ("event-detail", "helsinki:agk4xbs2ra"),
+    ("place-detail", "tprek:7254"),
+    ("keyword-detail", "yso:p1235"),
+    ("keyword-detail", "yso:p11185"),
+    ("keyword-detail", "yso:p4354"),
+    ("image-detail", 12345),
+    ("language-detail", "fi"),
+    ("language-detail", "sv"),
+)
+
+
+def make_request():
+    request = Request(APIRequestFactory().get("/v1/event/"))
+    request.versioning_scheme = URLPathVersioning()
+    request.version = "v1"
+    return request
+
+
+def test_bench_detail_urls():
+    request = make_request()
+    links = EVENT_LINKS * N_EVENTS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        expected = [
+            reverse(name, kwargs={"pk": pk}, request=request) for name, pk in links
+        ]
+    reverse_time = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        # a new builder for every page, like for every request
+        builder = DetailURLBuilder(request)
+        built = [builder.build(name, pk) for name, pk in links]
+    builder_time = (time.perf_counter() - start) / ROUNDS
+
+    assert built == expected
+    print(
+        f"\n{len(links)} URLs per page: reverse {reverse_time * 1000:.1f} ms, "
+        f"DetailURLBuilder {builder_time * 1000:.1f} ms"
+    )
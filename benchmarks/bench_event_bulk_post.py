@@ -0,0 +1,77 @@
+"""
+Query count and wall time of a bulk POST of BENCH_BULK_EVENTS events (500 by
+default), each with offers, external links, keywords, audience and languages.
+
+The number of INSERT queries per related table is printed as well. Run the
+benchmark on an earlier commit to compare with the per-object writes.
+"""
+import os
+import time
+from collections import Counter
+from copy import deepcopy
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from events.models import Event, Offer
+from events.tests.utils import versioned_reverse as reverse
+
+N_EVENTS = int(os.environ.get("BENCH_BULK_EVENTS", 500))
+
+RELATED_TABLES = (
+    "events_offer",
+    "events_eventlink",
+    "events_event_keywords",
+    "events_event_audience",
+    "events_event_in_language",
+)
+
+
+def keyword_id(keyword):
+    return reverse("keyword-detail", kwargs={"pk": keyword.pk})
+
+
+def make_event_dicts(minimal_event_dict, audience_id, n_events):
+    fi = reverse("language-detail", kwargs={"pk": "fi"})
+    sv = reverse("language-detail", kwargs={"pk": "sv"})
+    event_dict = deepcopy(minimal_event_dict)
+    event_dict["offers"].append({"is_free": True, "price": {"fi": "0 €"}})
+    event_dict["external_links"] = [
+        {"name": "extlink", "link": "https://example.com/", "language": {"@id": fi}},
+    ]
+    event_dict["audience"] = [{"@id": audience_id}]
+    event_dict["in_language"] = [{"@id": fi}, {"@id": sv}]
+
+    event_dicts = []
+    for i in range(n_events):
+        event_dict = deepcopy(event_dict)
+        event_dict["name"] = {"fi": f"Tapahtuma {i}"}
+        event_dicts.append(event_dict)
+    return event_dicts
+
+
+@pytest.mark.django_db
+def test_bench_event_bulk_post(
+    api_client, minimal_event_dict, keyword, languages, user
+):
+    api_client.force_authenticate(user)
+    event_dicts = make_event_dicts(minimal_event_dict, keyword_id(keyword), N_EVENTS)
+
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(reverse("event-list"), event_dicts, format="json")
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 201, str(response.content)
+    assert Event.objects.count() == N_EVENTS
+    assert Offer.objects.count() == 2 * N_EVENTS
+
+    inserts = Counter()
+    for query in queries:
+        for table in RELATED_TABLES:
+            if query["sql"].startswith(f'INSERT INTO "{table}"'):
+                inserts[table] += 1
+    print(f"\n{N_EVENTS} events: {len(queries)} queries, {elapsed:.2f}s")
+    for table in RELATED_TABLES:
+        print(f"  INSERT INTO {table}: {inserts[table]}")
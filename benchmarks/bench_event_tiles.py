@@ -0,0 +1,117 @@
+"""
+Map viewport queries of the event list.
+
+Seeds BENCH_PLACES places (5000 by default) with an event each, spread over
+a 20 km square, and prints the wall time of resolving the places of shifted
+viewports with the cached tiles compared to the spatial query, and the wall
+time of the bbox filtered event list and of the tile counts endpoint.
+"""
+import os
+import random
+import time
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.contrib.gis.geos import Point, Polygon
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event, Place
+from events.tests.utils import versioned_reverse as reverse
+from events.tiles import places_within
+
+N_PLACES = int(os.environ.get("BENCH_PLACES", 5000))
+N_VIEWPORTS = 50
+ORIGIN = (380000, 6665000)
+AREA_SIZE = 20000
+VIEWPORT_SIZE = 3000
+
+
+def seed(data_source, organization, n_places):
+    rnd = random.Random(0)
+    places = Place.objects.bulk_create(
+        Place(
+            id=f"bench:place-{i}",
+            data_source=data_source,
+            publisher=organization,
+            name_fi=f"Paikka {i}",
+            position=Point(
+                ORIGIN[0] + rnd.uniform(0, AREA_SIZE),
+                ORIGIN[1] + rnd.uniform(0, AREA_SIZE),
+                srid=settings.PROJECTION_SRID,
+            ),
+            lft=1,
+            rght=2,
+            tree_id=i,
+            level=0,
+        )
+        for i in range(n_places)
+    )
+    now = timezone.now()
+    Event.objects.bulk_create(
+        Event(
+            id=f"bench:event-{i}",
+            data_source=data_source,
+            publisher=organization,
+            name_fi=f"Tapahtuma {i}",
+            location=place,
+            start_time=now + timedelta(days=i % 30),
+            end_time=now + timedelta(days=i % 30, hours=2),
+            lft=1,
+            rght=2,
+            tree_id=i,
+            level=0,
+        )
+        for i, place in enumerate(places)
+    )
+
+
+def viewports():
+    # a map panned a bit at a time
+    for i in range(N_VIEWPORTS):
+        x = ORIGIN[0] + 5000 + i * 37
+        y = ORIGIN[1] + 5000 + i * 23
+        yield (x, y, x + VIEWPORT_SIZE, y + VIEWPORT_SIZE)
+
+
+def to_polygon(bbox):
+    polygon = Polygon.from_bbox(bbox)
+    polygon.srid = settings.PROJECTION_SRID
+    return polygon
+
+
+@pytest.mark.django_db
+def test_bench_event_tiles(locmem_cache, data_source, organization):
+    seed(data_source, organization, N_PLACES)
+    client = APIClient()
+
+    start = time.perf_counter()
+    for bbox in viewports():
+        list(Place.geo_objects.filter(position__within=to_polygon(bbox)))
+    elapsed = (time.perf_counter() - start) / N_VIEWPORTS
+    print(f"\nspatial query: {elapsed * 1000:.2f}ms per viewport")
+
+    start = time.perf_counter()
+    for bbox in viewports():
+        places_within(to_polygon(bbox))
+    elapsed = (time.perf_counter() - start) / N_VIEWPORTS
+    print(f"cached tiles: {elapsed * 1000:.2f}ms per viewport")
+
+    for name, url in (
+        ("event-list", reverse("event-list")),
+        ("event-tiles", reverse("event-tiles")),
+    ):
+        start = time.perf_counter()
+        for bbox in viewports():
+            response = client.get(
+                url,
+                {
+                    "srid": settings.PROJECTION_SRID,
+                    "bbox": ",".join(str(value) for value in bbox),
+                },
+                format="json",
+            )
+            assert response.status_code == 200
+        elapsed = (time.perf_counter() - start) / N_VIEWPORTS
+        print(f"{name}: {elapsed * 1000:.2f}ms per viewport")
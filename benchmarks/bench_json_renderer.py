@@ -0,0 +1,69 @@
+"""
+Compare rendering a LargeResultsSetPagination sized event page with the DRF
+JSON renderer and the ujson based events.renderers.JSONRenderer.
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from rest_framework import renderers
+
+from events.api_pagination import LargeResultsSetPagination
+from events.renderers import JSONRenderer
+
+ROUNDS = 10
+
+
+def make_event(i):
+    """An event shaped like the EventSerializer output, with a few non-JSON types."""
+    translated = OrderedDict(fi=f"Tapahtuma {i}", sv=f"Evenemang {i}", en=None)
+    return OrderedDict(
+        [
+            ("id", f"helsinki:{i}"),
+            ("@id", f"https://api.hel.fi/linkedevents/v1/event/helsinki:{i}/"),
+            ("@type", "Event"),
+            (
+                "location",
+                {"@id": "https://api.hel.fi/linkedevents/v1/place/tprek:7254/"},
+            ),
+            (
+                "keywords",
+                [
+                    {"@id": f"https://api.hel.fi/linkedevents/v1/keyword/yso:p{k}/"}
+                    for k in range(5)
+                ],
+            ),
+            ("name", translated),
+            ("description", OrderedDict(fi="<p>Kuvaus</p>" * 20, sv=None, en=None)),
+            ("start_time", datetime(2023, 1, 1, 12, tzinfo=timezone.utc)),
+            ("end_time", "2023-01-01T14:00:00Z"),
+            ("offers", [OrderedDict(is_free=True, price=None, info_url=None)]),
+            ("sub_events", []),
+            ("in_language", []),
+            ("super_event_type", None),
+            ("data_source", "helsinki"),
+        ]
+    )
+
+
+def time_render(renderer, data):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        content = renderer.render(data)
+    return content, (time.perf_counter() - start) / ROUNDS
+
+
+def test_bench_json_renderer():
+    page = {
+        "meta": {"count": 100000, "next": None, "previous": None},
+        "data": [make_event(i) for i in range(LargeResultsSetPagination.page_size)],
+    }
+
+    expected, drf_time = time_render(renderers.JSONRenderer(), page)
+    content, ujson_time = time_render(JSONRenderer(), page)
+
+    assert content == expected
+    print(
+        f"\n{len(page['data'])} events, {len(content) // 1024} kB: "
+        f"DRF renderer {drf_time * 1000:.1f} ms, ujson renderer {ujson_time * 1000:.1f} ms"
+    )
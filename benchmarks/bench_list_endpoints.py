@@ -0,0 +1,91 @@
+"""
+Wall time budgets for the list endpoints.
+
+Seeds a realistic amount of data once per module (BENCH_EVENTS events, 2000 by
+default) and checks that each list endpoint and include combination stays
+within a wall time budget. The query budgets and the query plans of the same
+queries are checked by events/tests/test_list_query_budgets.py, which is part
+of the normal test run.
+"""
+import os
+import time
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from events.tests.test_list_query_budgets import COMMON_EVENT_QUERY, seed
+from events.tests.utils import versioned_reverse as reverse
+
+N_EVENTS = int(os.environ.get("BENCH_EVENTS", 2000))
+
+
+@pytest.fixture(scope="module")
+def seeded_db(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            seed(N_EVENTS)
+            yield
+            transaction.set_rollback(True)
+
+
+# (url name, query string, wall time budget in seconds)
+LIST_BUDGETS = [
+    ("event-list", "", 2),
+    ("event-list", "page_size=100", 4),
+    ("event-list", "include=location", 4),
+    ("event-list", "include=keywords,audience", 4),
+    ("event-list", "include=sub_events", 6),
+    ("event-list", "include=location,keywords,audience,in_language,sub_events", 8),
+    ("event-list", "super_event_type=recurring&page_size=100", 4),
+    ("event-list", "keyword=bench:kw-1,bench:kw-2&page_size=100", 4),
+    ("event-list", "keyword_AND=bench:kw-1,bench:kw-2&page_size=100", 4),
+    ("event-list", "keyword!=bench:kw-1&page_size=100", 4),
+    ("event-list", "is_free=true&in_language=fi,sv&page_size=100", 4),
+    ("event-list", COMMON_EVENT_QUERY, 4),
+    ("place-list", "", 1),
+    ("place-list", "show_all_places=true&page_size=100", 2),
+    ("keyword-list", "", 1),
+    ("keyword-list", "show_all_keywords=true&page_size=100", 2),
+    ("image-list", "page_size=100", 2),
+    ("organization-list", "", 1),
+    ("registration-list", "", 2),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name,query,max_seconds", LIST_BUDGETS)
+def test_bench_list_endpoint_budget(seeded_db, url_name, query, max_seconds):
+    url = reverse(url_name)
+    if query:
+        url += "?" + query
+    client = APIClient()
+
+    start = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, format="json")
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    print(f"\n{url}: {len(queries)} queries, {elapsed:.3f}s")
+    assert elapsed <= max_seconds
+
+
+@pytest.mark.django_db
+def test_bench_event_list_query_plan(seeded_db):
+    """Print the plan of the most common event list query"""
+    url = reverse("event-list") + "?" + COMMON_EVENT_QUERY
+    with CaptureQueriesContext(connection) as queries:
+        response = APIClient().get(url, format="json")
+    assert response.status_code == 200
+
+    sql = next(
+        q["sql"] for q in queries if q["sql"].startswith('SELECT "events_event"')
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN ANALYZE " + sql)
+        plan = [line for (line,) in cursor.fetchall()]
+    print(f"\n{url}: {response.data['meta']['count']} events")
+    for line in plan:
+        print(f"  {line}")
@@ -0,0 +1,65 @@
+"""
+Compare the ongoing events index with scanning every cached event string with
+the fuzzy regex, as the `*_ongoing_AND/OR` filters used to do.
+"""
+import random
+import time
+
+import pytest
+
+from events.ongoing_events import _terms_to_regex, OngoingEventIndex
+
+WORDS = (
+    "konsertti musiikki teatteri lapset perhe näyttely taide kirjasto liikunta "
+    "jazz rock klassinen ooppera tanssi elokuva työpaja luento kurssi ulkoilu "
+    "helsinki kallio kamppi itäkeskus malmi vuosaari kulttuuritalo stoa annantalo "
+    "ilmainen maksullinen suomi ruotsi englanti opastus kierros festivaali"
+).split()
+
+QUERIES = (
+    ("konsertti", "OR"),
+    ("teatteri,tanssi,ooppera", "OR"),
+    ("lapset,perhe", "AND"),
+    ("musikki", "OR"),
+)
+
+
+def make_event_strings(n_events, seed=0):
+    rnd = random.Random(seed)
+    # make the vocabulary grow with the number of events like real descriptions do
+    vocabulary = WORDS + [
+        "".join(rnd.choice("abdeghijklmnoprstuvyäö") for _ in range(rnd.randint(4, 12)))
+        for _ in range(n_events // 2)
+    ]
+    return {
+        f"bench:{i}": " ".join(rnd.choice(vocabulary) for _ in range(150))
+        for i in range(n_events)
+    }
+
+
+def regex_scan(event_strings, terms, operator):
+    rc = _terms_to_regex(terms, operator)
+    return {k for k, v in event_strings.items() if rc.search(v, concurrent=True)}
+
+
+@pytest.mark.parametrize("n_events", [10_000, 100_000])
+def test_bench_ongoing_events_index(n_events):
+    event_strings = make_event_strings(n_events)
+
+    start = time.perf_counter()
+    index = OngoingEventIndex(event_strings)
+    print(f"\n{n_events} events, index built in {time.perf_counter() - start:.2f}s")
+
+    for terms, operator in QUERIES:
+        start = time.perf_counter()
+        expected = regex_scan(event_strings, terms, operator)
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = index.search(terms, operator)
+        index_time = time.perf_counter() - start
+
+        print(
+            f"{operator} {terms!r}: regex scan {scan_time:.3f}s, index {index_time:.3f}s, "
+            f"{len(found)} / {len(expected)} events"
+        )
@@ -0,0 +1,133 @@
+"""
+Place divisions and the division filter.
+
+Imports BENCH_UNITS (2000 by default) tprek units, served from memory instead
+of the service map API, into a grid of neighborhoods, and prints the time
+taken by the import and by updating the divisions of all the places one
+place at a time compared to one spatial join. Then prints the wall time of
+?division=kamppi,kallio event list queries, the first one resolving the
+division names.
+"""
+import os
+import random
+import time
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.utils import timezone
+from munigeo.models import (
+    AdministrativeDivision,
+    AdministrativeDivisionGeometry,
+    AdministrativeDivisionType,
+)
+from rest_framework.test import APIClient
+
+from events.importer.tprek import TprekImporter
+from events.models import Event, Place, update_place_divisions
+from events.tests.utils import versioned_reverse as reverse
+
+N_UNITS = int(os.environ.get("BENCH_UNITS", 2000))
+N_EVENTS = 1000
+N_REQUESTS = 20
+# a grid of 1 km neighborhoods around central Helsinki, in ETRS-TM35FIN
+GRID_ORIGIN = (380000, 6665000)
+GRID_SIZE = 20
+CELL_SIZE = 1000
+NAMES = {(5, 7): "Kamppi", (8, 10): "Kallio"}
+
+
+def seed_divisions():
+    division_type = AdministrativeDivisionType.objects.create(type="neighborhood")
+    for i in range(GRID_SIZE):
+        for j in range(GRID_SIZE):
+            division = AdministrativeDivision.objects.create(
+                type=division_type, ocd_id=f"ocd-division/bench:{i}-{j}"
+            )
+            division.set_current_language("fi")
+            division.name = NAMES.get((i, j), f"Alue {i}-{j}")
+            division.save()
+            x, y = GRID_ORIGIN[0] + i * CELL_SIZE, GRID_ORIGIN[1] + j * CELL_SIZE
+            AdministrativeDivisionGeometry.objects.create(
+                division=division,
+                boundary=MultiPolygon(
+                    Polygon.from_bbox((x, y, x + CELL_SIZE, y + CELL_SIZE)),
+                    srid=settings.PROJECTION_SRID,
+                ),
+            )
+
+
+def make_units(n_units):
+    rnd = random.Random(0)
+    units = []
+    for i in range(n_units):
+        position = Point(
+            GRID_ORIGIN[0] + rnd.uniform(0, GRID_SIZE * CELL_SIZE),
+            GRID_ORIGIN[1] + rnd.uniform(0, GRID_SIZE * CELL_SIZE),
+            srid=settings.PROJECTION_SRID,
+        )
+        position.transform(settings.WGS84_SRID)
+        units.append(
+            {
+                "id": i,
+                "name_fi": f"Toimipiste {i}",
+                "street_address_fi": f"Katu {i}",
+                "address_city_fi": "Helsinki",
+                "latitude": position.y,
+                "longitude": position.x,
+            }
+        )
+    return units
+
+
+@pytest.mark.django_db
+def test_bench_place_divisions(monkeypatch):
+    seed_divisions()
+    units = make_units(N_UNITS)
+    monkeypatch.setattr(TprekImporter, "pk_get", lambda self, *args: units)
+    importer = TprekImporter({"cached": False, "single": None, "remap": False})
+
+    start = time.perf_counter()
+    importer.import_places()
+    elapsed = time.perf_counter() - start
+    place_ids = list(Place.objects.values_list("id", flat=True))
+    n_memberships = Place.divisions.through.objects.count()
+    print(f"\ntprek import of {len(place_ids)} places: {elapsed:.2f}s")
+    print(f"{n_memberships} place divisions")
+
+    start = time.perf_counter()
+    for place_id in place_ids:
+        update_place_divisions([place_id])
+    print(f"divisions one place at a time: {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    update_place_divisions(place_ids)
+    print(f"divisions with one spatial join: {time.perf_counter() - start:.2f}s")
+    assert Place.divisions.through.objects.count() == n_memberships
+
+    now = timezone.now()
+    data_source = importer.data_source
+    for i in range(N_EVENTS):
+        Event.objects.create(
+            id=f"bench:event-{i}",
+            name_fi=f"Tapahtuma {i}",
+            location_id=place_ids[i % len(place_ids)],
+            start_time=now + timedelta(days=i % 30),
+            end_time=now + timedelta(days=i % 30, hours=2),
+            data_source=data_source,
+            publisher=importer.organization,
+        )
+
+    client = APIClient()
+    url = reverse("event-list") + "?division=kamppi,kallio"
+    timings = []
+    for _ in range(N_REQUESTS):
+        start = time.perf_counter()
+        response = client.get(url, format="json")
+        timings.append(time.perf_counter() - start)
+        assert response.status_code == 200
+    print(
+        f"{url}: {response.data['meta']['count']} events, "
+        f"first {timings[0] * 1000:.1f}ms, "
+        f"then {sum(timings[1:]) / (N_REQUESTS - 1) * 1000:.1f}ms"
+    )
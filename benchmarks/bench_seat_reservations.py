@@ -0,0 +1,86 @@
+"""
+Seat reservations of a registration with BENCH_RESERVATIONS (100k by default)
+historical reservations.
+
+Prints the wall time of reserving seats before and after the expired
+reservations are deleted with the delete_expired_reservations command, the
+time taken by the command and the query plan of the availability aggregate.
+"""
+import os
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import (
+    DateTimeField,
+    DurationField,
+    ExpressionWrapper,
+    F,
+    Sum,
+    Value,
+)
+from django.utils import timezone
+
+from events.tests.utils import versioned_reverse as reverse
+from registrations.models import SeatReservationCode
+
+N_RESERVATIONS = int(os.environ.get("BENCH_RESERVATIONS", 100000))
+N_REQUESTS = 50
+
+
+def seed_reservations(registration, n_reservations):
+    SeatReservationCode.objects.bulk_create(
+        SeatReservationCode(registration=registration, seats=1)
+        for _ in range(n_reservations)
+    )
+    # spread the reservations over the past, one every minute
+    SeatReservationCode.objects.update(
+        timestamp=ExpressionWrapper(
+            Value(timezone.now())
+            - ExpressionWrapper(
+                F("id") * timedelta(minutes=1), output_field=DurationField()
+            ),
+            output_field=DateTimeField(),
+        )
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE registrations_seatreservationcode")
+
+
+def time_reservations(api_client, registration):
+    url = reverse("registration-reserve-seats", kwargs={"pk": registration.id})
+    start = time.perf_counter()
+    for _ in range(N_REQUESTS):
+        response = api_client.post(url, {"seats": 1, "waitlist": True}, format="json")
+        assert response.status_code == 201, str(response.content)
+    return (time.perf_counter() - start) / N_REQUESTS * 1000
+
+
+@pytest.mark.django_db
+def test_bench_seat_reservations(api_client, registration):
+    registration.maximum_attendee_capacity = None
+    registration.waiting_list_capacity = None
+    registration.save()
+    seed_reservations(registration, N_RESERVATIONS)
+
+    live = SeatReservationCode.objects.live().filter(registration=registration)
+    live_seats = live.aggregate(seats=Sum("seats"))["seats"]
+    print(f"\n{N_RESERVATIONS} reservations, {live_seats} live seats")
+    with connection.cursor() as cursor:
+        query = live.values("registration").annotate(Sum("seats")).query
+        sql, params = query.sql_with_params()
+        cursor.execute("EXPLAIN " + sql, params)
+        for (line,) in cursor.fetchall():
+            print(f"  {line}")
+
+    print(f"reserve_seats: {time_reservations(api_client, registration):.2f}ms")
+
+    start = time.perf_counter()
+    call_command("delete_expired_reservations")
+    elapsed = time.perf_counter() - start
+    print(f"delete_expired_reservations: {elapsed:.2f}s")
+    print(f"{SeatReservationCode.objects.count()} reservations left")
+
+    print(f"reserve_seats: {time_reservations(api_client, registration):.2f}ms")
@@ -0,0 +1,2 @@
+from events.tests.conftest import *  # noqa
+from linkedevents.tests.conftest import *  # noqa
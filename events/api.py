@@ -3,13 +3,16 @@ import re
 import struct
 import time
 import urllib.parse
+from collections import defaultdict
 from copy import deepcopy
 from datetime import datetime
 from datetime import time as datetime_time
 from datetime import timedelta
 from functools import partial, reduce
+from itertools import islice
 from operator import or_
 from typing import Iterable, Optional
+from urllib.parse import quote
 
 import bleach
 import django.forms
@@ -18,20 +21,19 @@ import pytz
 import regex
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from django.contrib.gis.geos import Point
-from django.contrib.gis.measure import D
+from django.contrib.gis.geos import Point, Polygon
 from django.contrib.postgres.search import SearchQuery, TrigramSimilarity
-from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from django.db.models import Count, F, Prefetch, Q
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q, Subquery
 from django.db.models.functions import Greatest
 from django.db.transaction import atomic
 from django.db.utils import IntegrityError
-from django.http import Http404, HttpResponsePermanentRedirect
+from django.http import Http404, HttpResponsePermanentRedirect, StreamingHttpResponse
 from django.urls import NoReverseMatch
 from django.utils import timezone, translation
 from django.utils.encoding import force_text
 from django.utils.functional import cached_property
+from django.utils.http import RFC3986_SUBDELIMS
 from django.utils.translation import gettext_lazy as _
 from django_orghierarchy.models import Organization, OrganizationClass
 from haystack.query import AutoQuery
@@ -56,6 +58,7 @@ from rest_framework import (
     status,
     viewsets,
 )
+from rest_framework.decorators import action
 from rest_framework.exceptions import APIException, ParseError
 from rest_framework.exceptions import PermissionDenied as DRFPermissionDenied
 from rest_framework.fields import DateTimeField
@@ -63,6 +66,7 @@ from rest_framework.filters import BaseFilterBackend
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_bulk import (
     BulkListSerializer,
     BulkModelViewSet,
@@ -70,17 +74,22 @@ from rest_framework_bulk import (
 )
 
 from events import utils
-from events.api_pagination import LargeResultsSetPagination
+from events.api_pagination import EventPagination, LargeResultsSetPagination
 from events.auth import ApiKeyAuth, ApiKeyUser
 from events.custom_elasticsearch_search_backend import (
     CustomEsSearchQuerySet as SearchQuerySet,
 )
+from events.divisions import parse_division_filter, resolve_division_ids
 from events.extensions import apply_select_and_prefetch, get_extensions_from_request
+from events.keywords import resolve_keyword_ids
 from events.models import (
     DataSource,
     Event,
+    event_save_batch,
+    EventKeywordMembership,
     EventLink,
     Feedback,
+    get_event_save_batch,
     Image,
     Keyword,
     KeywordSet,
@@ -92,12 +101,27 @@ from events.models import (
     PublicationStatus,
     Video,
 )
+from events.ongoing_events import (
+    get_ongoing_indexes,
+    INTERNET_INDEX_CACHE_KEY,
+    LOCAL_INDEX_CACHE_KEY,
+    search_ongoing_events,
+)
 from events.permissions import (
     DataSourceOrganizationEditPermission,
     DataSourceResourceEditPermission,
     GuestPost,
 )
-from events.renderers import DOCXRenderer
+from events.renderers import DOCXRenderer, NDJSONRenderer
+from events.response_cache import bump_generation, ResponseCacheMixin
+from events.tiles import (
+    count_events_by_tile,
+    get_tile_extent,
+    MIN_TILE_SIZE,
+    places_within,
+    places_within_distance,
+    TILE_SIZE,
+)
 from events.translation import (
     EventTranslationOptions,
     ImageTranslationOptions,
@@ -315,6 +339,49 @@ def organization_can_be_edited_by(instance, user):
         return False
 
 
+class DetailURLBuilder:
+    """
+    Builds detail view URLs without resolving the URL pattern for every object.
+
+    The URL of each view name is reversed once with a placeholder primary key,
+    and the URLs of the objects are formatted from that template. Get the
+    builder of a request with get_detail_url_builder.
+    """
+
+    pk_placeholder = "__pk__"
+    # the primary key pattern of the router detail routes
+    pk_regex = re.compile(r"[^/.]+")
+    # characters left unquoted by django.urls.reverse
+    safe_characters = RFC3986_SUBDELIMS + "/~:@"
+
+    def __init__(self, request):
+        self.request = request
+        self.templates = {}
+
+    def get_template(self, view_name):
+        if view_name not in self.templates:
+            self.templates[view_name] = reverse(
+                view_name, kwargs={"pk": self.pk_placeholder}, request=self.request
+            )
+        return self.templates[view_name]
+
+    def build(self, view_name, pk):
+        pk = str(pk)
+        if not self.pk_regex.fullmatch(pk):
+            # let reverse raise NoReverseMatch for a primary key not matching the route
+            return reverse(view_name, kwargs={"pk": pk}, request=self.request)
+        return self.get_template(view_name).replace(
+            self.pk_placeholder, quote(pk, safe=self.safe_characters)
+        )
+
+
+def get_detail_url_builder(request):
+    builder = getattr(request, "_detail_url_builder", None)
+    if builder is None:
+        builder = request._detail_url_builder = DetailURLBuilder(request)
+    return builder
+
+
 class JSONLDRelatedField(relations.HyperlinkedRelatedField):
     """
     Support of showing and saving of expanded JSON nesting or just a resource
@@ -340,22 +407,22 @@ class JSONLDRelatedField(relations.HyperlinkedRelatedField):
         else:
             return True
 
+    def get_url(self, obj, view_name, request, format):
+        if request is None or format or self.lookup_url_kwarg != "pk":
+            return super().get_url(obj, view_name, request, format)
+        # Unsaved objects will not yet have a valid URL.
+        if hasattr(obj, "pk") and obj.pk in (None, ""):
+            return None
+        return get_detail_url_builder(request).build(
+            view_name, getattr(obj, self.lookup_field)
+        )
+
     def to_representation(self, obj):
         if isinstance(self.related_serializer, str):
             self.related_serializer = globals().get(self.related_serializer, None)
 
         if self.is_expanded():
-            context = self.context.copy()
-            # To avoid infinite recursion, only include sub/super events one level at a time
-            if "include" in context:
-                context["include"] = [
-                    x
-                    for x in context["include"]
-                    if x != "sub_events" and x != "super_event" and x != "registration"
-                ]
-            return self.related_serializer(
-                obj, hide_ld_context=self.hide_ld_context, context=context
-            ).data
+            return self.get_expanded_serializer(obj).to_representation(obj)
         link = super().to_representation(obj)
         if link is None:
             return None
@@ -380,6 +447,22 @@ class JSONLDRelatedField(relations.HyperlinkedRelatedField):
     def is_expanded(self):
         return getattr(self, "expanded", False)
 
+    def get_expanded_serializer(self, obj):
+        # Building a serializer is expensive, so the same serializer is used for all the related objects
+        if getattr(self, "_expanded_serializer", None) is None:
+            context = self.context.copy()
+            # To avoid infinite recursion, only include sub/super events one level at a time
+            if "include" in context:
+                context["include"] = [
+                    x
+                    for x in context["include"]
+                    if x != "sub_events" and x != "super_event" and x != "registration"
+                ]
+            self._expanded_serializer = self.related_serializer(
+                obj, hide_ld_context=self.hide_ld_context, context=context
+            )
+        return self._expanded_serializer
+
     def get_queryset(self):
         #  For certain related fields we preload the queryset to avoid *.objects.all() query which can easily overload
         #  the memory as database grows.
@@ -462,10 +545,19 @@ class TranslatedModelSerializer(serializers.ModelSerializer):
             trans_opts = translator.get_options_for_model(model)
         except NotRegistered:
             self.translated_fields = []
+            self.translated_field_keys = ()
             return
 
         self.translated_fields = trans_opts.fields.keys()
         lang_codes = utils.get_fixed_lang_codes()
+        # the model attributes of each translated field, computed once per serializer
+        self.translated_field_keys = tuple(
+            (
+                field_name,
+                tuple((lang, "%s_%s" % (field_name, lang)) for lang in lang_codes),
+            )
+            for field_name in self.translated_fields
+        )
         # Remove the pre-existing data in the bundle.
         for field_name in self.translated_fields:
             for lang in lang_codes:
@@ -537,10 +629,9 @@ class TranslatedModelSerializer(serializers.ModelSerializer):
         return data
 
     def translated_fields_to_representation(self, obj, ret):
-        for field_name in self.translated_fields:
+        for field_name, keys in self.translated_field_keys:
             d = {}
-            for lang in utils.get_fixed_lang_codes():
-                key = "%s_%s" % (field_name, lang)
+            for lang, key in keys:
                 val = getattr(obj, key, None)
                 if val is None:
                     continue
@@ -637,13 +728,25 @@ class LinkedEventsSerializer(TranslatedModelSerializer, MPTTModelSerializer):
         Renderer is the right place for this but now loop is done just once.
         Reversal conversion is done in parser.
         """
+        # display non-public fields if 1) obj has publisher org and 2) user belongs to the same org tree
+        # never modify self.skip_fields, as it survives multiple calls in the serializer across objects
+        obj_skip_fields = self.skip_fields
+        if (
+            self.user
+            and hasattr(obj, "publisher")
+            and obj.publisher
+            and obj.publisher.tree_id in self.admin_tree_ids
+        ):
+            obj_skip_fields = set(self.skip_fields) - set(
+                self.only_admin_visible_fields
+            )
+        # skipped fields are not serialized at all, see _readable_fields
+        self._obj_skip_fields = obj_skip_fields
         ret = super().to_representation(obj)
         if "id" in ret and "request" in self.context:
             try:
-                ret["@id"] = reverse(
-                    self.view_name,
-                    kwargs={"pk": ret["id"]},
-                    request=self.context["request"],
+                ret["@id"] = get_detail_url_builder(self.context["request"]).build(
+                    self.view_name, ret["id"]
                 )
             except NoReverseMatch:
                 ret["@id"] = str(ret["id"])
@@ -667,22 +770,19 @@ class LinkedEventsSerializer(TranslatedModelSerializer, MPTTModelSerializer):
             ret["@type"] = obj.jsonld_type
         else:
             ret["@type"] = obj.__class__.__name__
-        # display non-public fields if 1) obj has publisher org and 2) user belongs to the same org tree
-        # never modify self.skip_fields, as it survives multiple calls in the serializer across objects
-        obj_skip_fields = set(self.skip_fields)
-        if (
-            self.user
-            and hasattr(obj, "publisher")
-            and obj.publisher
-            and obj.publisher.tree_id in self.admin_tree_ids
-        ):
-            for field in self.only_admin_visible_fields:
-                obj_skip_fields.remove(field)
+        # translated fields are added to the representation regardless of _readable_fields
         for field in obj_skip_fields:
             if field in ret:
                 del ret[field]
         return ret
 
+    @property
+    def _readable_fields(self):
+        skip_fields = getattr(self, "_obj_skip_fields", ())
+        for field in super()._readable_fields:
+            if field.field_name not in skip_fields:
+                yield field
+
     def validate_data_source(self, value):
         # a single POST always comes from a single source
         data_source = self.context["data_source"]
@@ -824,6 +924,18 @@ class JSONAPIViewMixin(object):
         context.setdefault("skip_fields", set()).add("origin_id")
         return context
 
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self._serializer_start_time = time.perf_counter()
+        return page
+
+    def get_paginated_response(self, data):
+        # the page has been serialized in between, see QueryProfilingMiddleware
+        start = getattr(self, "_serializer_start_time", None)
+        if start is not None:
+            self.request._request.serializer_time = time.perf_counter() - start
+        return super().get_paginated_response(data)
+
 
 class EditableLinkedEventsObjectSerializer(LinkedEventsSerializer):
     def create(self, validated_data):
@@ -931,6 +1043,7 @@ class KeywordSerializer(EditableLinkedEventsObjectSerializer):
 
 
 class KeywordViewSet(
+    ResponseCacheMixin,
     UserDataSourceAndOrganizationMixin,
     JSONAPIViewMixin,
     mixins.RetrieveModelMixin,
@@ -942,6 +1055,7 @@ class KeywordViewSet(
     queryset = queryset.select_related("publisher")
     serializer_class = KeywordSerializer
     permission_classes = (DataSourceResourceEditPermission,)
+    response_cache_resources = ("keyword", "image")
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -972,6 +1086,7 @@ class KeywordDeprecatedException(APIException):
 
 
 class KeywordListViewSet(
+    ResponseCacheMixin,
     UserDataSourceAndOrganizationMixin,
     JSONAPIViewMixin,
     mixins.ListModelMixin,
@@ -982,6 +1097,7 @@ class KeywordListViewSet(
     queryset = queryset.select_related("publisher").prefetch_related("alt_labels__name")
     serializer_class = KeywordSerializer
     filter_backends = (filters.OrderingFilter,)
+    response_cache_resources = ("keyword", "image")
     ordering_fields = ("n_events", "id", "name", "data_source")
     ordering = ("-data_source", "-n_events", "name")
     permission_classes = (DataSourceResourceEditPermission,)
@@ -1211,34 +1327,22 @@ def filter_division(queryset, name: str, value: Iterable[str]):
 
     """
 
-    ocd_ids = []
-    names = []
-    for item in value:
-        if ":" in item:
-            # we have a munigeo division
-            if hasattr(settings, "MUNIGEO_MUNI") and hasattr(
-                settings, "MUNIGEO_COUNTRY"
-            ):
-                # append ocd path if we have deployment information
-                if not item.startswith("ocd-division"):
-                    if not item.startswith("country"):
-                        if not item.startswith("kunta"):
-                            item = settings.MUNIGEO_MUNI + "/" + item
-                        item = settings.MUNIGEO_COUNTRY + "/" + item
-                    item = "ocd-division/" + item
-            ocd_ids.append(item)
-        else:
-            # we assume human name
-            names.append(item.title())
     if hasattr(queryset, "distinct"):
-        # do the join with Q objects (not querysets) in case the queryset has extra fields that would crash qs join
-        query = Q(**{name + "__ocd_id__in": ocd_ids}) | Q(
-            **{name + "__translations__name__in": names}
-        )
-        return (
-            queryset.filter(query).prefetch_related(name + "__translations").distinct()
+        # match the places of the divisions with a subquery, so that places in several
+        # matching divisions do not duplicate the rows
+        division_ids = resolve_division_ids(value)
+        if not division_ids:
+            return queryset.none()
+        place_ids = Place.divisions.through.objects.filter(
+            administrativedivision_id__in=division_ids
+        ).values("place_id")
+        place = name.rpartition("__")[0]
+        lookup = place + "__id__in" if place else "id__in"
+        return queryset.filter(**{lookup: place_ids}).prefetch_related(
+            name + "__translations"
         )
     else:
+        ocd_ids, names = parse_division_filter(value)
         # Haystack SearchQuerySet does not support distinct, so we only support one type of search at a time:
         if ocd_ids:
             return queryset.filter(**{name + "__ocd_id__in": ocd_ids})
@@ -1318,6 +1422,7 @@ class PlaceFilter(django_filters.rest_framework.FilterSet):
 
 
 class PlaceRetrieveViewSet(
+    ResponseCacheMixin,
     UserDataSourceAndOrganizationMixin,
     JSONAPIViewMixin,
     GeoModelAPIView,
@@ -1330,6 +1435,7 @@ class PlaceRetrieveViewSet(
     queryset = queryset.select_related("publisher")
     serializer_class = PlaceSerializer
     permission_classes = (DataSourceResourceEditPermission,)
+    response_cache_resources = ("place", "image")
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -1365,6 +1471,7 @@ class PlaceDeletedException(APIException):
 
 
 class PlaceListViewSet(
+    ResponseCacheMixin,
     UserDataSourceAndOrganizationMixin,
     GeoModelAPIView,
     JSONAPIViewMixin,
@@ -1374,6 +1481,7 @@ class PlaceListViewSet(
 ):
     queryset = Place.objects.none()
     serializer_class = PlaceSerializer
+    response_cache_resources = ("place", "image")
     filter_backends = (
         django_filters.rest_framework.DjangoFilterBackend,
         filters.OrderingFilter,
@@ -1972,6 +2080,178 @@ class RegistrationSerializer(LinkedEventsSerializer, RegistrationBaseSerializer)
         return data
 
 
+class EventRelationWriter:
+    """
+    Write the offers, external links, videos, keywords, audience and languages
+    of saved events with bulk queries.
+
+    The relations of all the events saved in a request are collected and
+    written at once. Child rows are only rewritten from the first changed row
+    onwards, keeping their order, and only the changed many-to-many rows are
+    added or removed.
+    """
+
+    child_models = (
+        ("offers", Offer),
+        ("external_links", EventLink),
+        ("videos", Video),
+    )
+    m2m_fields = ("keywords", "audience", "in_language")
+
+    def __init__(self):
+        self.children = {name: {} for name, _model in self.child_models}
+        self.m2m = {name: {} for name in self.m2m_fields}
+        self.created_ids = set()
+        self.events = []
+
+    def add(self, event, relations, created=False):
+        """
+        :param relations: dict of relation name to the validated list of
+            related objects, or None for the relations not to change
+        """
+        if created:
+            self.created_ids.add(event.pk)
+        self.events.append(event)
+        for name, value in relations.items():
+            if value is None:
+                continue
+            if name in self.children:
+                self.children[name][event.pk] = value
+            else:
+                self.m2m[name][event.pk] = value
+
+    def _write_children(self, model, items_by_event):
+        if not items_by_event:
+            return False
+        fields = [
+            field.attname
+            for field in model._meta.concrete_fields
+            if not field.primary_key and field.name != "event"
+        ]
+
+        def values(row):
+            return [getattr(row, field) for field in fields]
+
+        existing = defaultdict(list)
+        for row in model.objects.filter(
+            event_id__in=items_by_event.keys() - self.created_ids
+        ).order_by("pk"):
+            existing[row.event_id].append(row)
+
+        stale_ids = []
+        new_rows = []
+        for event_id, items in items_by_event.items():
+            rows = [model(event_id=event_id, **item) for item in items]
+            old_rows = existing[event_id]
+            kept = 0
+            while kept < min(len(rows), len(old_rows)) and values(rows[kept]) == values(
+                old_rows[kept]
+            ):
+                kept += 1
+            stale_ids.extend(row.pk for row in old_rows[kept:])
+            new_rows.extend(rows[kept:])
+
+        if stale_ids:
+            model.objects.filter(pk__in=stale_ids).delete()
+        if new_rows:
+            model.objects.bulk_create(new_rows)
+        return bool(stale_ids or new_rows)
+
+    def _write_m2m(self, field, objs_by_event):
+        """
+        :return: ids of the added and removed related objects
+        :rtype: set
+        """
+        if not objs_by_event:
+            return set()
+        through = field.remote_field.through
+        source = "%s_id" % field.m2m_field_name()
+        target = "%s_id" % field.m2m_reverse_field_name()
+
+        existing = defaultdict(dict)
+        for pk, event_id, target_id in through.objects.filter(
+            **{"%s__in" % source: objs_by_event.keys() - self.created_ids}
+        ).values_list("pk", source, target):
+            existing[event_id][target_id] = pk
+
+        stale_ids = []
+        new_rows = []
+        removed = []
+        added = []
+        for event_id, objs in objs_by_event.items():
+            target_ids = {obj.pk for obj in objs}
+            old = existing[event_id]
+            for target_id in old.keys() - target_ids:
+                stale_ids.append(old[target_id])
+                removed.append((event_id, target_id))
+            for target_id in target_ids - old.keys():
+                new_rows.append(through(**{source: event_id, target: target_id}))
+                added.append((event_id, target_id))
+
+        if stale_ids:
+            through.objects.filter(pk__in=stale_ids).delete()
+        if new_rows:
+            through.objects.bulk_create(new_rows)
+        # bulk writes send no signals, see sync_event_keyword_memberships
+        if field.name in ("keywords", "audience"):
+            EventKeywordMembership.remove(field.name, removed)
+            EventKeywordMembership.add(field.name, added)
+        return {target_id for _, target_id in removed + added}
+
+    def write(self):
+        changed = False
+        for name, model in self.child_models:
+            changed |= self._write_children(model, self.children[name])
+
+        changed_keyword_ids = set()
+        for name in self.m2m_fields:
+            changed_ids = self._write_m2m(Event._meta.get_field(name), self.m2m[name])
+            if name in ("keywords", "audience"):
+                changed_keyword_ids.update(changed_ids)
+            changed |= bool(changed_ids)
+
+        # bulk writes send no signals, see keyword_added_or_removed and events.signals
+        if changed_keyword_ids:
+            Keyword.objects.filter(pk__in=changed_keyword_ids).update(
+                n_events_changed=True
+            )
+        if changed:
+            bump_generation("event")
+
+        # the events are serialized in the response, drop the outdated prefetched relations
+        for event in self.events:
+            prefetched = getattr(event, "_prefetched_objects_cache", {})
+            for name in (*self.children, *self.m2m):
+                prefetched.pop(name, None)
+
+
+class EventListSerializer(BulkListSerializer):
+    """
+    Save the events of a bulk request in a single event_save_batch and write
+    the relations of all the events at once, see EventRelationWriter.
+    """
+
+    def save_with_relations(self, save, *args):
+        all_validated_data = args[-1]
+        with event_save_batch() as batch:
+            batch.prefetch_old_states(
+                data["id"] for data in all_validated_data if data.get("id")
+            )
+            writer = self._context["event_relation_writer"] = EventRelationWriter()
+            try:
+                instances = save(*args)
+            finally:
+                del self._context["event_relation_writer"]
+            writer.write()
+        return instances
+
+    def create(self, validated_data):
+        return self.save_with_relations(super().create, validated_data)
+
+    def update(self, queryset, all_validated_data):
+        return self.save_with_relations(super().update, queryset, all_validated_data)
+
+
 class EventSerializer(BulkSerializerMixin, EditableLinkedEventsObjectSerializer):
     id = serializers.CharField(required=False)
     location = JSONLDRelatedField(
@@ -2217,10 +2497,14 @@ class EventSerializer(BulkSerializerMixin, EditableLinkedEventsObjectSerializer)
 
         if "id" not in validated_data:
             validated_data["id"] = generate_id(data_source)
+            batch = get_event_save_batch()
+            if batch is not None:
+                batch.mark_created(validated_data["id"])
 
-        offers = validated_data.pop("offers", [])
-        links = validated_data.pop("external_links", [])
-        videos = validated_data.pop("videos", [])
+        relations = {
+            name: validated_data.pop(name, None)
+            for name, _model in EventRelationWriter.child_models
+        }
 
         validated_data.update(
             {
@@ -2237,15 +2521,11 @@ class EventSerializer(BulkSerializerMixin, EditableLinkedEventsObjectSerializer)
             if field_name.startswith("extension_") and field.source in validated_data:
                 validated_data.pop(field.source)
 
-        event = super().create(validated_data)
+        for name in EventRelationWriter.m2m_fields:
+            relations[name] = validated_data.pop(name, None)
 
-        # create and add related objects
-        for offer in offers:
-            Offer.objects.create(event=event, **offer)
-        for link in links:
-            EventLink.objects.create(event=event, **link)
-        for video in videos:
-            Video.objects.create(event=event, **video)
+        event = super().create(validated_data)
+        self.write_relations(event, relations, created=True)
 
         extensions = get_extensions_from_request(request)
 
@@ -2257,9 +2537,10 @@ class EventSerializer(BulkSerializerMixin, EditableLinkedEventsObjectSerializer)
         return event
 
     def update(self, instance, validated_data):
-        offers = validated_data.pop("offers", None)
-        links = validated_data.pop("external_links", None)
-        videos = validated_data.pop("videos", None)
+        relations = {
+            name: validated_data.pop(name, None)
+            for name, _model in EventRelationWriter.child_models
+        }
         data_source = self.context["data_source"]
 
         if (
@@ -2326,26 +2607,12 @@ class EventSerializer(BulkSerializerMixin, EditableLinkedEventsObjectSerializer)
             if field_name.startswith("extension_") and field.source in validated_data:
                 validated_data.pop(field.source)
 
+        for name in EventRelationWriter.m2m_fields:
+            relations[name] = validated_data.pop(name, None)
+
         # update validated fields
         super().update(instance, validated_data)
-
-        # update offers
-        if isinstance(offers, list):
-            instance.offers.all().delete()
-            for offer in offers:
-                Offer.objects.create(event=instance, **offer)
-
-        # update ext links
-        if isinstance(links, list):
-            instance.external_links.all().delete()
-            for link in links:
-                EventLink.objects.create(event=instance, **link)
-
-        # update videos
-        if isinstance(videos, list):
-            instance.videos.all().delete()
-            for video in videos:
-                Video.objects.create(event=instance, **video)
+        self.write_relations(instance, relations)
 
         request = self.context["request"]
         extensions = get_extensions_from_request(request)
@@ -2357,6 +2624,16 @@ class EventSerializer(BulkSerializerMixin, EditableLinkedEventsObjectSerializer)
 
         return instance
 
+    def write_relations(self, event, relations, created=False):
+        writer = self.context.get("event_relation_writer")
+        if writer is not None:
+            # the relations of a bulk request are written by EventListSerializer
+            writer.add(event, relations, created)
+            return
+        writer = EventRelationWriter()
+        writer.add(event, relations, created)
+        writer.write()
+
     def to_representation(self, obj):
         ret = super().to_representation(obj)
 
@@ -2410,7 +2687,11 @@ class EventSerializer(BulkSerializerMixin, EditableLinkedEventsObjectSerializer)
         if request and not request.user.is_authenticated:
             del ret["publication_status"]
 
-        if ret["sub_events"]:
+        # the list view prefetches only the undeleted sub events
+        sub_events_prefetched = "sub_events" in getattr(
+            obj, "_prefetched_objects_cache", {}
+        )
+        if ret["sub_events"] and not sub_events_prefetched:
             sub_events_relation = self.fields["sub_events"].child_relation
             undeleted_sub_events = []
             for sub_event in obj.sub_events.filter(deleted=False):
@@ -2428,7 +2709,7 @@ class EventSerializer(BulkSerializerMixin, EditableLinkedEventsObjectSerializer)
             "search_vector_fi",
             "search_vector_sv",
         )
-        list_serializer_class = BulkListSerializer
+        list_serializer_class = EventListSerializer
 
 
 def _format_images_v0_1(data):
@@ -2494,21 +2775,60 @@ def parse_duration_string(duration):
     return int(val) * mul
 
 
-def _terms_to_regex(terms, operator, fuzziness=3):
+def _get_keyword_filter_ids(val):
     """
-    Create a  compiled regex from of the rpvided terms of the form
-    r'(\b(term1){e<2}')|(\b(term2){e<2})" This would match a string
-    with terms aligned in any order allowing two edits per term.
+    Split a comma separated keyword id parameter, replacing the ids of replaced
+    keywords with their replacements for backwards compatibility.
+
+    Returns the ids and whether they all are known keywords.
     """
+    keyword_ids = val.split(",")
+    replacements = resolve_keyword_ids(keyword_ids)
+    return (
+        [replacements.get(kid, kid) for kid in keyword_ids],
+        len(replacements) == len(set(keyword_ids)),
+    )
+
+
+def _has_keywords(keyword_ids, relation=None):
+    """
+    Condition for events having any of the keywords, either as keywords or
+    audience unless the relation is given.
+    """
+    memberships = EventKeywordMembership.objects.filter(
+        event=OuterRef("pk"), keyword_id__in=keyword_ids
+    )
+    if relation:
+        memberships = memberships.filter(relation=relation)
+    return Exists(memberships)
+
+
+def _has_languages(language_ids):
+    """Condition for events having any of the languages in in_language"""
+    return Exists(
+        Event.in_language.through.objects.filter(
+            event=OuterRef("pk"), language_id__in=language_ids
+        )
+    )
 
-    vals = terms.split(",")
-    valexprs = [r"(\b" + f"({val}){{e<{fuzziness}}})" for val in vals]
-    if operator == "AND":
-        regex_join = ""
-    elif operator == "OR":
-        regex_join = "|"
-    expr = f"{regex_join.join(valexprs)}"
-    return regex.compile(expr, regex.IGNORECASE)
+
+def _get_keyword_set_keyword_ids(keyword_set_ids):
+    """
+    Get the ids of the keywords of each existing keyword set, replaced keywords
+    resolved. Keyword sets without keywords have no keyword ids.
+    """
+    # keyword sets without keywords are a single row with a null keyword
+    rows = list(
+        KeywordSet.objects.filter(id__in=keyword_set_ids).values_list("id", "keywords")
+    )
+    replacements = resolve_keyword_ids(
+        [keyword_id for _, keyword_id in rows if keyword_id is not None]
+    )
+    keyword_sets = {keyword_set_id: set() for keyword_set_id, _ in rows}
+    for keyword_set_id, keyword_id in rows:
+        if keyword_id is not None:
+            keyword_sets[keyword_set_id].add(replacements.get(keyword_id, keyword_id))
+    return keyword_sets
 
 
 def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
@@ -2533,7 +2853,8 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
             .annotate(
                 free=(
                     F("registration__maximum_attendee_capacity")
-                    - Count("registration__signups")
+                    - F("registration__current_attendee_count")
+                    - F("registration__current_waiting_list_count")
                 ),
             )
             .filter(
@@ -2551,7 +2872,8 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
                         F("registration__maximum_attendee_capacity")
                         + F("registration__waiting_list_capacity")
                     )
-                    - Count("registration__signups")
+                    - F("registration__current_attendee_count")
+                    - F("registration__current_waiting_list_count")
                 ),
             )
             .filter(
@@ -2580,92 +2902,74 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
 
     val = params.get("local_ongoing_OR", None)
     if val:
-        rc = _terms_to_regex(val, "OR")
-        ids = {
-            k
-            for k, v in cache.get("local_ids").items()
-            if rc.search(v, concurrent=True)
-        }
+        ids = search_ongoing_events(
+            get_ongoing_indexes(LOCAL_INDEX_CACHE_KEY), val, "OR"
+        )
         queryset = queryset.filter(id__in=ids)
 
     val = params.get("local_ongoing_AND", None)
     if val:
-        rc = _terms_to_regex(val, "AND")
-        ids = {
-            k
-            for k, v in cache.get("local_ids").items()
-            if rc.search(v, concurrent=True)
-        }
+        ids = search_ongoing_events(
+            get_ongoing_indexes(LOCAL_INDEX_CACHE_KEY), val, "AND"
+        )
         queryset = queryset.filter(id__in=ids)
 
     val = params.get("internet_ongoing_AND", None)
     if val:
-        rc = _terms_to_regex(val, "AND")
-        ids = {
-            k
-            for k, v in cache.get("internet_ids").items()
-            if rc.search(v, concurrent=True)
-        }
+        ids = search_ongoing_events(
+            get_ongoing_indexes(INTERNET_INDEX_CACHE_KEY), val, "AND"
+        )
         queryset = queryset.filter(id__in=ids)
 
     val = params.get("internet_ongoing_OR", None)
     if val:
-        rc = _terms_to_regex(val, "OR")
-        ids = {
-            k
-            for k, v in cache.get("internet_ids").items()
-            if rc.search(v, concurrent=True)
-        }
+        ids = search_ongoing_events(
+            get_ongoing_indexes(INTERNET_INDEX_CACHE_KEY), val, "OR"
+        )
         queryset = queryset.filter(id__in=ids)
 
     val = params.get("all_ongoing", None)
     if val and parse_bool(val, "all_ongoing"):
         ids = {
             k
-            for i in cache.get_many(["internet_ids", "local_ids"]).values()
-            for k, v in i.items()
+            for index in get_ongoing_indexes(
+                INTERNET_INDEX_CACHE_KEY, LOCAL_INDEX_CACHE_KEY
+            )
+            for k in index.ids
         }
         queryset = queryset.filter(id__in=ids)
 
     val = params.get("all_ongoing_AND", None)
     if val:
-        rc = _terms_to_regex(val, "AND")
-        cached_ids = {
-            k: v
-            for i in cache.get_many(["internet_ids", "local_ids"]).values()
-            for k, v in i.items()
-        }
-        ids = {k for k, v in cached_ids.items() if rc.search(v, concurrent=True)}
+        ids = search_ongoing_events(
+            get_ongoing_indexes(INTERNET_INDEX_CACHE_KEY, LOCAL_INDEX_CACHE_KEY),
+            val,
+            "AND",
+        )
         queryset = queryset.filter(id__in=ids)
 
     val = params.get("all_ongoing_OR", None)
     if val:
-        rc = _terms_to_regex(val, "OR")
-        cached_ids = {
-            k: v
-            for i in cache.get_many(["internet_ids", "local_ids"]).values()
-            for k, v in i.items()
-        }
-        ids = {k for k, v in cached_ids.items() if rc.search(v, concurrent=True)}
+        ids = search_ongoing_events(
+            get_ongoing_indexes(INTERNET_INDEX_CACHE_KEY, LOCAL_INDEX_CACHE_KEY),
+            val,
+            "OR",
+        )
         queryset = queryset.filter(id__in=ids)
 
     vals = params.get("keyword_set_AND", None)
     if vals:
         vals = vals.split(",")
-        keyword_sets = KeywordSet.objects.filter(id__in=vals)
-        for keyword_set in keyword_sets:
-            keywords = keyword_set.keywords.all()
-            qset = Q(keywords__in=keywords)
-            queryset = queryset.filter(qset)
+        for keywords in _get_keyword_set_keyword_ids(vals).values():
+            queryset = queryset.filter(_has_keywords(keywords, "keywords"))
 
     vals = params.get("keyword_set_OR", None)
     if vals:
         vals = vals.split(",")
-        keyword_sets = KeywordSet.objects.filter(id__in=vals)
         all_keywords = set()
-        for keyword_set in keyword_sets:
-            keywords = keyword_set.keywords.all()
+        for keywords in _get_keyword_set_keyword_ids(vals).values():
             all_keywords.update(keywords)
+        queryset = queryset.filter(_has_keywords(all_keywords, "keywords"))
 
     if "local_ongoing_OR_set" in "".join(params):
         count = 1
@@ -2673,13 +2977,10 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
         while f"local_ongoing_OR_set{count}" in params:
             val = params.get(f"local_ongoing_OR_set{count}", None)
             if val:
-                rc = _terms_to_regex(val, "OR")
                 all_ids.append(
-                    {
-                        k
-                        for k, v in cache.get("local_ids").items()
-                        if rc.search(v, concurrent=True)
-                    }
+                    search_ongoing_events(
+                        get_ongoing_indexes(LOCAL_INDEX_CACHE_KEY), val, "OR"
+                    )
                 )
             count += 1
         ids = set.intersection(*all_ids)
@@ -2691,13 +2992,10 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
         while f"internet_ongoing_OR_set{count}" in params:
             val = params.get(f"internet_ongoing_OR_set{count}", None)
             if val:
-                rc = _terms_to_regex(val, "OR")
                 all_ids.append(
-                    {
-                        k
-                        for k, v in cache.get("internet_ids").items()
-                        if rc.search(v, concurrent=True)
-                    }
+                    search_ongoing_events(
+                        get_ongoing_indexes(INTERNET_INDEX_CACHE_KEY), val, "OR"
+                    )
                 )
             count += 1
         ids = set.intersection(*all_ids)
@@ -2709,14 +3007,14 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
         while f"all_ongoing_OR_set{count}" in params:
             val = params.get(f"all_ongoing_OR_set{count}", None)
             if val:
-                rc = _terms_to_regex(val, "OR")
-                cached_ids = {
-                    k: v
-                    for i in cache.get_many(["internet_ids", "local_ids"]).values()
-                    for k, v in i.items()
-                }  # noqa E501
                 all_ids.append(
-                    {k for k, v in cached_ids.items() if rc.search(v, concurrent=True)}
+                    search_ongoing_events(
+                        get_ongoing_indexes(
+                            INTERNET_INDEX_CACHE_KEY, LOCAL_INDEX_CACHE_KEY
+                        ),
+                        val,
+                        "OR",
+                    )
                 )
             count += 1
         ids = set.intersection(*all_ids)
@@ -2728,8 +3026,8 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
         for i in all_sets:
             val = params.get(i, None)
             if val:
-                val = val.split(",")
-                queryset = queryset.filter(keywords__pk__in=val)
+                val = _get_keyword_filter_ids(val)[0]
+                queryset = queryset.filter(_has_keywords(val, "keywords"))
 
     val = params.get("internet_based", None)
     if val and parse_bool(val, "internet_based"):
@@ -2770,7 +3068,9 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
                 .order_by("-simile")[:3]
             )
             if keywords:
-                qset |= Q(keywords__in=keywords)
+                qset |= Q(
+                    _has_keywords([keyword.id for keyword in keywords], "keywords")
+                )
             qsets.append(qset)
             qset = Q()
         queryset = queryset.filter(*qsets)
@@ -2877,7 +3177,7 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
     val = params.get("bbox", None)
     if val:
         bbox_filter = build_bbox_filter(srs, val, "position")
-        places = Place.geo_objects.filter(**bbox_filter)
+        places = places_within(bbox_filter["position__within"])
         queryset = queryset.filter(location__in=places)
 
     # Filter by data source, multiple sources separated by comma
@@ -2903,72 +3203,37 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
     # Filter by keyword id, multiple ids separated by comma
     val = params.get("keyword", None)
     if val:
-        val = val.split(",")
-        try:
-            # replaced keywords are looked up for backwards compatibility
-            val = [
-                getattr(Keyword.objects.get(id=kid).replaced_by, "id", None) or kid
-                for kid in val
-            ]
-        except Keyword.DoesNotExist:
+        val, all_found = _get_keyword_filter_ids(val)
+        if not all_found:
             # the user asked for an unknown keyword
             queryset = queryset.none()
-        queryset = queryset.filter(
-            Q(keywords__pk__in=val) | Q(audience__pk__in=val)
-        ).distinct()
+        queryset = queryset.filter(_has_keywords(val))
 
     # 'keyword_OR' behaves the same way as 'keyword'
     val = params.get("keyword_OR", None)
     if val:
-        val = val.split(",")
-        try:
-            # replaced keywords are looked up for backwards compatibility
-            val = [
-                getattr(Keyword.objects.get(id=kid).replaced_by, "id", None) or kid
-                for kid in val
-            ]
-        except Keyword.DoesNotExist:
+        val, all_found = _get_keyword_filter_ids(val)
+        if not all_found:
             # the user asked for an unknown keyword
             queryset = queryset.none()
-        queryset = queryset.filter(
-            Q(keywords__pk__in=val) | Q(audience__pk__in=val)
-        ).distinct()
+        queryset = queryset.filter(_has_keywords(val))
 
     # Filter by keyword ids requiring all keywords to be present in event
     val = params.get("keyword_AND", None)
     if val:
-        val = val.split(",")
+        val, all_found = _get_keyword_filter_ids(val)
+        if not all_found:
+            # the user asked for an unknown keyword
+            queryset = queryset.none()
         for keyword_id in val:
-            try:
-                # replaced keywords are looked up for backwards compatibility
-                val = (
-                    getattr(Keyword.objects.get(id=keyword_id).replaced_by, "id", None)
-                    or keyword_id
-                )
-            except Keyword.DoesNotExist:
-                # the user asked for an unknown keyword
-                queryset = queryset.none()
-            queryset = queryset.filter(
-                Q(keywords__pk=keyword_id) | Q(audience__pk=keyword_id)
-            )
-        queryset = queryset.distinct()
+            queryset = queryset.filter(_has_keywords([keyword_id]))
 
     # Negative filter for keyword ids
     val = params.get("keyword!", None)
     if val:
-        val = val.split(",")
-        try:
-            # replaced keywords are looked up for backwards compatibility
-            val = [
-                getattr(Keyword.objects.get(id=kid).replaced_by, "id", None) or kid
-                for kid in val
-            ]
-        except Keyword.DoesNotExist:
-            # the user asked for an unknown keyword
-            pass
-        queryset = queryset.exclude(
-            Q(keywords__pk__in=val) | Q(audience__pk__in=val)
-        ).distinct()
+        # unknown keywords are simply not excluded
+        val = _get_keyword_filter_ids(val)[0]
+        queryset = queryset.filter(~_has_keywords(val))
 
     # filter only super or non-super events. to be deprecated?
     val = params.get("recurring", None)
@@ -3039,32 +3304,20 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
     val = params.get("language", None)
     if val:
         val = val.split(",")
-        q = Q()
+        q = Q(_has_languages(val))
         for lang in val:
             if lang in utils.get_fixed_lang_codes():
                 # check string content if language has translations available
                 name_arg = {"name_" + lang + "__isnull": False}
                 desc_arg = {"description_" + lang + "__isnull": False}
                 short_desc_arg = {"short_description_" + lang + "__isnull": False}
-                q = (
-                    q
-                    | Q(in_language__id=lang)
-                    | Q(**name_arg)
-                    | Q(**desc_arg)
-                    | Q(**short_desc_arg)
-                )
-            else:
-                q = q | Q(in_language__id=lang)
-        queryset = queryset.filter(q).distinct()
+                q = q | Q(**name_arg) | Q(**desc_arg) | Q(**short_desc_arg)
+        queryset = queryset.filter(q)
 
     # Filter by in_language field only
     val = params.get("in_language", None)
     if val:
-        val = val.split(",")
-        q = Q()
-        for lang in val:
-            q = q | Q(in_language__id=lang)
-        queryset = queryset.filter(q)
+        queryset = queryset.filter(_has_languages(val.split(",")))
 
     val = params.get("starts_after", None)
     param = "starts_after"
@@ -3149,10 +3402,13 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
     # Filter by free offer
     val = params.get("is_free", None)
     if val and val.lower() in ["true", "false"]:
+        has_free_offer = Exists(
+            Offer.objects.filter(event=OuterRef("pk"), is_free=True)
+        )
         if val.lower() == "true":
-            queryset = queryset.filter(offers__is_free=True)
+            queryset = queryset.filter(has_free_offer)
         elif val.lower() == "false":
-            queryset = queryset.exclude(offers__is_free=True)
+            queryset = queryset.filter(~has_free_offer)
 
     val = params.get("suitable_for", None)
     """ Excludes all the events that have max age limit below or min age limit above the age or age range specified.
@@ -3176,7 +3432,8 @@ def _filter_event_queryset(queryset, params, srs=None):  # noqa: C901
             | Q(audience_max_age__lt=upper_boundary)
             | Q(Q(audience_min_age=None) & Q(audience_max_age=None))
         )
-    return queryset.distinct()
+    # the multi-valued filters above are subqueries, so no duplicate rows to remove
+    return queryset
 
 
 class EventExtensionFilterBackend(BaseFilterBackend):
@@ -3252,13 +3509,9 @@ class EventFilter(django_filters.rest_framework.FilterSet):
         except ValueError:
             raise ParseError("Metres must be a number")
 
-        places = Place.objects.filter(
-            position__dwithin=(
-                Point(origin_x, origin_y, srid=srs.srid),
-                D(m=metres),
-            )
+        places = places_within_distance(
+            Point(origin_x, origin_y, srid=srs.srid), metres
         )
-
         return queryset.filter(location__in=places)
 
 
@@ -3268,7 +3521,29 @@ class EventDeletedException(APIException):
     default_code = "gone"
 
 
+def _get_sub_events_prefetch(expanded=False):
+    """
+    Prefetch the undeleted sub events, along with the fields of the sub events
+    needed for including them in the response.
+    """
+    queryset = Event.objects.filter(deleted=False)
+    if expanded:
+        queryset = queryset.select_related("location", "publisher").prefetch_related(
+            "offers",
+            "keywords",
+            "audience",
+            "images",
+            "images__publisher",
+            "external_links",
+            "in_language",
+            "videos",
+            Prefetch("sub_events", queryset=Event.objects.filter(deleted=False)),
+        )
+    return Prefetch("sub_events", queryset=queryset)
+
+
 class EventViewSet(
+    ResponseCacheMixin,
     UserDataSourceAndOrganizationMixin,
     JSONAPIViewMixin,
     BulkModelViewSet,
@@ -3284,7 +3559,6 @@ class EventViewSet(
             "images",
             "images__publisher",
             "external_links",
-            "sub_events",
             "in_language",
             "videos",
         )
@@ -3296,6 +3570,8 @@ class EventViewSet(
         EventExtensionFilterBackend,
     )
     filterset_class = EventFilter
+    response_cache_resources = ("event", "place", "keyword", "image", "registration")
+    pagination_class = EventPagination
     ordering_fields = (
         "start_time",
         "end_time",
@@ -3304,7 +3580,12 @@ class EventViewSet(
         "name",
     )
     ordering = ("-last_modified_time",)
-    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [DOCXRenderer]
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES + [
+        DOCXRenderer,
+        NDJSONRenderer,
+    ]
+    # number of events fetched and serialized at a time in the NDJSON export
+    export_chunk_size = 500
     permission_classes = (DataSourceResourceEditPermission,)
     permit_regular_user_edit = True
 
@@ -3337,6 +3618,11 @@ class EventViewSet(
         queryset = super().get_queryset()
         if self.action == "list":
             context = self.get_serializer_context()
+            queryset = queryset.prefetch_related(
+                _get_sub_events_prefetch(
+                    expanded="sub_events" in context.get("include", ())
+                )
+            )
             # prefetch extra if the user want them included
             if "include" in context:
                 for included in context["include"]:
@@ -3375,7 +3661,7 @@ class EventViewSet(
         TODO: convert to use proper filter framework
         """
         original_queryset = super().filter_queryset(queryset)
-        if self.action == "list":
+        if self.action in ("list", "tiles"):
             # we cannot use distinct for performance reasons
             public_queryset = original_queryset.filter(
                 publication_status=PublicationStatus.PUBLIC
@@ -3616,20 +3902,154 @@ class EventViewSet(
                 raise ParseError(
                     {"detail": _("Must specify a location when fetching DOCX file.")}
                 )
-            queryset = self.filter_queryset(self.get_queryset())
-            if queryset.count() == 0:
+            queryset = self.filter_queryset(Event.objects.all())
+            counts = queryset.aggregate(
+                n_events=Count("id"), n_locations=Count("location", distinct=True)
+            )
+            if counts["n_events"] == 0:
                 raise ParseError({"detail": _("No events.")})
-            if len(set([event.location for event in queryset])) > 1:
+            if counts["n_locations"] > 1:
                 raise ParseError({"detail": _("Only one location allowed.")})
-            serializer = self.get_serializer(queryset, many=True)
-            return Response(serializer.data)
+            return Response(self.get_docx_events(queryset))
+        if request.accepted_renderer.format == "ndjson":
+            return self.export(request)
         return super().list(request, *args, **kwargs)
 
+    @action(detail=False, methods=["get"])
+    def tiles(self, request, *args, **kwargs):
+        """
+        Count the events in each map tile, with the filters of the event list,
+        for clustering the events on a map without fetching them.
+
+        The tiles are squares of tile_size metres in the projection tile_srid,
+        and their bboxes are given in the requested srid.
+        """
+        tile_size = parse_digit(
+            request.query_params.get("tile_size", TILE_SIZE), "tile_size"
+        )
+        if tile_size < MIN_TILE_SIZE:
+            raise ParseError(_("tile_size must be at least %d metres.") % MIN_TILE_SIZE)
+        queryset = self.filter_queryset(Event.objects.all())
+        data = []
+        for x, y, n_events in count_events_by_tile(queryset, tile_size):
+            bbox = Polygon.from_bbox(get_tile_extent((x, y), tile_size))
+            bbox.srid = settings.PROJECTION_SRID
+            bbox.transform(self.srs)
+            data.append({"x": x, "y": y, "bbox": bbox.extent, "count": n_events})
+        return Response(
+            {
+                "tile_size": tile_size,
+                "tile_srid": settings.PROJECTION_SRID,
+                "srid": self.srs.srid,
+                "data": data,
+            }
+        )
+
+    def get_docx_events(self, queryset):
+        """
+        Yield the events of a single location with only the fields the DOCX
+        renderer needs, in the shape of the serialized events.
+
+        The events and the price of their first offer are fetched in a single
+        query and iterated without creating model instances.
+        """
+        lang_codes = utils.get_fixed_lang_codes()
+        translated = {
+            field_name: ["%s_%s" % (field_name, lang) for lang in lang_codes]
+            for field_name in ("name", "short_description", "description")
+        }
+        first_offer = Offer.objects.filter(event=OuterRef("pk")).order_by("pk")
+        prices = {
+            "offer_price_%s" % lang: Subquery(first_offer.values("price_%s" % lang)[:1])
+            for lang in lang_codes
+        }
+        rows = (
+            queryset.annotate(**prices)
+            .values(
+                "location_id",
+                "start_time",
+                "end_time",
+                *(key for keys in translated.values() for key in keys),
+                *prices,
+            )
+            .iterator()
+        )
+
+        def translated_value(row, keys):
+            value = {
+                lang: row[key]
+                for lang, key in zip(lang_codes, keys)
+                if row[key] is not None
+            }
+            return value or None
+
+        location = None
+        for row in rows:
+            if location is None:
+                location = Place.objects.get(pk=row["location_id"])
+            event = {
+                field_name: translated_value(row, keys)
+                for field_name, keys in translated.items()
+            }
+            # the price is None if the event has no offers, just like for an offer without a price
+            event["offers"] = [{"price": translated_value(row, list(prices))}]
+            event["start_time_obj"] = row["start_time"]
+            event["end_time_obj"] = row["end_time"]
+            event["location"] = location
+            yield event
+
+    def export(self, request):
+        """
+        Stream all the filtered events as newline delimited JSON without pagination.
+
+        The events are ordered by their modification time, and the Link header
+        contains the URL for fetching the events modified after the export
+        started, so that harvesters can sync the events incrementally.
+        """
+        exported_since = timezone.now()
+        queryset = self.get_queryset()
+        event_ids = (
+            self.filter_queryset(queryset)
+            .order_by("last_modified_time", "id")
+            .values_list("id", flat=True)
+        )
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        renderer = request.accepted_renderer
+        chunk_size = self.export_chunk_size
+
+        def render_chunks():
+            # the ids are read with a server-side cursor, the events a chunk at a time
+            ids = event_ids.iterator(chunk_size=chunk_size)
+            while True:
+                chunk = list(islice(ids, chunk_size))
+                if not chunk:
+                    break
+                events = queryset.filter(id__in=chunk).order_by(
+                    "last_modified_time", "id"
+                )
+                serializer = serializer_class(events, many=True, context=context)
+                yield renderer.render(serializer.data)
+
+        response = StreamingHttpResponse(
+            render_chunks(), content_type=renderer.media_type
+        )
+        next_url = replace_query_param(
+            request.build_absolute_uri(),
+            "last_modified_since",
+            exported_since.isoformat(),
+        )
+        response["Link"] = '<%s>; rel="next"' % next_url
+        return response
+
     def finalize_response(self, request, response, *args, **kwargs):
         # Switch to normal renderer for docx errors.
         response = super().finalize_response(request, response, *args, **kwargs)
-        # Prevent rendering errors as DOCX files
-        if response.status_code != 200 and request.accepted_renderer.format == "docx":
+        # Prevent rendering errors as DOCX or NDJSON files
+        if response.status_code != 200 and request.accepted_renderer.format in (
+            "docx",
+            "ndjson",
+        ):
             first_renderer = self.renderer_classes[0]()
             response.accepted_renderer = first_renderer
             response.accepted_media_type = first_renderer.media_type
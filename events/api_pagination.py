@@ -1,19 +1,142 @@
+import base64
+import hashlib
+import json
 from collections import OrderedDict
+from functools import partial
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 from rest_framework import pagination
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CountStrategy:
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATE = "estimate"
+
+
+COUNT_STRATEGIES = (CountStrategy.EXACT, CountStrategy.CACHED, CountStrategy.ESTIMATE)
+
+
+def estimate_count(queryset):
+    """
+    Get the PostgreSQL planner estimate of the number of rows in the queryset.
+    """
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class CountPaginator(Paginator):
+    """
+    Paginator counting the results with the given strategy:
+
+    exact: count the results
+    cached: use the count cached with the cache key for a short while
+    estimate: use the planner estimate if it is large, count otherwise
+
+    count_exact tells whether the count was counted for this request.
+    """
+
+    def __init__(
+        self, *args, count_strategy=CountStrategy.EXACT, cache_key=None, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.count_strategy = count_strategy
+        self.cache_key = cache_key
+        self.count_exact = True
+
+    @cached_property
+    def count(self):
+        if self.count_strategy == CountStrategy.CACHED and self.cache_key:
+            count = cache.get(self.cache_key)
+            if count is not None:
+                self.count_exact = False
+                return count
+            count = super().count
+            cache.set(
+                self.cache_key, count, timeout=settings.PAGINATION_COUNT_CACHE_TIMEOUT
+            )
+            return count
+        if self.count_strategy == CountStrategy.ESTIMATE and isinstance(
+            self.object_list, QuerySet
+        ):
+            count = estimate_count(self.object_list)
+            if count > settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD:
+                self.count_exact = False
+                return count
+        return super().count
 
 
 # This needs to be in its own file because of circular
 # imports.
 class CustomPagination(pagination.PageNumberPagination):
+    """
+    Page number pagination with a selectable count strategy, see CountPaginator.
+
+    The strategy is given with the count query parameter and defaults to the
+    count_strategy attribute of the view.
+    """
+
     max_page_size = 100
     page_size_query_param = "page_size"
+    count_query_param = "count"
+    # query parameters not affecting the count
+    count_cache_ignored_params = ("page", "page_size", "cursor", "count", "format")
+
+    def get_count_strategy(self, request, view=None):
+        strategy = request.query_params.get(self.count_query_param) or getattr(
+            view, "count_strategy", CountStrategy.EXACT
+        )
+        if strategy not in COUNT_STRATEGIES:
+            raise ParseError(
+                _("Count must be one of the following: %(strategies)s")
+                % {"strategies": ", ".join(COUNT_STRATEGIES)}
+            )
+        return strategy
+
+    def get_count_cache_key(self, request, view=None):
+        params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+            if key not in self.count_cache_ignored_params
+        )
+        user = request.user.pk if request.user.is_authenticated else None
+        key = json.dumps(
+            [request.version, getattr(view, "basename", None), user, params]
+        )
+        return "pagination_count:" + hashlib.md5(key.encode()).hexdigest()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            CountPaginator,
+            count_strategy=self.get_count_strategy(request, view),
+            cache_key=self.get_count_cache_key(request, view),
+        )
+        return super().paginate_queryset(queryset, request, view)
 
     def get_paginated_response(self, data):
         meta = OrderedDict(
             [
                 ("count", self.page.paginator.count),
+                ("count_exact", self.page.paginator.count_exact),
                 ("next", self.get_next_link()),
                 ("previous", self.get_previous_link()),
             ]
@@ -26,3 +149,139 @@ class LargeResultsSetPagination(CustomPagination):
     page_size = 1000
     page_size_query_param = "page_size"
     max_page_size = 10000
+
+
+class KeysetPagination(CustomPagination):
+    """
+    Page number pagination with an opt-in keyset (cursor) mode.
+
+    Giving the cursor query parameter (empty for the first page) orders the
+    results by the requested sort field and id, and seeks to the position
+    stored in the cursor instead of counting the results and using an OFFSET.
+    Only the next link is provided in this mode and the count is null.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_ordering_fields = ()
+    default_cursor_ordering = None
+
+    def use_cursor(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.use_cursor(request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        self.ordering = self.get_cursor_ordering(queryset)
+        field = self.ordering.lstrip("-")
+        descending = self.ordering.startswith("-")
+        nullable = queryset.model._meta.get_field(field).null
+
+        if descending:
+            order_by = (F(field).desc(nulls_last=nullable), "-id")
+        else:
+            order_by = (F(field).asc(nulls_last=nullable), "id")
+        queryset = queryset.order_by(*order_by)
+
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            queryset = queryset.filter(
+                self.get_seek_filter(field, descending, *self.decode_cursor(cursor))
+            )
+
+        results = list(queryset[: page_size + 1])
+        self.page = results[:page_size]
+        self.has_next = len(results) > page_size
+        self.field = field
+        return self.page
+
+    def get_cursor_ordering(self, queryset):
+        ordering = queryset.query.order_by or (self.default_cursor_ordering,)
+        if len(ordering) != 1 or ordering[0].lstrip("-") not in (
+            self.cursor_ordering_fields
+        ):
+            raise ParseError(
+                _(
+                    "Cursor pagination supports sorting by one of the following "
+                    "fields only: %(fields)s"
+                )
+                % {"fields": ", ".join(self.cursor_ordering_fields)}
+            )
+        return ordering[0]
+
+    def get_seek_filter(self, field, descending, value, pk):
+        """
+        Filter the results after the given position. Null values of the sort
+        field are always sorted last.
+        """
+        op = "lt" if descending else "gt"
+        if value is None:
+            return Q(**{f"{field}__isnull": True, f"id__{op}": pk})
+        return (
+            Q(**{f"{field}__{op}": value})
+            | Q(**{field: value, f"id__{op}": pk})
+            | Q(**{f"{field}__isnull": True})
+        )
+
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.field)
+        data = {
+            "ordering": self.ordering,
+            "value": value.isoformat() if value is not None else None,
+            "id": obj.pk,
+        }
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            value = data["value"]
+            pk = data["id"]
+            ordering = data["ordering"]
+            if value is not None:
+                value = parse_datetime(value)
+                if value is None:
+                    raise ValueError
+        except (ValueError, TypeError, KeyError):
+            raise ParseError(_("Invalid cursor."))
+        if ordering != self.ordering:
+            raise ParseError(_("The cursor does not match the sort order."))
+        return value, pk
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1])
+        )
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        return None
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        meta = OrderedDict(
+            [
+                ("count", None),
+                ("count_exact", False),
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+            ]
+        )
+        return Response(OrderedDict([("meta", meta), ("data", data)]))
+
+
+class EventPagination(KeysetPagination):
+    cursor_ordering_fields = ("last_modified_time", "start_time", "end_time")
+    default_cursor_ordering = "-last_modified_time"
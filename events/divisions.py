@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.db.models import Q
+from munigeo.models import AdministrativeDivision
+
+from events.response_cache import get_generations
+
+# division generation and a dict of normalized filter value -> ids of the divisions
+# it matches. The dict is never changed in place but replaced as a whole, so that
+# the threads of a process can read it without locking.
+_division_ids = (None, {})
+MAX_CACHED_DIVISION_FILTER_VALUES = 1000
+
+
+def clear_division_ids():
+    global _division_ids
+    _division_ids = (None, {})
+
+
+def normalize_division_filter_value(value):
+    """
+    Normalize a division filter value to ("ocd_id", ocd id) if it is an ocd id,
+    identified by a colon, or to ("name", name) otherwise. Ocd ids are
+    completed with the country and municipality of the deployment, if they are
+    configured.
+    """
+    if ":" not in value:
+        # we assume human name
+        return "name", value.title()
+    # we have a munigeo division
+    if hasattr(settings, "MUNIGEO_MUNI") and hasattr(settings, "MUNIGEO_COUNTRY"):
+        # append ocd path if we have deployment information
+        if not value.startswith("ocd-division"):
+            if not value.startswith("country"):
+                if not value.startswith("kunta"):
+                    value = settings.MUNIGEO_MUNI + "/" + value
+                value = settings.MUNIGEO_COUNTRY + "/" + value
+            value = "ocd-division/" + value
+    return "ocd_id", value
+
+
+def parse_division_filter(values):
+    """
+    Split division filter values into ocd ids and division names.
+
+    :return: list of ocd ids and list of names
+    """
+    keys = {normalize_division_filter_value(value) for value in values}
+    ocd_ids = [value for kind, value in keys if kind == "ocd_id"]
+    names = [value for kind, value in keys if kind == "name"]
+    return ocd_ids, names
+
+
+def resolve_division_ids(values):
+    """
+    Get the ids of the divisions matching any of the division filter values.
+
+    The matches of each normalized value are cached in the process until any
+    division is saved or deleted, which is noticed from the division generation.
+    """
+    global _division_ids
+    (generation,) = get_generations(["division"])
+    cached_generation, cached = _division_ids
+    if (
+        cached_generation != generation
+        or len(cached) > MAX_CACHED_DIVISION_FILTER_VALUES
+    ):
+        cached = {}
+    keys = {normalize_division_filter_value(value) for value in values}
+    division_ids = {key: cached[key] for key in keys if key in cached}
+    missing = keys - division_ids.keys()
+    if missing:
+        ocd_ids = [value for kind, value in missing if kind == "ocd_id"]
+        names = [value for kind, value in missing if kind == "name"]
+        matches = {key: set() for key in missing}
+        for division_id, ocd_id, name in AdministrativeDivision.objects.filter(
+            Q(ocd_id__in=ocd_ids) | Q(translations__name__in=names)
+        ).values_list("id", "ocd_id", "translations__name"):
+            for key in (("ocd_id", ocd_id), ("name", name)):
+                if key in matches:
+                    matches[key].add(division_id)
+        division_ids.update(
+            (key, frozenset(matched)) for key, matched in matches.items()
+        )
+        _division_ids = (generation, {**cached, **division_ids})
+    return set().union(*division_ids.values())
@@ -16,7 +16,7 @@ from events.importer.sync import ModelSyncher
 from events.importer.util import clean_text
 from events.importer.yso import KEYWORDS_TO_ADD_TO_AUDIENCE
 from events.keywords import KeywordMatcher
-from events.models import DataSource, Event, Keyword, Place
+from events.models import DataSource, Event, event_save_batch, Keyword, Place
 
 from .base import Importer, register_importer
 
@@ -314,10 +314,12 @@ class HarrastushakuImporter(Importer):
             raise HarrastushakuException("Start time after end time")
 
         time_tables = activity_data.get("timetables", [])
-        if time_tables:
-            self.handle_recurring_event(event_data, time_tables)
-        else:
-            self.handle_one_time_event(event_data)
+        # a recurring activity saves the super event and all its sub events
+        with event_save_batch():
+            if time_tables:
+                self.handle_recurring_event(event_data, time_tables)
+            else:
+                self.handle_one_time_event(event_data)
 
     def create_registration_links(self, activity_data):
         # Harrastushaku has own registration links which should be created in the imported events as well
@@ -9,7 +9,7 @@ from django.core.management import call_command
 from django_orghierarchy.models import Organization
 
 from events.importer.util import replace_location
-from events.models import DataSource, Place
+from events.models import DataSource, Place, place_divisions_batch
 
 from .base import Importer, register_importer
 from .sync import ModelSyncher
@@ -196,9 +196,11 @@ class TprekImporter(Importer):
             delete_func=self.mark_deleted,
             check_deleted_func=self.check_deleted,
         )
-        for idx, info in enumerate(obj_list):
-            if idx and (idx % 1000) == 0:
-                logger.info("%s units processed" % idx)
-            self._import_unit(syncher, info)
-
-        syncher.finish(self.options.get("remap", False))
+        # the divisions of the saved places are set with one spatial query at the end
+        with place_divisions_batch():
+            for idx, info in enumerate(obj_list):
+                if idx and (idx % 1000) == 0:
+                    logger.info("%s units processed" % idx)
+                self._import_unit(syncher, info)
+
+            syncher.finish(self.options.get("remap", False))
@@ -6,6 +6,45 @@ from django.contrib.postgres.search import SearchQuery, TrigramSimilarity
 from rest_framework.exceptions import ParseError
 
 from events.models import KeywordLabel
+from events.response_cache import get_generations
+from events.sql import get_keyword_replacements
+
+# keyword generation and a dict of keyword id -> id of its final replacement, or
+# None for unknown keywords. The dict is never changed in place but replaced as a
+# whole, so that the threads of a process can read it without locking.
+_keyword_replacements = (None, {})
+MAX_CACHED_KEYWORD_REPLACEMENTS = 10000
+
+
+def clear_keyword_replacements():
+    global _keyword_replacements
+    _keyword_replacements = (None, {})
+
+
+def resolve_keyword_ids(keyword_ids):
+    """
+    Map the given keyword ids to the ids of their final replacements, or to
+    themselves if they are not replaced. Unknown keyword ids are left out.
+
+    The replacements are cached in the process until any keyword is saved or
+    deleted, which is noticed from the keyword response cache generation.
+    """
+    global _keyword_replacements
+    (generation,) = get_generations(["keyword"])
+    cached_generation, cached = _keyword_replacements
+    if cached_generation != generation or len(cached) > MAX_CACHED_KEYWORD_REPLACEMENTS:
+        cached = {}
+    replacements = {kid: cached[kid] for kid in keyword_ids if kid in cached}
+    missing = set(keyword_ids) - replacements.keys()
+    if missing:
+        found = get_keyword_replacements(missing)
+        replacements.update((kid, found.get(kid)) for kid in missing)
+        _keyword_replacements = (generation, {**cached, **replacements})
+    return {
+        kid: replacement
+        for kid, replacement in replacements.items()
+        if replacement is not None
+    }
 
 
 class KeywordMatcher(object):
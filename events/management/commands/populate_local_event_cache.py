@@ -6,93 +6,125 @@ from django.core.cache import cache
 from django.core.management import BaseCommand
 
 from events.models import Event
+from events.ongoing_events import (
+    INTERNET_INDEX_CACHE_KEY,
+    LOCAL_INDEX_CACHE_KEY,
+    OngoingEventIndex,
+    publish_ongoing_indexes,
+)
+from events.response_cache import bump_generation
 from linkedevents.settings import MUNIGEO_MUNI
 
+SEARCH_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "short_description",
+    "name_en",
+    "description_en",
+    "short_description_en",
+    "name_sv",
+    "description_sv",
+    "short_description_sv",
+    "keywords__name_fi",
+    "keywords__name_sv",
+    "keywords__name_en",
+    "location__street_address_fi",
+    "location__street_address_sv",
+    "location__name_fi",
+    "location__name_sv",
+    "location__name_en",
+    "location__description_fi",
+    "location__description_sv",
+    "location__description_en",
+)
+
+
+def get_event_strings(queryset):
+    """
+    Concatenate the searchable texts of the events into a single string per event.
+
+    :rtype: dict[str, str]
+    """
+    rows = queryset.values_list(*SEARCH_FIELDS)
+    event_dict = {i[0]: set() for i in rows}
+    for i in rows:
+        event_dict[i[0]].update(i[1:])
+        event_dict[i[0]].discard(None)
+
+    return {
+        k: " ".join(v).replace("\n", " ").replace("\r", " ")
+        for k, v in event_dict.items()
+    }
+
 
 class Command(BaseCommand):
     help = "Update local and internet-based ongoing and upcoming events cache. Note that cache has to be set up and\
            its memory limits will probably need adjustment. In case memcached is used, check -m and\
            -I parameters."
 
-    def handle(self, *args, **options):
-        local_events = Event.objects.filter(
-            location__divisions__ocd_id__endswith=MUNIGEO_MUNI,
-            end_time__gte=datetime.utcnow().replace(tzinfo=pytz.utc),
-            deleted=False,
-        ).values_list(
-            "id",
-            "name",
-            "description",
-            "short_description",
-            "name_en",
-            "description_en",
-            "short_description_en",
-            "name_sv",
-            "description_sv",
-            "short_description_sv",
-            "keywords__name_fi",
-            "keywords__name_sv",
-            "keywords__name_en",  # noqa E501
-            "location__street_address_fi",
-            "location__street_address_sv",
-            "location__name_fi",
-            "location__name_sv",
-            "location__name_en",  # noqa E501
-            "location__description_fi",
-            "location__description_sv",
-            "location__description_en",
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--incremental",
+            default=False,
+            action="store_true",
+            help="Only update the events changed since the previous run and drop the ended events",
         )
-        event_dict = {i[0]: set() for i in local_events}
-        for i in local_events:
-            event_dict[i[0]].update(i[1:])
-            event_dict[i[0]].discard(None)
-
-        event_strings = {
-            k: " ".join(v).replace("\n", " ").replace("\r", " ")
-            for k, v in event_dict.items()
+
+    def get_querysets(self, now):
+        return {
+            LOCAL_INDEX_CACHE_KEY: Event.objects.filter(
+                location__divisions__ocd_id__endswith=MUNIGEO_MUNI,
+                end_time__gte=now,
+                deleted=False,
+            ),
+            INTERNET_INDEX_CACHE_KEY: Event.objects.filter(
+                location__id__endswith="internet",
+                end_time__gte=now,
+                deleted=False,
+            ),
         }
 
-        cache.set(
-            "local_ids", event_strings, timeout=settings.ONGOING_EVENTS_CACHE_TIMEOUT
-        )
+    def pop_changed_event_ids(self):
+        changed = Event.objects.filter(ongoing_cache_changed=True)
+        changed_ids = list(changed.values_list("id", flat=True))
+        # events saved after this are flagged again and handled on the next run
+        Event.objects.filter(id__in=changed_ids).update(ongoing_cache_changed=False)
+        return changed_ids
 
-        inet_events = Event.objects.filter(
-            location__id__endswith="internet",
-            end_time__gte=datetime.utcnow().replace(tzinfo=pytz.utc),
-            deleted=False,
-        ).values_list(
-            "id",
-            "name",
-            "description",
-            "short_description",
-            "name_en",
-            "description_en",
-            "short_description_en",
-            "name_sv",
-            "description_sv",
-            "short_description_sv",
-            "keywords__name_fi",
-            "keywords__name_sv",
-            "keywords__name_en",  # noqa E501
-            "location__street_address_fi",
-            "location__street_address_sv",
-            "location__name_fi",
-            "location__name_sv",
-            "location__name_en",  # noqa E501
-            "location__description_fi",
-            "location__description_sv",
-            "location__description_en",
-        )
-        event_dict = {i[0]: set() for i in inet_events}
-        for i in inet_events:
-            event_dict[i[0]].update(i[1:])
-            event_dict[i[0]].discard(None)
-
-        event_strings = {
-            k: " ".join(v).replace("\n", " ").replace("\r", " ")
-            for k, v in event_dict.items()
-        }
+    def update_index(self, index, queryset, changed_ids, now):
+        event_strings = dict(zip(index.ids, index.strings))
+        ended_ids = Event.objects.filter(
+            id__in=index.ids, end_time__lt=now
+        ).values_list("id", flat=True)
+        for event_id in (*changed_ids, *ended_ids):
+            event_strings.pop(event_id, None)
+        event_strings.update(get_event_strings(queryset.filter(id__in=changed_ids)))
+        return OngoingEventIndex(event_strings)
 
-        cache.set(
-            "internet_ids", event_strings, timeout=settings.ONGOING_EVENTS_CACHE_TIMEOUT
-        )
+    def handle(self, *args, **options):
+        now = datetime.utcnow().replace(tzinfo=pytz.utc)
+        querysets = self.get_querysets(now)
+        changed_ids = self.pop_changed_event_ids()
+
+        indexes = {}
+        if options["incremental"]:
+            indexes = cache.get_many(querysets.keys())
+            if len(indexes) < len(querysets):
+                self.stdout.write("Ongoing events cache is empty, rebuilding it.")
+                indexes = {}
+
+        if indexes:
+            indexes = {
+                key: self.update_index(indexes[key], queryset, changed_ids, now)
+                for key, queryset in querysets.items()
+            }
+        else:
+            indexes = {
+                key: OngoingEventIndex(get_event_strings(queryset))
+                for key, queryset in querysets.items()
+            }
+
+        publish_ongoing_indexes(indexes, timeout=settings.ONGOING_EVENTS_CACHE_TIMEOUT)
+        # the ongoing event filters of the cached event lists have changed
+        bump_generation("event")
@@ -0,0 +1,13 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from events.sql import rebuild_event_keyword_memberships
+
+
+class Command(BaseCommand):
+    help = "Rebuild the event keyword membership table used by the keyword filters"
+
+    def handle(self, **kwargs):
+        with transaction.atomic():
+            n_memberships = rebuild_event_keyword_memberships()
+        self.stdout.write("Rebuilt %s event keyword memberships." % n_memberships)
@@ -5,6 +5,7 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from events.models import Event, Place
+from events.response_cache import bump_generation
 
 
 class DryRun(Exception):
@@ -68,3 +69,5 @@ class Command(BaseCommand):
                     f"{old_id} -> {new_id}: {rows} events updated ({new_place.name})"
                 )
             )
+        # the queryset updates send no signals
+        bump_generation("event")
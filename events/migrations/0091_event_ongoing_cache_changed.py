@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0090_increase_image_max_length"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="ongoing_cache_changed",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
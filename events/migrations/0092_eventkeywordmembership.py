@@ -0,0 +1,68 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+POPULATE_SQL = """
+INSERT INTO events_eventkeywordmembership (event_id, keyword_id, relation)
+SELECT event_id, keyword_id, 'keywords' FROM events_event_keywords
+UNION ALL
+SELECT event_id, keyword_id, 'audience' FROM events_event_audience;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0091_event_ongoing_cache_changed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventKeywordMembership",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "relation",
+                    models.CharField(
+                        choices=[("keywords", "Keyword"), ("audience", "Audience")],
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "event",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="keyword_memberships",
+                        to="events.event",
+                    ),
+                ),
+                (
+                    "keyword",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="event_memberships",
+                        to="events.keyword",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("event", "keyword", "relation")},
+            },
+        ),
+        migrations.AddIndex(
+            model_name="eventkeywordmembership",
+            index=models.Index(
+                fields=["keyword", "event"], name="event_keyword_membership_index"
+            ),
+        ),
+        migrations.RunSQL(POPULATE_SQL, migrations.RunSQL.noop),
+    ]
@@ -18,6 +18,11 @@ attribute to change @context when need to define schemas for custom fields.
 """
 import datetime
 import logging
+import operator
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import reduce
 from smtplib import SMTPException
 
 import pytz
@@ -43,9 +48,12 @@ from rest_framework.exceptions import ValidationError
 from reversion import revisions as reversion
 
 from events import translation_utils
+from events.response_cache import bump_generation
+from events.sql import get_place_divisions
 from notifications.models import (
     NotificationTemplateException,
     NotificationType,
+    queue_email,
     render_notification_template,
 )
 
@@ -379,6 +387,8 @@ class UpcomingEventsUpdater(models.Manager):
             qs = qs.filter(deleted=False)
         qs.filter(events__end_time__gte=now).update(has_upcoming_events=True)
         qs.exclude(events__end_time__gte=now).update(has_upcoming_events=False)
+        # the queryset updates send no signals
+        bump_generation(self.model.__name__.lower())
 
 
 class Keyword(BaseModel, ImageMixin, ReplacedByMixin):
@@ -483,6 +493,12 @@ class Keyword(BaseModel, ImageMixin, ReplacedByMixin):
                     event.audience.remove(self)
                     event.audience.add(self.replaced_by)
 
+        # needed to update the ongoing events cache incrementally
+        Event.objects.filter(
+            keywords=self,
+            end_time__gte=datetime.datetime.utcnow().replace(tzinfo=pytz.utc),
+        ).update(ongoing_cache_changed=True)
+
     def can_be_edited_by(self, user):
         """Check if current keyword can be edited by the given user"""
         if user.is_superuser:
@@ -539,6 +555,54 @@ class KeywordSet(BaseModel, ImageMixin):
         super().save(*args, **kwargs)
 
 
+# the types of the divisions places are put in, by the division geometries containing them
+PLACE_DIVISION_TYPES = ("district", "sub_district", "neighborhood", "muni")
+
+_place_divisions_batch = ContextVar("place_divisions_batch", default=None)
+
+
+def update_place_divisions(place_ids):
+    """
+    Set the divisions of the places to the divisions containing their
+    positions, with one spatial join for all the places.
+    """
+    place_ids = set(place_ids)
+    if not place_ids:
+        return
+    through = Place.divisions.through
+    with transaction.atomic():
+        through.objects.filter(place_id__in=place_ids).delete()
+        through.objects.bulk_create(
+            through(place_id=place_id, administrativedivision_id=division_id)
+            for place_id, division_id in get_place_divisions(
+                place_ids, PLACE_DIVISION_TYPES
+            )
+        )
+
+
+@contextmanager
+def place_divisions_batch():
+    """
+    Defer updating the divisions of the places saved within the context, and
+    update them all at once when the outermost context exits. Meant for
+    imports saving lots of places; until the batch exits, the places keep
+    their old divisions.
+    """
+    if _place_divisions_batch.get() is not None:
+        yield
+        return
+
+    place_ids = set()
+    token = _place_divisions_batch.set(place_ids)
+    try:
+        yield
+    finally:
+        _place_divisions_batch.reset(token)
+    update_place_divisions(place_ids)
+    if place_ids:
+        bump_generation("place")
+
+
 class Place(MPTTModel, BaseModel, SchemalessFieldMixin, ImageMixin, ReplacedByMixin):
     objects = BaseTreeQuerySet.as_manager()
     upcoming_events = UpcomingEventsUpdater()
@@ -660,15 +724,17 @@ class Place(MPTTModel, BaseModel, SchemalessFieldMixin, ImageMixin, ReplacedByMi
             ]
             Place.objects.filter(id__in=ids_to_update).update(n_events_changed=True)
 
-        if self.position:
-            self.divisions.set(
-                AdministrativeDivision.objects.filter(
-                    type__type__in=("district", "sub_district", "neighborhood", "muni"),
-                    geometry__boundary__contains=self.position,
-                )
-            )
+        # needed to update the ongoing events cache incrementally
+        Event.objects.filter(
+            location=self,
+            end_time__gte=datetime.datetime.utcnow().replace(tzinfo=pytz.utc),
+        ).update(ongoing_cache_changed=True)
+
+        batch = _place_divisions_batch.get()
+        if batch is not None:
+            batch.add(self.id)
         else:
-            self.divisions.clear()
+            update_place_divisions([self.id])
 
     def is_admin(self, user):
         if user.is_superuser:
@@ -721,6 +787,114 @@ class OpeningHoursSpecification(models.Model):
         verbose_name_plural = _("opening hour specifications")
 
 
+_event_save_batch = ContextVar("event_save_batch", default=None)
+
+
+class EventSaveBatch:
+    """
+    Collects the checks and side effects of Event.save for a batch of events.
+
+    Inside `event_save_batch()`, saving an event does not query its old state
+    or its deprecated keywords, update the event numbers of its places or send
+    notifications one event at a time. The old states and the deprecated
+    keywords are read for the prefetched ids before the relations of the
+    batch are written, so that they are checked against the old keywords like
+    outside a batch, and the rest is done once the batch exits.
+    """
+
+    def __init__(self):
+        # event id to (location_id, publication_status, deleted), or None for new events
+        self.old_states = {}
+        # event id to the ids of its deprecated keywords and audience
+        self.deprecated_keywords = {}
+        self.changed_place_ids = set()
+        self.notifications = []
+
+    def prefetch_old_states(self, event_ids):
+        event_ids = set(event_ids) - self.old_states.keys()
+        if not event_ids:
+            return
+        self.old_states.update(dict.fromkeys(event_ids))
+        for event_id, *state in Event.objects.filter(id__in=event_ids).values_list(
+            "id", "location_id", "publication_status", "deleted"
+        ):
+            self.old_states[event_id] = tuple(state)
+        self.prefetch_deprecated_keywords(event_ids)
+
+    def prefetch_deprecated_keywords(self, event_ids):
+        for event_id in event_ids:
+            self.deprecated_keywords[event_id] = ([], [])
+        for index, field_name in enumerate(("keywords", "audience")):
+            through = Event._meta.get_field(field_name).remote_field.through
+            for event_id, keyword_id in through.objects.filter(
+                event_id__in=event_ids, keyword__deprecated=True
+            ).values_list("event_id", "keyword_id"):
+                self.deprecated_keywords[event_id][index].append(keyword_id)
+
+    def mark_created(self, event_id):
+        """Mark a generated id as new, so that its old state is not queried."""
+        self.old_states.setdefault(event_id, None)
+        self.deprecated_keywords.setdefault(event_id, ([], []))
+
+    def get_old_state(self, event_id):
+        if event_id not in self.old_states:
+            self.prefetch_old_states([event_id])
+        return self.old_states[event_id]
+
+    def check_deprecated_keywords(self, event_id):
+        """
+        Check the deprecated keywords the event had when it was prefetched, or
+        has now if it was not prefetched or has been saved since.
+        """
+        if event_id not in self.deprecated_keywords:
+            self.prefetch_deprecated_keywords([event_id])
+        keywords, audience = self.deprecated_keywords.pop(event_id)
+        if keywords or audience:
+            raise ValidationError(
+                {
+                    "keywords": _(
+                        "Trying to save event with deprecated keywords "
+                        + str(sorted(keywords))
+                        + " or "
+                        + str(sorted(audience))
+                        + ". Please use up-to-date keywords."
+                    )
+                }
+            )
+
+    def flush(self):
+        if self.changed_place_ids:
+            Place.objects.filter(id__in=self.changed_place_ids).update(
+                n_events_changed=True
+            )
+        for send_notification in self.notifications:
+            send_notification()
+
+
+@contextmanager
+def event_save_batch():
+    """
+    Batch the side effects of the events saved within the context, see
+    EventSaveBatch. Nested contexts join the outermost batch.
+    """
+    batch = _event_save_batch.get()
+    if batch is not None:
+        yield batch
+        return
+
+    batch = EventSaveBatch()
+    token = _event_save_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _event_save_batch.reset(token)
+    batch.flush()
+
+
+def get_event_save_batch():
+    return _event_save_batch.get()
+
+
 class Event(MPTTModel, BaseModel, SchemalessFieldMixin, ReplacedByMixin):
     jsonld_type = "Event/LinkedEvent"
     objects = BaseTreeQuerySet.as_manager()
@@ -903,6 +1077,9 @@ class Event(MPTTModel, BaseModel, SchemalessFieldMixin, ReplacedByMixin):
     # this field is redundant, but allows to avoid expensive joins when searching for local events
     local = models.BooleanField(default=False)
 
+    # set on every save, cleared when the change is applied to the ongoing events cache
+    ongoing_cache_changed = models.BooleanField(default=False, db_index=True)
+
     # these fields are populated and kept up to date by the db. See migration 0080
     search_vector_fi = SearchVectorField(null=True)
     search_vector_en = SearchVectorField(null=True)
@@ -932,23 +1109,19 @@ class Event(MPTTModel, BaseModel, SchemalessFieldMixin, ReplacedByMixin):
                 extra={"event": self},
             )
 
-        # needed to cache location event numbers
-        old_location = None
-
-        # needed for notifications
-        old_publication_status = None
-        old_deleted = None
-        created = True
+        batch = get_event_save_batch()
 
+        # needed to cache location event numbers and for notifications
+        old_state = None
         if self.id:
-            try:
-                event = Event.objects.get(id=self.id)
-                created = False
-                old_location = event.location
-                old_publication_status = event.publication_status
-                old_deleted = event.deleted
-            except Event.DoesNotExist:
-                pass
+            if batch is not None:
+                old_state = batch.get_old_state(self.id)
+            else:
+                old_state = (
+                    Event.objects.filter(id=self.id)
+                    .values_list("location_id", "publication_status", "deleted")
+                    .first()
+                )
 
         # drafts may not have times set, so check that first
         start = getattr(self, "start_time", None)
@@ -963,10 +1136,47 @@ class Event(MPTTModel, BaseModel, SchemalessFieldMixin, ReplacedByMixin):
                     }
                 )
 
-        if (
-            self.keywords.filter(deprecated=True)
-            or self.audience.filter(deprecated=True)
-        ) and (not self.deleted):
+        if not self.deleted:
+            if batch is None:
+                self._check_deprecated_keywords()
+            elif self.id:
+                batch.check_deprecated_keywords(self.id)
+
+        # if self.location__divisions__ocd_id__endswith == MUNIGEO_MUNI:
+        #     self.local = True
+
+        # needed to update the ongoing events cache incrementally
+        self.ongoing_cache_changed = True
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {
+                *kwargs["update_fields"],
+                "ongoing_cache_changed",
+            }
+
+        super().save(*args, **kwargs)
+
+        changed_place_ids = self._get_changed_place_ids(old_state)
+        notifications = self._get_notifications(old_state)
+
+        if batch is not None:
+            batch.old_states[self.id] = (
+                self.location_id,
+                self.publication_status,
+                self.deleted,
+            )
+            batch.changed_place_ids.update(changed_place_ids)
+            batch.notifications.extend(notifications)
+            return
+
+        if changed_place_ids:
+            Place.objects.filter(id__in=changed_place_ids).update(n_events_changed=True)
+        for send_notification in notifications:
+            send_notification()
+
+    def _check_deprecated_keywords(self):
+        if self.keywords.filter(deprecated=True) or self.audience.filter(
+            deprecated=True
+        ):
             raise ValidationError(
                 {
                     "keywords": _(
@@ -979,34 +1189,36 @@ class Event(MPTTModel, BaseModel, SchemalessFieldMixin, ReplacedByMixin):
                 }
             )
 
-        # if self.location__divisions__ocd_id__endswith == MUNIGEO_MUNI:
-        #     self.local = True
-
-        super().save(*args, **kwargs)
-
-        # needed to cache location event numbers
-        if not old_location and self.location:
-            Place.objects.filter(id=self.location.id).update(n_events_changed=True)
-        if old_location and not self.location:
+    def _get_changed_place_ids(self, old_state):
+        """The places whose event numbers have to be updated after saving."""
+        old_location_id = old_state[0] if old_state else None
+        if not old_location_id and self.location_id:
+            return {self.location_id}
+        if old_location_id and not self.location_id:
             # drafts (or imported events) may not always have location set
-            Place.objects.filter(id=old_location.id).update(n_events_changed=True)
-        if old_location and self.location and old_location != self.location:
-            Place.objects.filter(id__in=(old_location.id, self.location.id)).update(
-                n_events_changed=True
-            )
-
-        # send notifications
+            return {old_location_id}
+        if old_location_id and self.location_id and old_location_id != self.location_id:
+            return {old_location_id, self.location_id}
+        return set()
+
+    def _get_notifications(self, old_state):
+        """The notifications to send after saving."""
+        created = old_state is None
+        old_publication_status = old_state[1] if old_state else None
+        old_deleted = old_state[2] if old_state else None
+        notifications = []
         if (
             old_publication_status == PublicationStatus.DRAFT
             and self.publication_status == PublicationStatus.PUBLIC
         ):
-            self.send_published_notification()
+            notifications.append(self.send_published_notification)
         if self.publication_status == PublicationStatus.DRAFT and (
             old_deleted is False and self.deleted is True
         ):
-            self.send_deleted_notification()
+            notifications.append(self.send_deleted_notification)
         if created and self.publication_status == PublicationStatus.DRAFT:
-            self.send_draft_posted_notification()
+            notifications.append(self.send_draft_posted_notification)
+        return notifications
 
     def __str__(self):
         name = ""
@@ -1060,16 +1272,13 @@ class Event(MPTTModel, BaseModel, SchemalessFieldMixin, ReplacedByMixin):
         except NotificationTemplateException as e:
             logger.error(e, exc_info=True, extra={"request": request})
             return
-        try:
-            send_mail(
-                rendered_notification["subject"],
-                rendered_notification["body"],
-                "noreply@%s" % Site.objects.get_current().domain,
-                recipient_list,
-                html_message=rendered_notification["html_body"],
-            )
-        except SMTPException as e:
-            logger.error(e, exc_info=True, extra={"request": request, "event": self})
+        queue_email(
+            rendered_notification["subject"],
+            rendered_notification["body"],
+            "noreply@%s" % Site.objects.get_current().domain,
+            recipient_list,
+            html_message=rendered_notification["html_body"],
+        )
 
     def _get_author_emails(self):
         author_emails = []
@@ -1107,14 +1316,105 @@ def keyword_added_or_removed(
     sender, model=None, instance=None, pk_set=None, action=None, **kwargs
 ):
     """
-    Listens to event-keyword add signals to keep event number up to date
+    Listens to event-keyword add signals to keep event number and the ongoing
+    events cache up to date
     """
     if action in ("post_add", "post_remove"):
         if model is Keyword:
             Keyword.objects.filter(pk__in=pk_set).update(n_events_changed=True)
+            Event.objects.filter(pk=instance.pk).update(ongoing_cache_changed=True)
         if model is Event:
             instance.n_events_changed = True
             instance.save(update_fields=("n_events_changed",))
+            Event.objects.filter(pk__in=pk_set).update(ongoing_cache_changed=True)
+
+
+class EventKeywordMembership(models.Model):
+    """
+    The keywords and audience of events in a single table, so that filtering
+    events by keyword is a single semi-join and counting the events of a
+    keyword a single GROUP BY.
+
+    Maintained from the m2m_changed signals of Event.keywords and
+    Event.audience, and by the bulk writes bypassing them. The
+    rebuild_event_keyword_memberships command rebuilds the whole table.
+    """
+
+    RELATIONS = (
+        ("keywords", _("Keyword")),
+        ("audience", _("Audience")),
+    )
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name="keyword_memberships",
+        db_index=False,
+    )
+    keyword = models.ForeignKey(
+        Keyword,
+        on_delete=models.CASCADE,
+        related_name="event_memberships",
+        db_index=False,
+    )
+    relation = models.CharField(max_length=8, choices=RELATIONS)
+
+    class Meta:
+        unique_together = (("event", "keyword", "relation"),)
+        indexes = [
+            Index(name="event_keyword_membership_index", fields=("keyword", "event"))
+        ]
+
+    @classmethod
+    def add(cls, relation, pairs):
+        """Add (event_id, keyword_id) pairs of the given relation"""
+        cls.objects.bulk_create(
+            [
+                cls(event_id=event_id, keyword_id=keyword_id, relation=relation)
+                for event_id, keyword_id in pairs
+            ],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def remove(cls, relation, pairs):
+        """Remove (event_id, keyword_id) pairs of the given relation"""
+        keyword_ids_by_event = defaultdict(set)
+        for event_id, keyword_id in pairs:
+            keyword_ids_by_event[event_id].add(keyword_id)
+        if keyword_ids_by_event:
+            cls.objects.filter(
+                reduce(
+                    operator.or_,
+                    (
+                        Q(event_id=event_id, keyword_id__in=keyword_ids)
+                        for event_id, keyword_ids in keyword_ids_by_event.items()
+                    ),
+                ),
+                relation=relation,
+            ).delete()
+
+
+@receiver(m2m_changed, sender=Event.keywords.through)
+@receiver(m2m_changed, sender=Event.audience.through)
+def sync_event_keyword_memberships(
+    sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs
+):
+    relation = "keywords" if sender is Event.keywords.through else "audience"
+    if action == "post_clear":
+        field = "keyword" if reverse else "event"
+        EventKeywordMembership.objects.filter(
+            **{field: instance}, relation=relation
+        ).delete()
+    elif action in ("post_add", "post_remove") and pk_set:
+        if reverse:
+            pairs = [(pk, instance.pk) for pk in pk_set]
+        else:
+            pairs = [(instance.pk, pk) for pk in pk_set]
+        if action == "post_add":
+            EventKeywordMembership.add(relation, pairs)
+        else:
+            EventKeywordMembership.remove(relation, pairs)
 
 
 class Offer(models.Model, SimpleValueMixin):
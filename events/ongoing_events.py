@@ -0,0 +1,204 @@
+"""
+Search over the cached ongoing events used by the `*_ongoing_AND/OR` event filters.
+
+`populate_local_event_cache` stores one `OngoingEventIndex` per event group
+(local and internet events) in the cache. Each index keeps the concatenated
+search strings of the events along with a token inverted index, so that the
+fuzzy regex used by the filters runs over the vocabulary of the cached events
+instead of over every cached event string.
+
+The indexes are large, so each process keeps the unpickled indexes in memory
+and only fetches them from the shared cache again once the command publishes
+a new version of them.
+"""
+import threading
+import uuid
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from functools import reduce
+from operator import and_
+
+import regex
+from django.core.cache import cache
+
+LOCAL_INDEX_CACHE_KEY = "local_index"
+INTERNET_INDEX_CACHE_KEY = "internet_index"
+INDEX_VERSION_CACHE_KEY = "ongoing_index_version"
+
+_TOKEN_RE = regex.compile(r"\w+")
+
+
+def _terms_to_regex(terms, operator, fuzziness=3):
+    """
+    Create a  compiled regex from of the rpvided terms of the form
+    r'(\b(term1){e<2}')|(\b(term2){e<2})" This would match a string
+    with terms aligned in any order allowing two edits per term.
+    """
+
+    vals = terms.split(",")
+    valexprs = [r"(\b" + f"({val}){{e<{fuzziness}}})" for val in vals]
+    if operator == "AND":
+        regex_join = ""
+    elif operator == "OR":
+        regex_join = "|"
+    expr = f"{regex_join.join(valexprs)}"
+    return regex.compile(expr, regex.IGNORECASE)
+
+
+class OngoingEventIndex:
+    """
+    Token inverted index over ongoing event search strings.
+
+    A search term consisting of a single word is first matched with the fuzzy
+    regex against the vocabulary of the indexed events, and the events are
+    then looked up from the postings of the matching tokens. Terms with
+    whitespace, punctuation or regex syntax are matched against the full event
+    strings as before.
+
+    The only difference to scanning the full strings is that a fuzzy match
+    spanning several words of an event (e.g. "rockjazz" matching "rock jazz")
+    is not found through the vocabulary.
+    """
+
+    def __init__(self, event_strings):
+        """
+        :param event_strings: dict of event id to the event search string
+        :type event_strings: dict[str, str]
+        """
+        self.ids = list(event_strings.keys())
+        self.strings = list(event_strings.values())
+
+        postings = defaultdict(set)
+        for position, string in enumerate(self.strings):
+            for token in _TOKEN_RE.findall(string.lower()):
+                postings[token].add(position)
+
+        self.tokens = sorted(postings)
+        self.postings = [array("I", sorted(postings[token])) for token in self.tokens]
+        # the whole vocabulary is scanned with a single regex call, offsets map matches back to tokens
+        self.vocabulary = "\n".join(self.tokens)
+        self.offsets = []
+        offset = 0
+        for token in self.tokens:
+            self.offsets.append(offset)
+            offset += len(token) + 1
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _search_vocabulary(self, term, fuzziness):
+        rc = _terms_to_regex(term, "OR", fuzziness)
+        positions = set()
+        for match in rc.finditer(self.vocabulary, overlapped=True, concurrent=True):
+            index = bisect_right(self.offsets, match.start()) - 1
+            token = self.tokens[index]
+            token_end = self.offsets[index] + len(token)
+            if match.start() >= token_end:
+                # the match starts at the separator, not at a token
+                continue
+            if match.end() > token_end and not rc.match(token, concurrent=True):
+                # the match spilled over to the following tokens
+                continue
+            positions.update(self.postings[index])
+        return positions
+
+    def _search_strings(self, rc, positions=None):
+        if positions is None:
+            positions = range(len(self.ids))
+        return {
+            position
+            for position in positions
+            if rc.search(self.strings[position], concurrent=True)
+        }
+
+    def search(self, terms, operator, fuzziness=3):
+        """
+        Find the events matching the comma separated terms.
+
+        :param terms: comma separated search terms
+        :type terms: str
+        :param operator: "AND" or "OR"
+        :type operator: str
+        :return: set of matching event ids
+        :rtype: set[str]
+        """
+        rc = _terms_to_regex(terms, operator, fuzziness)
+        vals = terms.lower().split(",")
+        token_vals = [val for val in vals if _TOKEN_RE.fullmatch(val)]
+
+        if operator == "AND":
+            # terms must be found next to each other, so the vocabulary only narrows down the candidates
+            candidates = [self._search_vocabulary(val, fuzziness) for val in token_vals]
+            positions = self._search_strings(
+                rc, reduce(and_, candidates) if candidates else None
+            )
+        elif len(token_vals) == len(vals):
+            positions = set().union(
+                *(self._search_vocabulary(val, fuzziness) for val in vals)
+            )
+        else:
+            positions = self._search_strings(rc)
+        return {self.ids[position] for position in positions}
+
+
+class _IndexSnapshot:
+    """
+    Process-local copy of the cached indexes of a single published version.
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.indexes = {}
+
+
+_snapshot = _IndexSnapshot()
+_snapshot_lock = threading.Lock()
+
+
+def publish_ongoing_indexes(indexes, timeout):
+    """
+    Store the indexes in the cache and publish a new index version, so that
+    the processes serving the API reload them.
+
+    :param indexes: dict of cache key to index
+    :type indexes: dict[str, OngoingEventIndex]
+    """
+    cache.set_many(indexes, timeout=timeout)
+    cache.set(INDEX_VERSION_CACHE_KEY, uuid.uuid4().hex, timeout=timeout)
+
+
+def get_ongoing_indexes(*cache_keys):
+    """
+    Get the cached ongoing event indexes, defaulting to empty ones if the
+    cache has not been populated.
+
+    Only the small version key is read from the cache on every call, the
+    indexes themselves are served from the process-local snapshot until a new
+    version is published.
+
+    :rtype: list[OngoingEventIndex]
+    """
+    global _snapshot
+
+    version = cache.get(INDEX_VERSION_CACHE_KEY)
+    with _snapshot_lock:
+        if _snapshot.version != version:
+            _snapshot = _IndexSnapshot(version)
+        snapshot = _snapshot
+        missing = [key for key in cache_keys if key not in snapshot.indexes]
+        if missing:
+            cached = cache.get_many(missing)
+            for key in missing:
+                snapshot.indexes[key] = cached.get(key) or OngoingEventIndex({})
+    return [snapshot.indexes[key] for key in cache_keys]
+
+
+def search_ongoing_events(indexes, terms, operator):
+    """
+    Search the given indexes and combine the results.
+
+    :type indexes: Iterable[OngoingEventIndex]
+    :rtype: set[str]
+    """
+    return set().union(*(index.search(terms, operator) for index in indexes))
@@ -190,9 +190,10 @@ class DOCXRenderer(renderers.BaseRenderer):
             # Support the single event endpoint just because we can
             data = [data]
 
-        first_location = data[0]["location"]
+        # The events may be an iterator, see EventViewSet.get_docx_events
         for raw_event in data:
             parsed_events.append(event_parser.parse_event(raw_event))
+        first_location = parsed_events[0]["location"]
 
         # This is here to allow for this to be expanded to include multiple
         # locations in the future.
@@ -3,21 +3,39 @@ from rest_framework import renderers
 
 
 class JSONRenderer(renderers.JSONRenderer):
+    """
+    Render compact JSON with ujson, falling back to the DRF renderer for the
+    indented output of the browsable API.
+
+    Types ujson does not handle natively, such as datetimes and lazy
+    translation strings, are converted with the DRF JSON encoder.
+    """
+
     charset = "utf-8"
 
-    def render(self, data, media_type=None, renderer_context=None):
-        return super().render(data, media_type, renderer_context)
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = ujson.dumps(
+            data,
+            default=self.encoder_class().default,
+            ensure_ascii=False,
+            escape_forward_slashes=False,
+            reject_bytes=False,
+            allow_nan=not self.strict,
+        )
+        # escape the line separators like DRF does, they are not valid in JavaScript strings
+        ret = ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+        return ret.encode()
 
 
 class JSONLDRenderer(JSONRenderer):
     media_type = "application/ld+json"
     format = "json-ld"
     charset = "utf-8"
-
-
-class UJSONRenderer(renderers.BaseRenderer):
-    media_type = "application/json"
-    format = "json"
-
-    def render(self, data, accepted_media_type=None, renderer_context=None):
-        return ujson.dumps(data, escape_forward_slashes=False)
@@ -0,0 +1,19 @@
+from events.renderers.json import JSONRenderer
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    Render a list as newline delimited JSON, one object per line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, media_type=None, renderer_context=None):
+        if not isinstance(data, list):
+            data = [data]
+        return b"".join(
+            super(NDJSONRenderer, self).render(item, media_type, renderer_context)
+            + b"\n"
+            for item in data
+        )
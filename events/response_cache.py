@@ -0,0 +1,116 @@
+"""
+Caching of the rendered list and detail responses served to anonymous users.
+
+Every cache key contains the current generation of each resource type the
+response is built from. Saving or deleting an object bumps the generation of
+its resource type, so that the responses cached before the change are never
+served again and simply expire from the cache.
+"""
+import hashlib
+import json
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+GENERATION_CACHE_KEY = "response_cache_generation:%s"
+RESPONSE_CACHE_KEY = "response_cache:%s"
+
+CACHEABLE_ACTIONS = ("list", "retrieve", "tiles")
+CACHEABLE_FORMATS = ("json", "json-ld")
+# these parameters show non-public data to authenticated users
+UNCACHEABLE_PARAMS = ("show_all", "admin_user", "created_by")
+
+
+def _incr_generations(resources):
+    for resource in resources:
+        key = GENERATION_CACHE_KEY % resource
+        try:
+            cache.incr(key)
+        except ValueError:
+            # a lost counter must not restart from a generation that was already used
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump_generation(*resources):
+    """
+    Invalidate the cached responses built from the given resource types.
+
+    The generations are bumped again once the transaction is committed, as
+    concurrent requests may cache the data from before the commit meanwhile.
+    """
+    _incr_generations(resources)
+    transaction.on_commit(partial(_incr_generations, resources))
+
+
+def get_generations(resources):
+    keys = [GENERATION_CACHE_KEY % resource for resource in resources]
+    generations = cache.get_many(keys)
+    return [generations.get(key) for key in keys]
+
+
+class ResponseCacheMixin(object):
+    """
+    Serve the list, retrieve and tiles actions of anonymous users from the cache.
+
+    `response_cache_resources` lists the resource types whose changes
+    invalidate the cached responses of the viewset.
+    """
+
+    response_cache_resources = ()
+
+    def get_response_cache_key(self, request):
+        if (
+            not self.response_cache_resources
+            or request.method != "GET"
+            or self.action not in CACHEABLE_ACTIONS
+            or request.user.is_authenticated
+            or request.accepted_renderer.format not in CACHEABLE_FORMATS
+            or any(param in request.query_params for param in UNCACHEABLE_PARAMS)
+        ):
+            return None
+        params = sorted(request.query_params.lists())
+        key = json.dumps(
+            [
+                get_generations(self.response_cache_resources),
+                request.version,
+                request.accepted_media_type,
+                request.build_absolute_uri(request.path),
+                params,
+            ]
+        )
+        return RESPONSE_CACHE_KEY % hashlib.md5(key.encode()).hexdigest()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.response_cache_key = self.get_response_cache_key(request)
+        if self.response_cache_key is None:
+            return
+        cached = cache.get(self.response_cache_key)
+        if cached is not None:
+            content, content_type = cached
+            # replace the action handler bound by the viewset with the cached response
+            setattr(
+                self,
+                request.method.lower(),
+                lambda *args, **kwargs: HttpResponse(
+                    content, content_type=content_type
+                ),
+            )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, "response_cache_key", None)
+        if key and isinstance(response, Response) and response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key,
+                    (rendered.content, rendered["Content-Type"]),
+                    timeout=settings.RESPONSE_CACHE_TIMEOUT,
+                )
+            )
+        return response
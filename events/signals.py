@@ -1,15 +1,18 @@
 import logging
-from smtplib import SMTPException
 
 from django.contrib.auth import get_user_model
 from django.contrib.sites.models import Site
-from django.core.mail import send_mail
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
+from events.divisions import clear_division_ids
+from events.keywords import clear_keyword_replacements
+from events.models import Event
+from events.response_cache import bump_generation
 from notifications.models import (
     NotificationTemplateException,
     NotificationType,
+    queue_email,
     render_notification_template,
 )
 
@@ -60,13 +63,86 @@ def user_created_notification(sender, instance, created, **kwargs):
         except NotificationTemplateException as e:
             logger.error(e, exc_info=True)
             return
-        try:
-            send_mail(
-                rendered_notification["subject"],
-                rendered_notification["body"],
-                "noreply@%s" % Site.objects.get_current().domain,
-                recipient_list,
-                html_message=rendered_notification["html_body"],
-            )
-        except SMTPException as e:
-            logger.error(e, exc_info=True, extra={"user": instance})
+        queue_email(
+            rendered_notification["subject"],
+            rendered_notification["body"],
+            "noreply@%s" % Site.objects.get_current().domain,
+            recipient_list,
+            html_message=rendered_notification["html_body"],
+        )
+
+
+RESPONSE_CACHE_RESOURCES = {
+    "events.Event": "event",
+    "events.Offer": "event",
+    "events.EventLink": "event",
+    "events.Video": "event",
+    "events.Place": "place",
+    "events.Keyword": "keyword",
+    "events.Image": "image",
+    "registrations.Registration": "registration",
+    "registrations.SignUp": "registration",
+}
+
+
+def invalidate_response_cache(sender, **kwargs):
+    """Invalidate the cached API responses built from the changed resource."""
+    bump_generation(RESPONSE_CACHE_RESOURCES[sender._meta.label])
+
+
+for model in RESPONSE_CACHE_RESOURCES:
+    post_save.connect(
+        invalidate_response_cache,
+        sender=model,
+        dispatch_uid="response_cache_saved_%s" % model,
+    )
+    post_delete.connect(
+        invalidate_response_cache,
+        sender=model,
+        dispatch_uid="response_cache_deleted_%s" % model,
+    )
+
+
+@receiver(m2m_changed, sender=Event.keywords.through)
+@receiver(m2m_changed, sender=Event.audience.through)
+@receiver(m2m_changed, sender=Event.in_language.through)
+@receiver(m2m_changed, sender=Event.images.through)
+def event_relations_changed(sender, action, **kwargs):
+    """Invalidate the cached event responses when event relations change."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_generation("event")
+
+
+@receiver(post_save, sender="events.Keyword", dispatch_uid="keyword_replacements_saved")
+@receiver(
+    post_delete, sender="events.Keyword", dispatch_uid="keyword_replacements_deleted"
+)
+def keyword_changed(sender, **kwargs):
+    """Forget the keyword replacements cached in this process."""
+    clear_keyword_replacements()
+
+
+@receiver(
+    post_save,
+    sender="munigeo.AdministrativeDivision",
+    dispatch_uid="division_ids_division_saved",
+)
+@receiver(
+    post_delete,
+    sender="munigeo.AdministrativeDivision",
+    dispatch_uid="division_ids_division_deleted",
+)
+@receiver(
+    post_save,
+    sender="munigeo.AdministrativeDivisionTranslation",
+    dispatch_uid="division_ids_translation_saved",
+)
+@receiver(
+    post_delete,
+    sender="munigeo.AdministrativeDivisionTranslation",
+    dispatch_uid="division_ids_translation_deleted",
+)
+def division_changed(sender, **kwargs):
+    """Forget the division filter values resolved in this and other processes."""
+    clear_division_ids()
+    bump_generation("division")
@@ -12,33 +12,24 @@ def count_events_for_keywords(keyword_ids=(), all=False):
     :return: dict of keyword id to count
     :rtype: dict[str, int]
     """
-    # sorry for the non-DRY-ness; would be easier with an SQL generator like SQLAlchemy, but...
-
     keyword_ids = tuple(set(keyword_ids))
     with connection.cursor() as cursor:
         if keyword_ids:
             cursor.execute(
                 """
-            SELECT t.keyword_id, COUNT(DISTINCT t.event_id)
-            FROM (
-              SELECT keyword_id, event_id FROM events_event_keywords WHERE keyword_id IN %s
-              UNION
-              SELECT keyword_id, event_id FROM events_event_audience WHERE keyword_id IN %s
-            ) t
-            GROUP BY t.keyword_id;
+            SELECT keyword_id, COUNT(DISTINCT event_id)
+            FROM events_eventkeywordmembership
+            WHERE keyword_id IN %s
+            GROUP BY keyword_id;
             """,
-                [keyword_ids, keyword_ids],
+                [keyword_ids],
             )
         elif all:
             cursor.execute(
                 """
-            SELECT t.keyword_id, COUNT(DISTINCT t.event_id)
-            FROM (
-              SELECT keyword_id, event_id FROM events_event_keywords
-              UNION
-              SELECT keyword_id, event_id FROM events_event_audience
-            ) t
-            GROUP BY t.keyword_id;
+            SELECT keyword_id, COUNT(DISTINCT event_id)
+            FROM events_eventkeywordmembership
+            GROUP BY keyword_id;
             """
             )
         else:
@@ -82,3 +73,85 @@ def count_events_for_places(place_ids=(), all=False):
         else:
             return {}
         return dict(cursor.fetchall())
+
+
+def get_keyword_replacements(keyword_ids, max_depth=10):
+    """
+    Get the final replacements of the given keywords, following the replaced_by
+    chains in a single query.
+
+    :param keyword_ids: set of keyword ids
+    :type keyword_ids: Iterable[str]
+    :param max_depth: maximum length of the followed replacement chains
+    :type max_depth: int
+    :return: dict of keyword id to the id of its final replacement, or to
+        itself if it is not replaced. Unknown keyword ids are left out.
+    :rtype: dict[str, str]
+    """
+    keyword_ids = tuple(set(keyword_ids))
+    if not keyword_ids:
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+        WITH RECURSIVE chain(id, replacement_id, depth) AS (
+          SELECT id, replaced_by_id, 0 FROM events_keyword WHERE id IN %s
+          UNION ALL
+          SELECT chain.id, k.replaced_by_id, chain.depth + 1
+          FROM chain JOIN events_keyword k ON k.id = chain.replacement_id
+          WHERE chain.depth < %s
+        )
+        SELECT DISTINCT ON (id) id, COALESCE(replacement_id, id)
+        FROM chain
+        ORDER BY id, replacement_id IS NULL, depth DESC;
+        """,
+            [keyword_ids, max_depth],
+        )
+        return dict(cursor.fetchall())
+
+
+def rebuild_event_keyword_memberships():
+    """
+    Rebuild the event keyword membership table from the keywords and audience
+    of the events. Writes to the table are blocked until the end of the
+    transaction, which the caller must open.
+
+    :return: number of memberships
+    :rtype: int
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE events_eventkeywordmembership IN EXCLUSIVE MODE;")
+        cursor.execute("DELETE FROM events_eventkeywordmembership;")
+        cursor.execute(
+            """
+        INSERT INTO events_eventkeywordmembership (event_id, keyword_id, relation)
+        SELECT event_id, keyword_id, 'keywords' FROM events_event_keywords
+        UNION ALL
+        SELECT event_id, keyword_id, 'audience' FROM events_event_audience;
+        """
+        )
+        return cursor.rowcount
+
+
+def get_place_divisions(place_ids, division_types):
+    """
+    Find the divisions of the given types containing the positions of the
+    places, with one spatial join for all the places.
+
+    :return: list of (place id, division id)
+    :rtype: list[tuple[str, int]]
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+        SELECT p.id, d.id
+        FROM events_place p
+        JOIN munigeo_administrativedivisiongeometry g
+          ON ST_Contains(g.boundary, p.position)
+        JOIN munigeo_administrativedivision d ON d.id = g.division_id
+        JOIN munigeo_administrativedivisiontype t ON t.id = d.type_id
+        WHERE p.id IN %s AND t.type IN %s;
+        """,
+            [tuple(place_ids), tuple(division_types)],
+        )
+        return cursor.fetchall()
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 
 # 3rd party
 from django.contrib.gis.geos import MultiPolygon, Point, Polygon
+from django.core.cache import cache
 
 # django
 from django.utils import timezone
@@ -14,6 +15,8 @@ from munigeo.models import (
 from parler.utils.context import switch_language
 
 from events.api import KeywordSerializer, LanguageSerializer, PlaceSerializer
+from events.divisions import clear_division_ids
+from events.keywords import clear_keyword_replacements
 
 # events
 from events.models import (
@@ -45,6 +48,17 @@ def setup_env(settings):
     settings.SUPPORT_EMAIL = "test@test.com"
 
 
+@pytest.fixture(autouse=True)
+def clear_keyword_replacement_cache():
+    # the database is rolled back between the tests without any signals
+    clear_keyword_replacements()
+
+
+@pytest.fixture(autouse=True)
+def clear_division_id_cache():
+    clear_division_ids()
+
+
 @pytest.fixture
 def image_name():
     return "tunnettu_kuva"
@@ -783,3 +797,13 @@ def registration4(event4, user):
         confirmation_message="Your registration is confirmed",
         waiting_list_capacity=20,
     )
+
+
+@pytest.fixture
+def locmem_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    yield
+    cache.clear()
@@ -1,15 +1,22 @@
+from datetime import timedelta
 from unittest.mock import MagicMock
 
 import pytest
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import NoReverseMatch
+from django.utils import timezone
 from django_orghierarchy.models import Organization
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.request import Request
+from rest_framework.reverse import reverse as drf_reverse
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.versioning import URLPathVersioning
 
 from ..api import (
     EventSerializer,
     get_authenticated_data_source_and_publisher,
+    get_detail_url_builder,
     OrganizationListSerializer,
 )
 from ..auth import ApiKeyAuth
@@ -268,3 +275,118 @@ class TestImageAPI(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["data"]), 1)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("sort", ["", "-last_modified_time", "start_time", "-end_time"])
+def test_api_cursor_pagination(api_client, make_event, sort):
+    now = timezone.now()
+    events = [
+        make_event(
+            "cursor-%d" % i,
+            start_time=now + timedelta(hours=i % 3),
+            end_time=now + timedelta(hours=i % 3 + 1),
+        )
+        for i in range(7)
+    ]
+    # events without times are listed last
+    events.append(make_event("cursor-no-time"))
+
+    url = reverse("event-list") + "?page_size=3&cursor="
+    if sort:
+        url += "&sort=" + sort
+    seen = []
+    while url:
+        resp = api_client.get(url)
+        assert resp.status_code == 200
+        assert resp.data["meta"]["count"] is None
+        seen += [event["id"] for event in resp.data["data"]]
+        url = resp.data["meta"]["next"]
+
+    assert len(seen) == len(events)
+    assert set(seen) == {event.id for event in events}
+    if sort in ("start_time", "-end_time"):
+        assert seen[-1] == events[-1].id
+
+
+@pytest.mark.django_db
+def test_api_cursor_pagination_unsupported_sort(api_client, event):
+    resp = api_client.get(reverse("event-list") + "?cursor=&sort=name")
+    assert resp.status_code == 400
+
+    resp = api_client.get(reverse("event-list") + "?cursor=invalid")
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_api_count_exact(api_client, event):
+    resp = api_client.get(reverse("event-list"))
+    assert resp.data["meta"]["count"] == 1
+    assert resp.data["meta"]["count_exact"] is True
+
+
+@pytest.mark.django_db
+def test_api_count_cached(api_client, locmem_cache, make_event):
+    make_event("count-1")
+    resp = api_client.get(reverse("event-list") + "?count=cached")
+    assert resp.data["meta"]["count"] == 1
+    assert resp.data["meta"]["count_exact"] is True
+
+    make_event("count-2")
+    resp = api_client.get(reverse("event-list") + "?count=cached&page_size=1")
+    assert resp.data["meta"]["count"] == 1
+    assert resp.data["meta"]["count_exact"] is False
+
+    # different filters are counted separately
+    resp = api_client.get(reverse("event-list") + "?count=cached&text=tapahtuma")
+    assert resp.data["meta"]["count"] == 2
+    assert resp.data["meta"]["count_exact"] is True
+
+
+@pytest.mark.django_db
+def test_api_count_estimate(api_client, settings, make_event):
+    make_event("count-1")
+    resp = api_client.get(reverse("event-list") + "?count=estimate")
+    assert resp.data["meta"]["count"] == 1
+    assert resp.data["meta"]["count_exact"] is True
+
+    settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD = -1
+    resp = api_client.get(reverse("event-list") + "?count=estimate")
+    assert resp.data["meta"]["count_exact"] is False
+
+
+@pytest.mark.django_db
+def test_api_count_invalid(api_client, event):
+    resp = api_client.get(reverse("event-list") + "?count=all")
+    assert resp.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "view_name,pk",
+    [
+        ("event-detail", "helsinki:agk4xbs2ra"),
+        ("event-detail", "ds:a b ä"),
+        ("keyword-detail", "yso:p1235"),
+        ("image-detail", 123),
+    ],
+)
+def test_detail_url_builder(view_name, pk):
+    request = Request(APIRequestFactory().get("/v1/event/"))
+    request.versioning_scheme = URLPathVersioning()
+    request.version = "v1"
+
+    builder = get_detail_url_builder(request)
+
+    assert builder is get_detail_url_builder(request)
+    assert builder.build(view_name, pk) == drf_reverse(
+        view_name, kwargs={"pk": pk}, request=request
+    )
+
+
+def test_detail_url_builder_invalid_pk():
+    request = Request(APIRequestFactory().get("/v1/event/"))
+    request.versioning_scheme = URLPathVersioning()
+    request.version = "v1"
+
+    with pytest.raises(NoReverseMatch):
+        get_detail_url_builder(request).build("event-detail", "ds:a/b")
@@ -1,8 +1,37 @@
+from datetime import timedelta
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from events.models import Offer
+from events.renderers import DOCXRenderer
 
 from .utils import versioned_reverse as reverse
 
 
+def get_docx(api_client, place, query=""):
+    return api_client.get(
+        reverse("event-list")
+        + "?format=docx&location=%s%s" % (place.id.replace(" ", "%20"), query)
+    )
+
+
+class RecordingDocument:
+    def __init__(self):
+        self.contents = []
+
+    def add_heading(self, text, level):
+        self.contents.append(text)
+
+    def add_paragraph(self, text):
+        self.contents.append(text)
+
+    def save(self, output):
+        pass
+
+
 @pytest.mark.django_db
 def test_docx_renderer(api_client, event, place):
     event.description_en = "Test event English description"
@@ -10,8 +39,47 @@ def test_docx_renderer(api_client, event, place):
     event.headline = "Test event headline"
     event.save()
 
-    response = api_client.get(
-        reverse("event-list")
-        + "?format=docx&location=%s" % (place.id.replace(" ", "%20"))
-    )
+    response = get_docx(api_client, place)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_docx_renderer_contents(api_client, make_event, place, monkeypatch):
+    document = RecordingDocument()
+    monkeypatch.setattr(DOCXRenderer, "get_document", lambda self: document)
+    start_time = timezone.now().replace(hour=10, minute=0) + timedelta(days=1)
+    event = make_event("docx", start_time, start_time + timedelta(hours=2))
+    event.short_description_fi = "<p>Lyhyt kuvaus</p>"
+    event.save()
+    Offer.objects.create(event=event, price_en="10 €")
+
+    response = get_docx(api_client, place)
+
     assert response.status_code == 200
+    # location, date range, day and the event heading with the time
+    assert document.contents[3].endswith(" tapahtuma")
+    assert document.contents[4:] == ["Lyhyt kuvaus", "10 €"]
+
+
+@pytest.mark.django_db
+def test_docx_renderer_num_queries(api_client, make_event, place):
+    start_time = timezone.now() + timedelta(days=1)
+    event = make_event("docx-1", start_time, start_time + timedelta(hours=1))
+    Offer.objects.create(event=event, price_fi="5 €")
+    with CaptureQueriesContext(connection) as one_event:
+        assert get_docx(api_client, place).status_code == 200
+
+    for i in range(2, 6):
+        event = make_event(f"docx-{i}", start_time, start_time + timedelta(hours=1))
+        Offer.objects.create(event=event, price_fi="5 €")
+    with CaptureQueriesContext(connection) as many_events:
+        assert get_docx(api_client, place).status_code == 200
+
+    assert len(many_events) == len(one_event)
+
+
+@pytest.mark.django_db
+def test_docx_renderer_multiple_locations(api_client, event, event2, place, place2):
+    response = get_docx(api_client, place, ",%s" % place2.id)
+    assert response.status_code == 400
+    assert "Only one location allowed." in str(response.content)
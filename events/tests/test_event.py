@@ -1,6 +1,12 @@
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.exceptions import ValidationError
 
+from events.models import event_save_batch, EventKeywordMembership, Place
+from events.sql import count_events_for_keywords
+
 
 @pytest.mark.django_db
 def test_event_cannot_have_deprecated_keyword(event, keyword):
@@ -45,3 +51,102 @@ def test_prevent_circular_event_replacement(event, event2, event3):
     event3.replaced_by = event
     with pytest.raises(Exception):
         event.save()
+
+
+@pytest.mark.django_db
+def test_event_save_batch_checks_deprecated_keywords(event, event2, keyword):
+    keyword.deprecated = True
+    keyword.save()
+    with pytest.raises(ValidationError):
+        with event_save_batch():
+            event.save()
+            event2.audience.set([keyword])
+            event2.save()
+
+
+@pytest.mark.django_db
+def test_event_save_batch_checks_keywords_before_relation_writes(
+    event, event2, keyword, keyword2
+):
+    keyword.deprecated = True
+    keyword.save()
+    event.keywords.set([keyword])
+
+    # like a single save, the keywords the event has when it is saved are checked
+    with pytest.raises(ValidationError):
+        with event_save_batch() as batch:
+            batch.prefetch_old_states([event.id])
+            event.keywords.set([keyword2])
+            event.save()
+
+    event.keywords.set([keyword2])
+    with event_save_batch() as batch:
+        batch.prefetch_old_states([event.id, event2.id])
+        event.save()
+        event2.save()
+        event.keywords.set([keyword])
+        event2.keywords.set([keyword])
+
+
+@pytest.mark.django_db
+def test_event_save_batch_updates_places_on_exit(event, event2, place, place2):
+    Place.objects.update(n_events_changed=False)
+
+    with event_save_batch() as batch:
+        batch.prefetch_old_states([event.id, event2.id])
+        with CaptureQueriesContext(connection) as queries:
+            event.location = place2
+            event.save()
+            event2.save()
+        assert not Place.objects.filter(n_events_changed=True).exists()
+
+    # the old states are not fetched again and the places are updated on exit
+    sqls = [query["sql"] for query in queries]
+    assert not [sql for sql in sqls if sql.startswith('SELECT "events_event"')]
+    assert not [sql for sql in sqls if sql.startswith('UPDATE "events_place"')]
+    assert set(Place.objects.filter(n_events_changed=True)) == {place, place2}
+
+
+def get_memberships():
+    return set(
+        EventKeywordMembership.objects.values_list("event_id", "keyword_id", "relation")
+    )
+
+
+@pytest.mark.django_db
+def test_event_keyword_memberships_follow_keywords_and_audience(
+    event, event2, keyword, keyword2
+):
+    event.keywords.add(keyword, keyword2)
+    event.audience.add(keyword)
+    keyword2.events.add(event2)
+    assert get_memberships() == {
+        (event.id, keyword.id, "keywords"),
+        (event.id, keyword2.id, "keywords"),
+        (event.id, keyword.id, "audience"),
+        (event2.id, keyword2.id, "keywords"),
+    }
+    assert count_events_for_keywords([keyword.id, keyword2.id]) == {
+        keyword.id: 1,
+        keyword2.id: 2,
+    }
+
+    event.keywords.remove(keyword)
+    keyword2.events.clear()
+    assert get_memberships() == {(event.id, keyword.id, "audience")}
+
+    event.audience.set([keyword2])
+    assert get_memberships() == {(event.id, keyword2.id, "audience")}
+
+
+@pytest.mark.django_db
+def test_rebuild_event_keyword_memberships(event, keyword, keyword2):
+    event.keywords.add(keyword)
+    event.audience.add(keyword2)
+    EventKeywordMembership.objects.all().delete()
+
+    call_command("rebuild_event_keyword_memberships")
+    assert get_memberships() == {
+        (event.id, keyword.id, "keywords"),
+        (event.id, keyword2.id, "audience"),
+    }
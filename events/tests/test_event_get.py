@@ -1,3 +1,4 @@
+import json
 from datetime import datetime, timedelta
 
 import pytest
@@ -6,8 +7,15 @@ from dateutil import parser
 from django.conf import settings
 from django.contrib.gis.gdal import CoordTransform, SpatialReference
 from django.contrib.gis.geos import Point
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from freezegun import freeze_time
+from munigeo.models import AdministrativeDivision
+from parler.utils.context import switch_language
 
+from events.api import EventViewSet
+from events.divisions import resolve_division_ids
+from events.keywords import resolve_keyword_ids
 from events.models import Event, Language, PublicationStatus
 from events.tests.conftest import APIClient
 from events.tests.utils import assert_fields_exist, datetime_zone_aware, get
@@ -404,6 +412,46 @@ def test_get_event_list_verify_replaced_keyword_filter(
     get_list_and_assert_events("keyword=unknown_keyword", [])
 
 
+@pytest.mark.django_db
+def test_get_event_list_verify_replaced_keyword_chain_filters(
+    api_client, keyword, keyword2, keyword3, event, event2
+):
+    event.keywords.add(keyword3)
+    event2.audience.add(keyword3)
+    keyword2.replaced_by = keyword3
+    keyword2.deleted = True
+    keyword2.save()
+    keyword.replaced_by = keyword2
+    keyword.deleted = True
+    keyword.save()
+
+    get_list_and_assert_events(f"keyword={keyword.id}", [event, event2])
+    get_list_and_assert_events(
+        f"keyword_OR={keyword.id},{keyword2.id}", [event, event2]
+    )
+    get_list_and_assert_events(
+        f"keyword_AND={keyword.id},{keyword3.id}", [event, event2]
+    )
+    get_list_and_assert_events(f"keyword!={keyword.id}", [])
+    get_list_and_assert_events(f"keyword_OR_set1={keyword2.id}", [event])
+
+
+@pytest.mark.django_db
+def test_resolve_keyword_ids_is_cached(keyword, keyword2, django_assert_num_queries):
+    keyword.replaced_by = keyword2
+    keyword.save()
+
+    with django_assert_num_queries(1):
+        resolved = resolve_keyword_ids([keyword.id, keyword2.id, "unknown"])
+    assert resolved == {keyword.id: keyword2.id, keyword2.id: keyword2.id}
+    with django_assert_num_queries(0):
+        assert resolve_keyword_ids([keyword.id, "unknown"]) == {keyword.id: keyword2.id}
+
+    keyword.replaced_by = None
+    keyword.save()
+    assert resolve_keyword_ids([keyword.id]) == {keyword.id: keyword.id}
+
+
 @pytest.mark.django_db
 def test_get_event_list_verify_division_filter(
     api_client, event, event2, event3, administrative_division, administrative_division2
@@ -418,6 +466,75 @@ def test_get_event_list_verify_division_filter(
     )  # noqa E501
 
 
+@pytest.mark.django_db
+def test_resolve_division_ids_is_cached(
+    administrative_division, administrative_division2, django_assert_num_queries
+):
+    ocd_ids = [administrative_division.ocd_id, administrative_division2.ocd_id]
+    with django_assert_num_queries(1):
+        resolved = resolve_division_ids([*ocd_ids, "unknown"])
+    assert resolved == {administrative_division.id, administrative_division2.id}
+    with django_assert_num_queries(0):
+        assert resolve_division_ids(ocd_ids[:1]) == {administrative_division.id}
+
+    administrative_division.save()
+    with django_assert_num_queries(1):
+        assert resolve_division_ids(ocd_ids[:1]) == {administrative_division.id}
+
+
+@pytest.mark.django_db
+def test_division_filter_values_matching_the_same_division(
+    api_client, settings, event, event2, administrative_division_type
+):
+    settings.MUNIGEO_COUNTRY = "country:fi"
+    settings.MUNIGEO_MUNI = "kunta:helsinki"
+    ocd_id = "ocd-division/country:fi/kunta:helsinki/osa-alue:kamppi"
+    division = AdministrativeDivision.objects.create(
+        type=administrative_division_type, ocd_id=ocd_id
+    )
+    with switch_language(division, "fi"):
+        division.name = "Kamppi"
+        division.save()
+    event.location.divisions.set([division])
+
+    values = ["kamppi", "Kamppi", "osa-alue:kamppi", ocd_id]
+    get_list_and_assert_events(f"division={','.join(values)}", [event])
+    for value in values:
+        get_list_and_assert_events(f"division={value}", [event])
+
+
+@pytest.mark.django_db
+def test_event_list_multi_valued_filters_do_not_duplicate_events(
+    api_client,
+    event,
+    keyword,
+    keyword2,
+    administrative_division,
+    administrative_division2,
+):
+    event.keywords.add(keyword, keyword2)
+    event.audience.add(keyword)
+    event.in_language.add(
+        Language.objects.get_or_create(id="fi")[0],
+        Language.objects.get_or_create(id="sv")[0],
+    )
+    event.location.divisions.set([administrative_division, administrative_division2])
+    query = (
+        f"start=2000-01-01&end=2100-01-01&keyword={keyword.id},{keyword2.id}"
+        f"&division={administrative_division.ocd_id},{administrative_division2.ocd_id}"
+        "&in_language=fi,sv&language=fi,sv"
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        response = get_list(api_client, query_string=query)
+
+    assert [e["id"] for e in response.data["data"]] == [event.id]
+    assert response.data["meta"]["count"] == 1
+    event_queries = [q["sql"] for q in queries if 'FROM "events_event"' in q["sql"]]
+    assert event_queries
+    assert not [sql for sql in event_queries if "DISTINCT" in sql]
+
+
 @pytest.mark.django_db
 def test_get_event_list_super_event_filters(api_client, event, event2):
     event.super_event_type = Event.SuperEventType.RECURRING
@@ -1007,6 +1124,17 @@ def test_keywordset_search(
     )
 
 
+@pytest.mark.django_db
+def test_empty_keywordset_search(api_client, event, keyword, keyword_set):
+    event.keywords.add(keyword)
+    get_list_and_assert_events(f"keyword_set_AND={keyword_set.id}", [event])
+
+    # a keyword set without keywords matches no events
+    keyword_set.keywords.clear()
+    get_list_and_assert_events(f"keyword_set_AND={keyword_set.id}", [])
+    get_list_and_assert_events(f"keyword_set_OR={keyword_set.id}", [])
+
+
 @pytest.mark.django_db
 def test_keyword_or_set_search(
     api_client,
@@ -1135,3 +1263,83 @@ def test_get_event_list_verify_registration_filter(
     event3.save()
     get_list_and_assert_events(f"registration=true", [event, event2])
     get_list_and_assert_events(f"registration=false", [event3])
+
+
+def _make_recurring_event(make_event, origin_id, n_sub_events=2):
+    super_event = make_event(origin_id)
+    super_event.super_event_type = Event.SuperEventType.RECURRING
+    super_event.save()
+    for i in range(n_sub_events):
+        sub_event = make_event(f"{origin_id}-{i}")
+        sub_event.super_event = super_event
+        sub_event.save()
+    deleted_sub_event = make_event(f"{origin_id}-deleted")
+    deleted_sub_event.super_event = super_event
+    deleted_sub_event.deleted = True
+    deleted_sub_event.save()
+    return super_event
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["super_event_type=recurring", "include=sub_events"])
+def test_get_event_list_sub_events_num_queries(api_client, make_event, query):
+    _make_recurring_event(make_event, "recurring-1")
+    with CaptureQueriesContext(connection) as one_super_event:
+        response = get_list(api_client, query_string=query)
+    assert len(response.data["data"][0]["sub_events"]) == 2
+
+    for i in range(2, 5):
+        _make_recurring_event(make_event, f"recurring-{i}")
+    with CaptureQueriesContext(connection) as many_super_events:
+        response = get_list(api_client, query_string=query)
+
+    assert all(
+        len(event["sub_events"]) == 2
+        for event in response.data["data"]
+        if event["super_event_type"] == Event.SuperEventType.RECURRING
+    )
+    assert len(many_super_events) == len(one_super_event)
+
+
+@pytest.mark.django_db
+def test_get_event_list_expanded_fields_match_detail(
+    api_client, event, event2, keyword, keyword2, user
+):
+    event.keywords.set([keyword, keyword2])
+    event2.keywords.set([keyword])
+    api_client.force_authenticate(user=user)
+    query = "include=location,keywords"
+
+    response = get_list(api_client, query_string=query)
+
+    # the expanded fields are serialized with the same serializers for all events in the list
+    assert len(response.data["data"]) == 2
+    for data in response.data["data"]:
+        detail_url = reverse("event-detail", version="v1", kwargs={"pk": data["id"]})
+        detail = get(api_client, f"{detail_url}?{query}").data
+        del detail["@context"]
+        assert data == detail
+
+
+def get_ndjson(api_client, url):
+    response = api_client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    lines = b"".join(response.streaming_content).splitlines()
+    return response, [json.loads(line) for line in lines]
+
+
+@pytest.mark.django_db
+def test_get_event_list_ndjson(api_client, event, event2, event3, monkeypatch):
+    monkeypatch.setattr(EventViewSet, "export_chunk_size", 2)
+    list_url = reverse("event-list", version="v1")
+
+    response, data = get_ndjson(api_client, f"{list_url}?format=ndjson")
+
+    listed = get_list(api_client, query_string="sort=last_modified_time").json()
+    assert data == listed["data"]
+
+    event2.save()
+    next_url = response["Link"].split(">")[0][1:]
+    response, data = get_ndjson(api_client, next_url)
+    assert [item["id"] for item in data] == [event2.id]
@@ -11,6 +11,7 @@ from django.utils.encoding import force_text
 
 from events.auth import ApiKeyUser
 from events.models import Event, Keyword, Place
+from events.tests.test_event import get_memberships
 from events.tests.utils import assert_event_data_is_equal
 
 from .utils import versioned_reverse as reverse
@@ -40,6 +41,12 @@ def create_with_post(api_client, event_data, data_source=None):
     return resp2
 
 
+def get_listed_event_ids(api_client, query):
+    response = api_client.get("%s?%s" % (reverse("event-list"), query))
+    assert response.status_code == 200, str(response.content)
+    return {event["id"] for event in response.data["data"]}
+
+
 # === tests ===
 
 
@@ -655,6 +662,98 @@ def test_multiple_event_creation(api_client, minimal_event_dict, user):
     assert event_names == {"testaus", "testaus_2"}
 
 
+@pytest.mark.django_db
+def test_multiple_event_creation_related_objects(
+    api_client, minimal_event_dict, user, languages
+):
+    api_client.force_authenticate(user)
+    minimal_event_dict["in_language"] = [
+        {"@id": reverse("language-detail", kwargs={"pk": "fi"})}
+    ]
+    minimal_event_dict_2 = deepcopy(minimal_event_dict)
+    minimal_event_dict_2["name"]["fi"] = "testaus_2"
+    minimal_event_dict_2["offers"].append({"is_free": True})
+    minimal_event_dict_2["in_language"] = []
+    Keyword.objects.update(n_events_changed=False)
+
+    response = api_client.post(
+        reverse("event-list"), [minimal_event_dict, minimal_event_dict_2], format="json"
+    )
+    assert response.status_code == 201
+
+    for data, event_dict in zip(
+        response.data, [minimal_event_dict, minimal_event_dict_2]
+    ):
+        assert_event_data_is_equal(event_dict, data)
+        event = Event.objects.get(id=data["id"])
+        assert event.offers.count() == len(event_dict["offers"])
+        assert event.keywords.count() == 1
+        assert event.in_language.count() == len(event_dict["in_language"])
+    assert Keyword.objects.get(n_events_changed=True)
+
+
+@pytest.mark.django_db
+def test_event_creation_keyword_memberships(
+    api_client, minimal_event_dict, user, data_source, organization, make_keyword_id
+):
+    api_client.force_authenticate(user)
+    test, test2 = data_source.id + ":test", data_source.id + ":test2"
+    minimal_event_dict["audience"] = [
+        {"@id": make_keyword_id(data_source, organization, "test2")}
+    ]
+    minimal_event_dict_2 = deepcopy(minimal_event_dict)
+    minimal_event_dict_2["name"]["fi"] = "testaus_2"
+    minimal_event_dict_2["audience"] = []
+    minimal_event_dict_3 = deepcopy(minimal_event_dict_2)
+    minimal_event_dict_3["name"]["fi"] = "testaus_3"
+    minimal_event_dict_3["keywords"].append(minimal_event_dict["audience"][0])
+
+    event_id = create_with_post(api_client, minimal_event_dict).data["id"]
+    response = api_client.post(
+        reverse("event-list"),
+        [minimal_event_dict_2, minimal_event_dict_3],
+        format="json",
+    )
+    assert response.status_code == 201
+    event_id_2, event_id_3 = (data["id"] for data in response.data)
+
+    assert get_memberships() == {
+        (event_id, test, "keywords"),
+        (event_id, test2, "audience"),
+        (event_id_2, test, "keywords"),
+        (event_id_3, test, "keywords"),
+        (event_id_3, test2, "keywords"),
+    }
+    assert get_listed_event_ids(api_client, f"keyword={test2}") == {
+        event_id,
+        event_id_3,
+    }
+    assert get_listed_event_ids(api_client, f"keyword_AND={test},{test2}") == {
+        event_id,
+        event_id_3,
+    }
+
+
+@pytest.mark.django_db
+def test_single_and_multiple_event_creation_with_deprecated_keyword(
+    api_client, minimal_event_dict, user, data_source
+):
+    api_client.force_authenticate(user)
+    Keyword.objects.filter(id=data_source.id + ":test").update(deprecated=True)
+    minimal_event_dict_2 = deepcopy(minimal_event_dict)
+    minimal_event_dict_2["name"]["fi"] = "testaus_2"
+
+    # the deprecated keywords of an event are checked before its new keywords
+    # are stored, both in single and in bulk requests
+    response = api_client.post(reverse("event-list"), minimal_event_dict, format="json")
+    assert response.status_code == 201
+    response = api_client.post(
+        reverse("event-list"), [minimal_event_dict_2], format="json"
+    )
+    assert response.status_code == 201
+    assert Event.objects.filter(keywords__id=data_source.id + ":test").count() == 2
+
+
 @pytest.mark.django_db
 def test_multiple_event_creation_missing_data_fails(
     api_client, minimal_event_dict, user
@@ -10,7 +10,8 @@ from django.utils import timezone
 
 from events.auth import ApiKeyUser
 from events.models import Event, Image, Keyword, Place
-from events.tests.test_event_post import create_with_post
+from events.tests.test_event import get_memberships
+from events.tests.test_event_post import create_with_post, get_listed_event_ids
 from events.tests.utils import assert_event_data_is_equal
 
 from ..api import ImageSerializer
@@ -151,6 +152,49 @@ def test__keyword_n_events_updated(
     assert Keyword.objects.get(id=data_source.id + ":test3").n_events == 1
 
 
+@pytest.mark.django_db
+def test__keyword_memberships_updated(
+    api_client, minimal_event_dict, user, data_source, organization, make_keyword_id
+):
+    api_client.force_authenticate(user=user)
+    minimal_event_dict_2 = deepcopy(minimal_event_dict)
+    minimal_event_dict_2["name"]["fi"] = "testing_2"
+    data = create_with_post(api_client, minimal_event_dict).data
+    data2 = create_with_post(api_client, minimal_event_dict_2).data
+    test, test2, test3 = (
+        data_source.id + ":" + name for name in ("test", "test2", "test3")
+    )
+    test2_id = make_keyword_id(data_source, organization, "test2")
+    test3_id = make_keyword_id(data_source, organization, "test3")
+
+    # change the keyword and add an audience
+    data["keywords"] = [{"@id": test2_id}]
+    data["audience"] = [{"@id": test3_id}]
+    response = update_with_put(api_client, data["@id"], data)
+    assert response.status_code == 200
+    assert get_memberships() == {
+        (data["id"], test2, "keywords"),
+        (data["id"], test3, "audience"),
+        (data2["id"], test, "keywords"),
+    }
+    assert get_listed_event_ids(api_client, f"keyword={test3}") == {data["id"]}
+    assert get_listed_event_ids(api_client, f"keyword={test}") == {data2["id"]}
+
+    # bulk update
+    data["audience"] = []
+    data2["keywords"] = [{"@id": test2_id}]
+    data2["audience"] = [{"@id": test3_id}]
+    response = api_client.put(reverse("event-list"), [data, data2], format="json")
+    assert response.status_code == 200
+    assert get_memberships() == {
+        (data["id"], test2, "keywords"),
+        (data2["id"], test2, "keywords"),
+        (data2["id"], test3, "audience"),
+    }
+    assert get_listed_event_ids(api_client, f"keyword={test3}") == {data2["id"]}
+    assert get_listed_event_ids(api_client, f"keyword={test}") == set()
+
+
 @pytest.mark.django_db
 def test__location_n_events_updated(
     api_client,
@@ -292,6 +336,36 @@ def test__bulk_update_single_event(api_client, complex_event_dict, user):
     assert_event_data_is_equal(data3, response2.data)
 
 
+@pytest.mark.django_db
+def test__update_keeps_unchanged_related_objects(api_client, minimal_event_dict, user):
+    api_client.force_authenticate(user=user)
+    minimal_event_dict["offers"].append({"is_free": True, "price": {"fi": "0 €"}})
+    response = create_with_post(api_client, minimal_event_dict)
+    event = Event.objects.get(id=response.data["id"])
+    offer_ids = list(event.offers.order_by("pk").values_list("pk", flat=True))
+    keyword_through_ids = list(
+        Event.keywords.through.objects.filter(event=event).values_list("pk", flat=True)
+    )
+
+    data2 = response.data
+    data2["offers"][1]["price"] = {"fi": "5 €"}
+    response2 = update_with_put(api_client, data2["@id"], data2)
+    assert response2.status_code == 200
+    assert_event_data_is_equal(data2, response2.data)
+
+    new_offer_ids = list(event.offers.order_by("pk").values_list("pk", flat=True))
+    assert new_offer_ids[0] == offer_ids[0]
+    assert new_offer_ids[1] != offer_ids[1]
+    assert (
+        list(
+            Event.keywords.through.objects.filter(event=event).values_list(
+                "pk", flat=True
+            )
+        )
+        == keyword_through_ids
+    )
+
+
 @pytest.mark.django_db
 def test__update_an_event_with_naive_datetime(api_client, minimal_event_dict, user):
 
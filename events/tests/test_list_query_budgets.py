@@ -0,0 +1,210 @@
+"""
+Query budgets of the list endpoints.
+
+Seeds N_EVENTS events with keywords, offers, images, languages, registrations,
+divisions and sub events once per module, and checks that each list endpoint
+and include combination stays within its query budget, which does not depend
+on the amount of data, and the query plans of the keyword filters.
+benchmarks/bench_list_endpoints.py times the same queries with more data.
+"""
+from datetime import timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_orghierarchy.models import Organization
+from munigeo.models import AdministrativeDivision, AdministrativeDivisionType
+from rest_framework.test import APIClient
+
+from events.models import DataSource, Event, Image, Keyword, Language, Offer, Place
+from events.sql import rebuild_event_keyword_memberships
+from events.tests.utils import versioned_reverse as reverse
+from registrations.models import Registration
+
+N_EVENTS = 100
+N_PLACES = 50
+N_KEYWORDS = 100
+N_DIVISIONS = 10
+N_IMAGES = 20
+SUB_EVENTS_EVERY = 20
+N_SUB_EVENTS = 5
+
+
+def seed(n_events):
+    data_source = DataSource.objects.create(id="bench")
+    organization = Organization.objects.create(
+        id="bench:org", origin_id="org", name="Bench", data_source=data_source
+    )
+    common = dict(data_source=data_source, publisher=organization)
+    languages = [Language.objects.get_or_create(id=lang)[0] for lang in ("fi", "sv")]
+    places = [
+        Place.objects.create(id=f"bench:place-{i}", name_fi=f"Paikka {i}", **common)
+        for i in range(N_PLACES)
+    ]
+    division_type = AdministrativeDivisionType.objects.create(type="bench")
+    divisions = [
+        AdministrativeDivision.objects.create(
+            type=division_type, ocd_id=f"ocd-division/bench:{i}"
+        )
+        for i in range(N_DIVISIONS)
+    ]
+    # every place is in two divisions, like a district and a neighborhood
+    Place.divisions.through.objects.bulk_create(
+        Place.divisions.through(
+            place=place, administrativedivision=divisions[(i + j) % N_DIVISIONS]
+        )
+        for i, place in enumerate(places)
+        for j in range(2)
+    )
+    keywords = [
+        Keyword.objects.create(id=f"bench:kw-{i}", name_fi=f"Asiasana {i}", **common)
+        for i in range(N_KEYWORDS)
+    ]
+    images = [
+        Image.objects.create(
+            name=f"Kuva {i}", url=f"https://example.com/{i}.jpg", **common
+        )
+        for i in range(N_IMAGES)
+    ]
+
+    now = timezone.now()
+    events = []
+    for i in range(n_events):
+        super_event = None
+        if i >= SUB_EVENTS_EVERY and i % SUB_EVENTS_EVERY < N_SUB_EVENTS:
+            # the first events of a block are sub events of the last event of the previous block
+            super_event = events[i - i % SUB_EVENTS_EVERY - 1]
+        event = Event.objects.create(
+            id=f"bench:event-{i}",
+            name_fi=f"Tapahtuma {i}",
+            description_fi="Kuvaus " * 50,
+            location=places[i % N_PLACES],
+            start_time=now + timedelta(days=i % 30),
+            end_time=now + timedelta(days=i % 30, hours=2),
+            super_event=super_event,
+            super_event_type=Event.SuperEventType.RECURRING
+            if i % SUB_EVENTS_EVERY == SUB_EVENTS_EVERY - 1
+            else None,
+            **common,
+        )
+        events.append(event)
+
+    Event.keywords.through.objects.bulk_create(
+        Event.keywords.through(event=event, keyword=keywords[(i + j) % N_KEYWORDS])
+        for i, event in enumerate(events)
+        for j in range(3)
+    )
+    Event.audience.through.objects.bulk_create(
+        Event.audience.through(event=event, keyword=keywords[i % N_KEYWORDS])
+        for i, event in enumerate(events)
+    )
+    # the through rows above bypass the m2m signals keeping the memberships in sync
+    rebuild_event_keyword_memberships()
+    Event.images.through.objects.bulk_create(
+        Event.images.through(event=event, image=images[i % N_IMAGES])
+        for i, event in enumerate(events)
+    )
+    Event.in_language.through.objects.bulk_create(
+        Event.in_language.through(event=event, language=language)
+        for event in events
+        for language in languages
+    )
+    Offer.objects.bulk_create(
+        Offer(event=event, price=f"{i % 20} €", is_free=i % 20 == 0)
+        for i, event in enumerate(events)
+    )
+    Registration.objects.bulk_create(
+        Registration(event=event, maximum_attendee_capacity=100)
+        for event in events[::10]
+    )
+
+
+@pytest.fixture(scope="module")
+def seeded_db(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        with transaction.atomic():
+            seed(N_EVENTS)
+            yield
+            transaction.set_rollback(True)
+
+
+# the most common public query: a date range, keywords and divisions
+COMMON_EVENT_QUERY = (
+    "days=30&keyword=bench:kw-1,bench:kw-2"
+    "&division=ocd-division/bench:1,ocd-division/bench:2&page_size=100"
+)
+
+# (url name, query string, query budget)
+LIST_QUERY_BUDGETS = [
+    ("event-list", "", 20),
+    ("event-list", "page_size=100", 20),
+    ("event-list", "include=location", 25),
+    ("event-list", "include=keywords,audience", 25),
+    ("event-list", "include=sub_events", 35),
+    ("event-list", "include=location,keywords,audience,in_language,sub_events", 45),
+    ("event-list", "super_event_type=recurring&page_size=100", 20),
+    ("event-list", "keyword=bench:kw-1,bench:kw-2&page_size=100", 20),
+    ("event-list", "keyword_AND=bench:kw-1,bench:kw-2&page_size=100", 20),
+    ("event-list", "keyword!=bench:kw-1&page_size=100", 20),
+    ("event-list", "is_free=true&in_language=fi,sv&page_size=100", 20),
+    ("event-list", COMMON_EVENT_QUERY, 20),
+    ("place-list", "", 10),
+    ("place-list", "show_all_places=true&page_size=100", 10),
+    ("keyword-list", "", 10),
+    ("keyword-list", "show_all_keywords=true&page_size=100", 10),
+    ("image-list", "page_size=100", 10),
+    ("organization-list", "", 10),
+    ("registration-list", "", 20),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name,query,max_queries", LIST_QUERY_BUDGETS)
+def test_list_endpoint_query_budget(seeded_db, url_name, query, max_queries):
+    url = reverse(url_name)
+    if query:
+        url += "?" + query
+
+    with CaptureQueriesContext(connection) as queries:
+        response = APIClient().get(url, format="json")
+
+    assert response.status_code == 200
+    assert len(queries) <= max_queries, "\n".join(q["sql"] for q in queries)
+
+
+# event list queries whose plans are checked
+PLAN_EVENT_QUERIES = [
+    COMMON_EVENT_QUERY,
+    "keyword=bench:kw-1,bench:kw-2&page_size=100",
+    "keyword_AND=bench:kw-1,bench:kw-2&page_size=100",
+    "keyword!=bench:kw-1&page_size=100",
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", PLAN_EVENT_QUERIES)
+def test_event_list_query_plan(seeded_db, query):
+    """
+    The event list query filters with semi-joins on the keyword memberships
+    instead of joining the keyword through tables, and needs no DISTINCT
+    """
+    url = reverse("event-list") + "?" + query
+
+    with CaptureQueriesContext(connection) as queries:
+        response = APIClient().get(url, format="json")
+    assert response.status_code == 200
+
+    sql = next(
+        q["sql"] for q in queries if q["sql"].startswith('SELECT "events_event"')
+    )
+    assert "DISTINCT" not in sql
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN " + sql)
+        plan = [line for (line,) in cursor.fetchall()]
+    assert not any("Unique" in line for line in plan)
+    assert any(" on events_eventkeywordmembership" in line for line in plan)
+    assert not any(
+        " on events_event_keywords" in line or " on events_event_audience" in line
+        for line in plan
+    )
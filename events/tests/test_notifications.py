@@ -2,7 +2,11 @@ import pytest
 from django.contrib.auth import get_user_model
 from django.core import mail
 
-from notifications.models import NotificationTemplate, NotificationType
+from notifications.models import (
+    NotificationTemplate,
+    NotificationType,
+    send_queued_emails,
+)
 from notifications.tests.utils import check_received_mail_exists
 
 from ..models import PublicationStatus
@@ -80,6 +84,7 @@ def test_draft_event_deleted(event_deleted_notification_template, user, event):
         "event deleted body, event name: %s!" % event.name,
     ]
     html_body = "event deleted <b>HTML</b> body, event name: %s!" % event.name
+    send_queued_emails()
     assert len(mail.outbox) == 1
     check_received_mail_exists(
         "event deleted subject, event name: %s!" % event.name,
@@ -96,6 +101,7 @@ def test_public_event_deleted_doesnt_trigger_notification(
     event.created_by = user
     event.save()
     event.soft_delete()
+    send_queued_emails()
     assert len(mail.outbox) == 0
 
 
@@ -0,0 +1,153 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+
+from events.models import Event, Place
+from events.ongoing_events import (
+    _terms_to_regex,
+    get_ongoing_indexes,
+    LOCAL_INDEX_CACHE_KEY,
+    OngoingEventIndex,
+    publish_ongoing_indexes,
+)
+from events.tests.test_event_get import get_list_and_assert_events
+
+EVENT_STRINGS = {
+    "test:1": "Jazz-konsertti Musiikkitalo Mannerheimintie 13",
+    "test:2": "Lasten teatteri Kulttuuritalo Sturenkatu 4",
+    "test:3": "Rock konsertti Tavastia Urho Kekkosen katu 4",
+    "test:4": "Taidenäyttely Ateneum Kaivokatu 2",
+}
+
+
+def search_with_regex(terms, operator):
+    rc = _terms_to_regex(terms, operator)
+    return {k for k, v in EVENT_STRINGS.items() if rc.search(v, concurrent=True)}
+
+
+@pytest.fixture
+def ongoing_index():
+    return OngoingEventIndex(EVENT_STRINGS)
+
+
+@pytest.mark.parametrize(
+    "terms,operator",
+    [
+        ("konsertti", "OR"),
+        ("konsertit", "OR"),
+        ("teatteri,ateneum", "OR"),
+        ("JAZZ", "OR"),
+        ("musiikki", "OR"),
+        ("rock konsertti", "OR"),
+        ("rock,konsertti", "AND"),
+        ("konsertti,rock", "AND"),
+        ("nonexistent", "OR"),
+    ],
+)
+def test_index_search_matches_regex_search(ongoing_index, terms, operator):
+    assert ongoing_index.search(terms, operator) == search_with_regex(terms, operator)
+
+
+def test_index_search_fuzzy_prefix(ongoing_index):
+    assert ongoing_index.search("musikki", "OR") == {"test:1"}
+
+
+def test_empty_index_search():
+    assert OngoingEventIndex({}).search("konsertti", "OR") == set()
+
+
+def test_get_ongoing_indexes_not_populated(locmem_cache):
+    (index,) = get_ongoing_indexes(LOCAL_INDEX_CACHE_KEY)
+    assert len(index) == 0
+
+
+def test_get_ongoing_indexes_reloads_on_new_version(locmem_cache):
+    publish_ongoing_indexes(
+        {LOCAL_INDEX_CACHE_KEY: OngoingEventIndex(EVENT_STRINGS)}, timeout=None
+    )
+    (index,) = get_ongoing_indexes(LOCAL_INDEX_CACHE_KEY)
+    assert len(index) == 4
+
+    # the process-local copy is used until a new version is published
+    cache.set(LOCAL_INDEX_CACHE_KEY, OngoingEventIndex({}))
+    assert get_ongoing_indexes(LOCAL_INDEX_CACHE_KEY) == [index]
+
+    publish_ongoing_indexes(
+        {LOCAL_INDEX_CACHE_KEY: OngoingEventIndex({"test:1": "Konsertti"})},
+        timeout=None,
+    )
+    (index,) = get_ongoing_indexes(LOCAL_INDEX_CACHE_KEY)
+    assert len(index) == 1
+
+
+@pytest.fixture
+def internet_place(data_source, organization):
+    return Place.objects.create(
+        id=data_source.id + ":internet",
+        data_source=data_source,
+        publisher=organization,
+        name_fi="Internet",
+    )
+
+
+def create_internet_event(internet_place, origin_id, name):
+    return Event.objects.create(
+        id=internet_place.data_source.id + ":" + origin_id,
+        location=internet_place,
+        data_source=internet_place.data_source,
+        publisher=internet_place.publisher,
+        start_time=timezone.now() + timedelta(minutes=30),
+        end_time=timezone.now() + timedelta(hours=1),
+        name_fi=name,
+    )
+
+
+@pytest.mark.django_db
+def test_populate_local_event_cache_internet_ongoing_filter(
+    locmem_cache, internet_place
+):
+    event = create_internet_event(internet_place, "internet_event", "Etäkonsertti")
+
+    call_command("populate_local_event_cache")
+
+    get_list_and_assert_events("internet_ongoing_OR=etäkonsertti", [event])
+    get_list_and_assert_events("internet_ongoing_OR=teatteri", [])
+    get_list_and_assert_events("all_ongoing=true", [event])
+
+
+@pytest.mark.django_db
+def test_populate_local_event_cache_incremental(locmem_cache, internet_place):
+    event = create_internet_event(internet_place, "internet_event", "Etäkonsertti")
+    ended_event = create_internet_event(internet_place, "ended_event", "Etäluento")
+    call_command("populate_local_event_cache")
+    assert not Event.objects.filter(ongoing_cache_changed=True).exists()
+
+    event.name_fi = "Etäteatteri"
+    event.save()
+    new_event = create_internet_event(internet_place, "new_event", "Etäkonsertti")
+    Event.objects.filter(id=ended_event.id).update(
+        start_time=timezone.now() - timedelta(hours=2),
+        end_time=timezone.now() - timedelta(hours=1),
+    )
+    call_command("populate_local_event_cache", "--incremental")
+
+    assert not Event.objects.filter(ongoing_cache_changed=True).exists()
+    get_list_and_assert_events("internet_ongoing_OR=etäkonsertti", [new_event])
+    get_list_and_assert_events("internet_ongoing_OR=etäteatteri", [event])
+    get_list_and_assert_events("all_ongoing=true", [event, new_event])
+
+
+@pytest.mark.django_db
+def test_keyword_change_marks_ongoing_cache_changed(internet_place, keyword):
+    event = create_internet_event(internet_place, "internet_event", "Etäkonsertti")
+    Event.objects.update(ongoing_cache_changed=False)
+
+    event.keywords.add(keyword)
+    assert Event.objects.get(id=event.id).ongoing_cache_changed
+
+    Event.objects.update(ongoing_cache_changed=False)
+    keyword.save()
+    assert Event.objects.get(id=event.id).ongoing_cache_changed
@@ -1,6 +1,8 @@
 import pytest
 from django.contrib.gis.geos import Point
 
+from events.models import place_divisions_batch
+
 
 @pytest.mark.parametrize(
     "position, is_division_expected",
@@ -45,6 +47,26 @@ def test_place_divisions_by_division_type(
         assert place.divisions.count() == 0
 
 
+@pytest.mark.django_db
+def test_place_divisions_batch(
+    place, place2, administrative_division, administrative_division2
+):
+    with place_divisions_batch():
+        place.position = Point(150, 150)
+        place.save()
+        place2.position = Point(250, 250)
+        place2.save()
+        # the divisions are updated when the batch exits
+        assert list(place.divisions.all()) == [administrative_division]
+        assert place2.divisions.count() == 0
+
+    assert set(place.divisions.all()) == {
+        administrative_division,
+        administrative_division2,
+    }
+    assert list(place2.divisions.all()) == [administrative_division2]
+
+
 @pytest.mark.django_db
 def test_place_cannot_replace_itself(place):
     place.replaced_by = place
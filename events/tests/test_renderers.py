@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+
+import pytz
+from django.utils.translation import gettext_lazy as _
+from rest_framework import renderers
+
+from events.renderers import JSONLDRenderer, JSONRenderer, NDJSONRenderer
+
+DATA = [
+    OrderedDict(
+        [
+            ("id", "test:1"),
+            ("name", {"fi": "Tapahtuma /", "en": None}),
+            ("start_time", datetime(2023, 1, 1, 12, tzinfo=pytz.utc)),
+            ("price", Decimal("1.5")),
+            ("detail", _("Not found.")),
+            ("tags", ("a", "b")),
+        ]
+    )
+]
+
+
+def test_json_renderer_matches_drf_renderer():
+    expected = renderers.JSONRenderer().render(DATA)
+    assert JSONRenderer().render(DATA) == expected
+    assert JSONLDRenderer().render(DATA) == expected
+
+
+def test_json_renderer_indent_falls_back_to_drf_renderer():
+    media_type = "application/json; indent=4"
+    assert JSONRenderer().render(DATA, media_type) == renderers.JSONRenderer().render(
+        DATA, media_type
+    )
+
+
+def test_ndjson_renderer():
+    line = renderers.JSONRenderer().render(DATA[0]) + b"\n"
+    assert NDJSONRenderer().render(DATA * 2) == line * 2
@@ -0,0 +1,68 @@
+import pytest
+
+from events.models import Event, Keyword
+from events.response_cache import bump_generation, get_generations
+from events.tests.test_event_get import get_detail, get_list
+from events.tests.utils import get
+from events.tests.utils import versioned_reverse as reverse
+
+
+@pytest.mark.django_db
+def test_bump_generation(locmem_cache):
+    assert get_generations(["event"]) == [None]
+
+    bump_generation("event")
+    (generation,) = get_generations(["event"])
+    bump_generation("event")
+    assert get_generations(["event", "place"]) == [generation + 1, None]
+
+
+@pytest.mark.django_db
+def test_anonymous_event_list_is_cached(locmem_cache, api_client, event):
+    get_list(api_client)
+    Event.objects.filter(id=event.id).update(name_fi="Päivitetty")
+
+    response = get_list(api_client)
+    assert response.json()["data"][0]["name"]["fi"] != "Päivitetty"
+
+    event.refresh_from_db()
+    event.save()
+    response = get_list(api_client)
+    assert response.json()["data"][0]["name"]["fi"] == "Päivitetty"
+
+
+@pytest.mark.django_db
+def test_anonymous_event_detail_is_invalidated_by_keyword_change(
+    locmem_cache, api_client, event, keyword
+):
+    event.keywords.add(keyword)
+    get_detail(api_client, event.pk, data={"include": "keywords"})
+
+    keyword.name_fi = "Päivitetty"
+    keyword.save()
+    response = get_detail(api_client, event.pk, data={"include": "keywords"})
+    assert response.json()["keywords"][0]["name"]["fi"] == "Päivitetty"
+
+
+@pytest.mark.django_db
+def test_anonymous_keyword_list_is_cached(locmem_cache, api_client, keyword):
+    get(api_client, reverse("keyword-list"))
+    Keyword.objects.filter(id=keyword.id).update(name_fi="Päivitetty")
+    response = get(api_client, reverse("keyword-list"))
+    assert response.json()["data"][0]["name"]["fi"] != "Päivitetty"
+
+
+@pytest.mark.django_db
+def test_authenticated_event_list_is_not_cached(locmem_cache, user_api_client, event):
+    get_list(user_api_client)
+    Event.objects.filter(id=event.id).update(name_fi="Päivitetty")
+    response = get_list(user_api_client)
+    assert response.json()["data"][0]["name"]["fi"] == "Päivitetty"
+
+
+@pytest.mark.django_db
+def test_show_all_event_list_is_not_cached(locmem_cache, api_client, event):
+    get_list(api_client, query_string="show_all=true")
+    Event.objects.filter(id=event.id).update(name_fi="Päivitetty")
+    response = get_list(api_client, query_string="show_all=true")
+    assert response.json()["data"][0]["name"]["fi"] == "Päivitetty"
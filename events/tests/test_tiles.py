@@ -0,0 +1,100 @@
+import pytest
+from django.conf import settings
+from django.contrib.gis.geos import Point, Polygon
+from django.contrib.gis.measure import D
+
+from events.models import Place
+from events.tests.utils import get
+from events.tests.utils import versioned_reverse as reverse
+from events.tiles import get_tile_places, places_within, places_within_distance
+
+
+@pytest.fixture
+def positioned_places(place, place2, place3):
+    for obj, position in (
+        (place, Point(50, 50)),
+        (place2, Point(-1000, 1500)),
+        (place3, Point(2500, -10)),
+    ):
+        obj.position = position
+        obj.save()
+    return place, place2, place3
+
+
+@pytest.mark.parametrize(
+    "bbox",
+    [
+        (0, 0, 100, 100),
+        (-5000, -5000, 5000, 5000),
+        (-1000, -1000, 1000, 1500),
+        (60, 60, 3000, 3000),
+    ],
+)
+@pytest.mark.django_db
+def test_places_within_matches_spatial_query(positioned_places, bbox):
+    polygon = Polygon.from_bbox(bbox)
+    polygon.srid = settings.PROJECTION_SRID
+
+    expected = Place.objects.filter(position__within=polygon)
+    assert set(places_within(polygon)) == {obj.id for obj in expected}
+
+
+@pytest.mark.parametrize("metres", [10, 71, 1900, 2600, 10000])
+@pytest.mark.django_db
+def test_places_within_distance_matches_spatial_query(positioned_places, metres):
+    origin = Point(0, 0, srid=settings.PROJECTION_SRID)
+
+    expected = Place.objects.filter(position__dwithin=(origin, D(m=metres)))
+    assert set(places_within_distance(origin, metres)) == {obj.id for obj in expected}
+
+
+@pytest.mark.django_db
+def test_tile_places_are_cached(
+    locmem_cache, positioned_places, django_assert_num_queries
+):
+    place, place2, place3 = positioned_places
+    with django_assert_num_queries(1):
+        tiles = get_tile_places([(0, 0), (-1, 1), (1, 1)])
+    assert tiles == {
+        (0, 0): [(place.id, 50, 50)],
+        (-1, 1): [(place2.id, -1000, 1500)],
+        (1, 1): [],
+    }
+    with django_assert_num_queries(0):
+        assert get_tile_places([(0, 0)]) == {(0, 0): [(place.id, 50, 50)]}
+
+    place.position = Point(150, 150)
+    place.save()
+    with django_assert_num_queries(1):
+        assert get_tile_places([(0, 0)]) == {(0, 0): [(place.id, 150, 150)]}
+
+
+@pytest.mark.django_db
+def test_event_tiles(api_client, positioned_places, event, event2, event3):
+    url = reverse("event-tiles")
+    response = get(api_client, f"{url}?srid={settings.PROJECTION_SRID}")
+    assert response.data["tile_size"] == 1000
+    assert response.data["tile_srid"] == settings.PROJECTION_SRID
+    assert response.data["srid"] == settings.PROJECTION_SRID
+    tiles = {(tile["x"], tile["y"]): tile for tile in response.data["data"]}
+    assert {tile: data["count"] for tile, data in tiles.items()} == {
+        (0, 0): 1,
+        (-1, 1): 1,
+        (2, -1): 1,
+    }
+    assert list(tiles[(-1, 1)]["bbox"]) == [-1000, 1000, 0, 2000]
+
+    response = get(api_client, f"{url}?tile_size=100&location={event.location_id}")
+    assert response.data["tile_srid"] == settings.PROJECTION_SRID
+    assert response.data["srid"] == settings.WGS84_SRID
+    assert [
+        (tile["x"], tile["y"], tile["count"]) for tile in response.data["data"]
+    ] == [(0, 0, 1)]
+    # the bbox is in the requested srid, here lon/lat
+    bbox = Polygon.from_bbox(response.data["data"][0]["bbox"])
+    bbox.srid = settings.WGS84_SRID
+    bbox.transform(settings.PROJECTION_SRID)
+    assert bbox.contains(Point(50, 50))
+
+    response = api_client.get(f"{url}?tile_size=10")
+    assert response.status_code == 400
@@ -0,0 +1,163 @@
+"""
+Map tiles for the spatial filters of the event list.
+
+The plane of the database projection is divided into square tiles of
+TILE_SIZE metres. The positions of the places in each tile are cached until
+any place is saved or deleted, which is noticed from the place response
+cache generation. The bbox and dwithin filters snap the area to the tiles it
+touches: the places of the tiles inside the area are taken as they are, and
+only the places of the tiles on its edges are checked against the area.
+"""
+import math
+
+from django.conf import settings
+from django.contrib.gis.geos import Point, Polygon
+from django.contrib.gis.measure import D
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, Func
+from django.db.models.functions import Floor
+
+from events.models import Place
+from events.response_cache import get_generations
+
+TILE_SIZE = 1000
+# smallest tile size for counting events by tile
+MIN_TILE_SIZE = 100
+# areas covering more tiles are filtered with a spatial query instead
+MAX_TILES = 400
+TILE_CACHE_KEY = "place_tile:%s:%d:%d"
+TILE_CACHE_TIMEOUT = 24 * 3600
+
+
+def get_tile(x, y, tile_size=TILE_SIZE):
+    """Get the tile containing the point, in the projection of the database"""
+    return math.floor(x / tile_size), math.floor(y / tile_size)
+
+
+def get_tile_extent(tile, tile_size=TILE_SIZE):
+    x, y = tile
+    return (x * tile_size, y * tile_size, (x + 1) * tile_size, (y + 1) * tile_size)
+
+
+def get_tiles(extent):
+    """Get the tiles touching the extent (xmin, ymin, xmax, ymax)"""
+    x_min, y_min = get_tile(extent[0], extent[1])
+    x_max, y_max = get_tile(extent[2], extent[3])
+    return [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+
+
+def get_tile_places(tiles):
+    """
+    Get the places positioned in each of the tiles.
+
+    :return: dict of tile to list of (place id, x, y)
+    """
+    (generation,) = get_generations(["place"])
+    keys = {tile: TILE_CACHE_KEY % (generation, *tile) for tile in tiles}
+    cached = cache.get_many(keys.values())
+    places = {tile: cached[key] for tile, key in keys.items() if key in cached}
+    missing = [tile for tile in tiles if tile not in places]
+    if missing:
+        # one query for the rectangle around the missing tiles
+        extent = Polygon.from_bbox(
+            (
+                min(x for x, _ in missing) * TILE_SIZE,
+                min(y for _, y in missing) * TILE_SIZE,
+                (max(x for x, _ in missing) + 1) * TILE_SIZE,
+                (max(y for _, y in missing) + 1) * TILE_SIZE,
+            )
+        )
+        extent.srid = settings.PROJECTION_SRID
+        fetched = {tile: [] for tile in missing}
+        for place_id, position in Place.geo_objects.filter(
+            position__intersects=extent
+        ).values_list("id", "position"):
+            tile = get_tile(position.x, position.y)
+            if tile in fetched:
+                fetched[tile].append((place_id, position.x, position.y))
+        cache.set_many(
+            {keys[tile]: tile_places for tile, tile_places in fetched.items()},
+            timeout=TILE_CACHE_TIMEOUT,
+        )
+        places.update(fetched)
+    return places
+
+
+def places_within(polygon):
+    """
+    Get the places within the polygon, for filtering events by location.
+
+    :return: ids of the places, or a queryset of them if the polygon covers
+        more than MAX_TILES tiles
+    """
+    polygon = polygon.transform(settings.PROJECTION_SRID, clone=True)
+    tiles = get_tiles(polygon.extent)
+    if len(tiles) > MAX_TILES:
+        return Place.geo_objects.filter(position__within=polygon)
+
+    prepared = polygon.prepared
+    place_ids = []
+    for tile, places in get_tile_places(tiles).items():
+        if prepared.contains_properly(Polygon.from_bbox(get_tile_extent(tile))):
+            place_ids += [place_id for place_id, _, _ in places]
+        else:
+            place_ids += [
+                place_id for place_id, x, y in places if prepared.contains(Point(x, y))
+            ]
+    return place_ids
+
+
+def places_within_distance(origin, metres):
+    """
+    Get the places at most the given distance from the origin, for filtering
+    events by location.
+
+    :return: ids of the places, or a queryset of them if the circle covers
+        more than MAX_TILES tiles
+    """
+    origin = origin.transform(settings.PROJECTION_SRID, clone=True)
+    tiles = get_tiles(
+        (origin.x - metres, origin.y - metres, origin.x + metres, origin.y + metres)
+    )
+    if len(tiles) > MAX_TILES:
+        return Place.geo_objects.filter(position__dwithin=(origin, D(m=metres)))
+
+    def is_within(x, y):
+        return (x - origin.x) ** 2 + (y - origin.y) ** 2 <= metres**2
+
+    place_ids = []
+    for tile, places in get_tile_places(tiles).items():
+        x_min, y_min, x_max, y_max = get_tile_extent(tile)
+        # the corner of the tile farthest from the origin
+        corner_x = x_min if origin.x - x_min > x_max - origin.x else x_max
+        corner_y = y_min if origin.y - y_min > y_max - origin.y else y_max
+        if is_within(corner_x, corner_y):
+            place_ids += [place_id for place_id, _, _ in places]
+        else:
+            place_ids += [place_id for place_id, x, y in places if is_within(x, y)]
+    return place_ids
+
+
+def count_events_by_tile(queryset, tile_size=TILE_SIZE):
+    """
+    Count the events of the queryset in each tile by the positions of their
+    locations, in a single GROUP BY query.
+
+    :return: list of (tile x, tile y, number of events)
+    """
+    position = F("location__position")
+    tile_x = Floor(
+        Func(position, function="ST_X", output_field=FloatField()) / float(tile_size)
+    )
+    tile_y = Floor(
+        Func(position, function="ST_Y", output_field=FloatField()) / float(tile_size)
+    )
+    rows = (
+        queryset.filter(location__position__isnull=False)
+        .order_by()
+        .annotate(tile_x=tile_x, tile_y=tile_y)
+        .values("tile_x", "tile_y")
+        .annotate(n_events=Count("id"))
+        .values_list("tile_x", "tile_y", "n_events")
+    )
+    return [(int(x), int(y), n_events) for x, y, n_events in rows]
@@ -13,6 +13,7 @@ from django_orghierarchy.models import Organization
 from rest_framework.exceptions import ParseError
 
 from events.models import DataSource, Keyword, Place
+from events.response_cache import bump_generation
 from events.sql import count_events_for_keywords, count_events_for_places
 
 
@@ -78,6 +79,8 @@ def recache_n_events(keyword_ids, all=False):
             keyword_ids, all=all
         ).items():
             Keyword.objects.filter(id=keyword_id).update(n_events=n_events)
+    # the queryset updates send no signals
+    bump_generation("keyword")
 
 
 def recache_n_events_in_locations(place_ids, all=False):
@@ -100,6 +103,8 @@ def recache_n_events_in_locations(place_ids, all=False):
             )
         for place_id, n_events in count_events_for_places(place_ids, all=all).items():
             Place.objects.filter(id=place_id).update(n_events=n_events)
+    # the queryset updates send no signals
+    bump_generation("place")
 
 
 def parse_time(time_str: str, default_tz=pytz.utc) -> (datetime, bool):
@@ -0,0 +1,66 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries and the time spent in them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += time.perf_counter() - start
+
+
+class QueryProfilingMiddleware:
+    """
+    Report the number of SQL queries, the time spent in them, the serializer
+    time and the total time of each request in the X-SQL-Queries, X-SQL-Time,
+    X-Serializer-Time and X-Response-Time headers, and log them.
+
+    The serializer time is recorded by the list views in
+    request.serializer_time. All times are in milliseconds. Enabled with the
+    QUERY_PROFILING setting.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        total_time = time.perf_counter() - start
+
+        serializer_time = getattr(request, "serializer_time", None)
+        response["X-SQL-Queries"] = str(counter.count)
+        response["X-SQL-Time"] = "%.1f" % (counter.time * 1000)
+        if serializer_time is not None:
+            response["X-Serializer-Time"] = "%.1f" % (serializer_time * 1000)
+        response["X-Response-Time"] = "%.1f" % (total_time * 1000)
+        logger.info(
+            "%s %s: %d queries, SQL %.1f ms, serializer %s ms, total %.1f ms",
+            request.method,
+            request.get_full_path(),
+            counter.count,
+            counter.time * 1000,
+            "%.1f" % (serializer_time * 1000) if serializer_time is not None else "-",
+            total_time * 1000,
+        )
+        return response
@@ -69,6 +69,7 @@ env = environ.Env(
     MAILGUN_API_KEY=(str, ""),
     MEDIA_ROOT=(environ.Path(), root("media")),
     MEDIA_URL=(str, "/media/"),
+    QUERY_PROFILING=(bool, False),
     REDIS_SENTINELS=(list, []),
     REDIS_URL=(str, None),
     REDIS_PASSWORD=(str, None),
@@ -219,6 +220,10 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Report SQL query counts and timings of each request, see linkedevents.middleware
+if env("QUERY_PROFILING"):
+    MIDDLEWARE.insert(0, "linkedevents.middleware.QueryProfilingMiddleware")
+
 if DEBUG and DEBUG_TOOLBAR_AVAILABLE:
     import socket
 
@@ -524,10 +529,22 @@ if env("MAILGUN_API_KEY"):
 elif not env("MAILGUN_API_KEY") and DEBUG is True:
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
+# Queued notification emails, see notifications.models.send_queued_emails
+NOTIFICATION_EMAIL_MAX_ATTEMPTS = 5
+# seconds before the first retry, doubled after each failed attempt
+NOTIFICATION_EMAIL_RETRY_DELAY = 60
 
 # Ongoing events will be cached forever
 ONGOING_EVENTS_CACHE_TIMEOUT = None
 
+# Rendered API responses of anonymous users, see events.response_cache
+RESPONSE_CACHE_TIMEOUT = 60
+
+# Paginated list counts, see events.api_pagination.CountPaginator
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+# Planner estimates larger than this are used instead of counting the results
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 10000
+
 if env("REDIS_URL"):
     # django.core.cache.backends.locmem.LocMemCache will be used as cache backend
     # if redis is not defined.
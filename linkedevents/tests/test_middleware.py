@@ -0,0 +1,26 @@
+import pytest
+
+from events.tests.utils import versioned_reverse as reverse
+
+
+@pytest.mark.django_db
+def test_query_profiling_middleware(api_client, settings):
+    settings.MIDDLEWARE = [
+        "linkedevents.middleware.QueryProfilingMiddleware",
+        *settings.MIDDLEWARE,
+    ]
+
+    response = api_client.get(reverse("event-list"))
+
+    assert response.status_code == 200
+    assert int(response["X-SQL-Queries"]) > 0
+    assert float(response["X-SQL-Time"]) >= 0
+    assert float(response["X-Serializer-Time"]) >= 0
+    assert float(response["X-Response-Time"]) >= float(response["X-SQL-Time"])
+
+
+@pytest.mark.django_db
+def test_query_profiling_middleware_disabled(api_client):
+    response = api_client.get(reverse("event-list"))
+
+    assert "X-SQL-Queries" not in response
@@ -2,7 +2,7 @@ from django.contrib.admin import ModelAdmin
 from django.contrib.admin import site as admin_site
 from django.forms import ModelForm
 
-from .models import NotificationTemplate
+from .models import NotificationTemplate, QueuedEmail
 
 
 class NotificationTemplateForm(ModelForm):
@@ -28,3 +28,11 @@ class NotificationTemplateAdmin(ModelAdmin):
 
 
 admin_site.register(NotificationTemplate, NotificationTemplateAdmin)
+
+
+class QueuedEmailAdmin(ModelAdmin):
+    list_display = ("subject", "created_time", "attempts", "next_attempt_time")
+    readonly_fields = ("created_time",)
+
+
+admin_site.register(QueuedEmail, QueuedEmailAdmin)
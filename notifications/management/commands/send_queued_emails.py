@@ -0,0 +1,38 @@
+import time
+
+from django.core.management import BaseCommand
+
+from notifications.models import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Send the emails queued in the notification outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Number of emails locked and sent in one transaction",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=None,
+            help="Number of attempts before an email is given up on",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Keep running and poll the outbox every INTERVAL seconds",
+        )
+
+    def handle(self, batch_size, max_attempts, interval, **kwargs):
+        while True:
+            n_sent, n_failed = send_queued_emails(batch_size, max_attempts)
+            if n_sent or n_failed or interval is None:
+                self.stdout.write("Sent %s emails, %s failed." % (n_sent, n_failed))
+            if interval is None:
+                break
+            time.sleep(interval)
@@ -0,0 +1,66 @@
+import django.contrib.postgres.fields
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notifications", "0004_alter_notificationtemplate_type"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QueuedEmail",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.TextField(verbose_name="Subject")),
+                ("body", models.TextField(blank=True, verbose_name="Body")),
+                ("html_body", models.TextField(blank=True, verbose_name="HTML Body")),
+                ("from_email", models.CharField(max_length=254, verbose_name="From")),
+                (
+                    "recipient_list",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.CharField(max_length=254),
+                        size=None,
+                        verbose_name="Recipients",
+                    ),
+                ),
+                (
+                    "created_time",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        editable=False,
+                        verbose_name="Created at",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Attempts"
+                    ),
+                ),
+                (
+                    "next_attempt_time",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        verbose_name="Next attempt at",
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="Last error")),
+            ],
+            options={
+                "verbose_name": "Queued email",
+                "verbose_name_plural": "Queued emails",
+            },
+        ),
+    ]
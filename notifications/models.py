@@ -1,7 +1,10 @@
 import logging
+from datetime import timedelta
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.formats import date_format
 from django.utils.html import strip_tags
@@ -137,3 +140,114 @@ def render_notification_template(
         raise NotificationTemplateException(e) from e
 
     return template.render(context, language_code)
+
+
+class QueuedEmail(models.Model):
+    """
+    An email waiting in the outbox to be sent by the send_queued_emails command.
+    """
+
+    subject = models.TextField(verbose_name=_("Subject"))
+    body = models.TextField(verbose_name=_("Body"), blank=True)
+    html_body = models.TextField(verbose_name=_("HTML Body"), blank=True)
+    from_email = models.CharField(verbose_name=_("From"), max_length=254)
+    recipient_list = ArrayField(
+        models.CharField(max_length=254), verbose_name=_("Recipients")
+    )
+    created_time = models.DateTimeField(
+        verbose_name=_("Created at"), default=timezone.now, editable=False
+    )
+    attempts = models.PositiveSmallIntegerField(verbose_name=_("Attempts"), default=0)
+    next_attempt_time = models.DateTimeField(
+        verbose_name=_("Next attempt at"), default=timezone.now, db_index=True
+    )
+    last_error = models.TextField(verbose_name=_("Last error"), blank=True)
+
+    class Meta:
+        verbose_name = _("Queued email")
+        verbose_name_plural = _("Queued emails")
+
+    def __str__(self):
+        return self.subject
+
+    def get_message(self, connection):
+        message = EmailMultiAlternatives(
+            self.subject,
+            self.body,
+            self.from_email,
+            self.recipient_list,
+            connection=connection,
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body, "text/html")
+        return message
+
+
+def queue_email(subject, message, from_email, recipient_list, html_message=None):
+    """
+    Add an email to the outbox, with the same arguments as send_mail.
+
+    The email is saved in the current transaction, so it is only sent if the
+    transaction is committed.
+    """
+    return QueuedEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or "",
+        from_email=from_email,
+        recipient_list=list(recipient_list),
+    )
+
+
+def send_queued_emails(batch_size=100, max_attempts=None):
+    """
+    Send the queued emails that are due over a single connection
+
+    Sent emails are removed from the outbox. Failed emails are retried with an
+    exponential backoff until max_attempts is reached, after which they are
+    left in the outbox for inspection. Concurrent workers skip the emails
+    locked by each other. Returns the numbers of sent and failed emails.
+    """
+    if max_attempts is None:
+        max_attempts = settings.NOTIFICATION_EMAIL_MAX_ATTEMPTS
+    n_sent = n_failed = 0
+    connection = get_connection()
+    try:
+        while True:
+            with transaction.atomic():
+                now = timezone.now()
+                emails = list(
+                    QueuedEmail.objects.select_for_update(skip_locked=True)
+                    .filter(next_attempt_time__lte=now, attempts__lt=max_attempts)
+                    .order_by("next_attempt_time", "id")[:batch_size]
+                )
+                if not emails:
+                    break
+                sent_ids = []
+                failed = []
+                for email in emails:
+                    try:
+                        connection.open()
+                        connection.send_messages([email.get_message(connection)])
+                    except Exception as e:
+                        logger.error(e, exc_info=True, extra={"email": email.pk})
+                        # start over with a fresh connection
+                        connection.close()
+                        email.attempts += 1
+                        email.next_attempt_time = now + timedelta(
+                            seconds=settings.NOTIFICATION_EMAIL_RETRY_DELAY
+                            * 2 ** (email.attempts - 1)
+                        )
+                        email.last_error = str(e)
+                        failed.append(email)
+                    else:
+                        sent_ids.append(email.pk)
+                QueuedEmail.objects.filter(pk__in=sent_ids).delete()
+                QueuedEmail.objects.bulk_update(
+                    failed, ["attempts", "next_attempt_time", "last_error"]
+                )
+                n_sent += len(sent_ids)
+                n_failed += len(failed)
+    finally:
+        connection.close()
+    return n_sent, n_failed
@@ -1,14 +1,20 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 import pytz
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
 from django.utils import timezone
 from django.utils.translation import activate
 
 from notifications.models import (
     NotificationTemplate,
     NotificationType,
+    queue_email,
+    QueuedEmail,
     render_notification_template,
+    send_queued_emails,
 )
 
 
@@ -123,3 +129,55 @@ def test_notification_template_format_datetime(notification_template):
 
     rendered = render_notification_template(NotificationType.TEST, context, "en")
     assert rendered["body"] == "22 Feb 2020 at 14:00"
+
+
+@pytest.mark.django_db
+def test_queued_email_is_sent_by_command():
+    queue_email(
+        "subject", "body", "noreply@example.com", ["a@example.com"], "<b>body</b>"
+    )
+    assert len(mail.outbox) == 0
+
+    call_command("send_queued_emails")
+
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].subject == "subject"
+    assert mail.outbox[0].to == ["a@example.com"]
+    assert mail.outbox[0].alternatives == [("<b>body</b>", "text/html")]
+    assert not QueuedEmail.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_queued_email_is_retried_with_backoff(settings, monkeypatch):
+    settings.NOTIFICATION_EMAIL_RETRY_DELAY = 60
+    settings.NOTIFICATION_EMAIL_MAX_ATTEMPTS = 2
+    queue_email("failing", "body", "noreply@example.com", ["a@example.com"])
+    queue_email("working", "body", "noreply@example.com", ["b@example.com"])
+
+    def send_messages(self, messages):
+        if messages[0].subject == "failing":
+            raise ConnectionError("connection refused")
+        return send_messages.original(self, messages)
+
+    send_messages.original = EmailBackend.send_messages
+    monkeypatch.setattr(EmailBackend, "send_messages", send_messages)
+
+    assert send_queued_emails() == (1, 1)
+    email = QueuedEmail.objects.get()
+    assert email.attempts == 1
+    assert email.last_error == "connection refused"
+    assert [message.subject for message in mail.outbox] == ["working"]
+
+    # not due yet
+    assert send_queued_emails() == (0, 0)
+
+    QueuedEmail.objects.update(next_attempt_time=timezone.now())
+    now = timezone.now()
+    assert send_queued_emails() == (0, 1)
+    email.refresh_from_db()
+    assert email.attempts == 2
+    assert email.next_attempt_time >= now + timedelta(seconds=120)
+
+    # given up after the maximum number of attempts
+    QueuedEmail.objects.update(next_attempt_time=timezone.now())
+    assert send_queued_emails() == (0, 0)
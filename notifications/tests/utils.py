@@ -1,5 +1,7 @@
 from django.core import mail
 
+from notifications.models import send_queued_emails
+
 
 def _mail_exists(subject, to, strings, html_body):
     for mail_instance in mail.outbox:
@@ -22,6 +24,7 @@ def _mail_exists(subject, to, strings, html_body):
 def check_received_mail_exists(subject, to, strings, clear_outbox=True, html_body=None):
     if not (isinstance(strings, list) or isinstance(strings, tuple)):
         strings = (strings,)
+    send_queued_emails()
     assert len(mail.outbox) >= 1, "No mails sent"
     assert _mail_exists(subject, to, strings, html_body)
     if clear_outbox:
@@ -2,10 +2,9 @@ from datetime import datetime, timedelta
 from uuid import UUID
 
 import pytz
-from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from django.contrib.gis.db import models
-from django.db.models import ProtectedError, Q, Sum
+from django.db import transaction
+from django.db.models import ProtectedError, Q
 from django.utils.translation import gettext as _
 from rest_framework import mixins, serializers, status, viewsets
 from rest_framework.decorators import action
@@ -28,6 +27,7 @@ from events.permissions import (
     GuestPost,
 )
 from linkedevents.registry import register_view
+from registrations.capacity import create_reservation, lock_registration
 from registrations.exceptions import ConflictException
 from registrations.models import Registration, SeatReservationCode, SignUp
 from registrations.serializers import SeatReservationCodeSerializer, SignUpSerializer
@@ -200,61 +200,32 @@ class RegistrationViewSet(
         return registrations
 
     @action(methods=["post"], detail=True, permission_classes=[GuestPost])
+    @transaction.atomic
     def reserve_seats(self, request, pk=None, version=None):
-        def none_to_unlim(val):
-            # Null value in the waiting_list_capacity or maximum_attendee_capacity
-            # signifies that the amount of seats is unlimited
-            if val is None:
-                return 10000
-            else:
-                return val
-
         try:
-            registration = Registration.objects.get(id=pk)
+            registration = lock_registration(pk)
         except Registration.DoesNotExist:
             raise NotFound(detail=f"Registration {pk} doesn't exist.", code=404)
         waitlist = request.data.get("waitlist", False)
-        if waitlist:
-            waitlist_seats = none_to_unlim(registration.waiting_list_capacity)
-        else:
-            waitlist_seats = 0  # if waitlist is False, waiting list is not to be used
-
-        maximum_attendee_capacity = none_to_unlim(
-            registration.maximum_attendee_capacity
+        reserved = create_reservation(
+            registration, request.data.get("seats", 0), waitlist
         )
 
-        seats_capacity = maximum_attendee_capacity + waitlist_seats
-        seats_reserved = registration.reservations.filter(
-            timestamp__gte=datetime.now()
-            - timedelta(minutes=settings.SEAT_RESERVATION_DURATION)
-        ).aggregate(seats_sum=(Sum("seats", output_field=models.FloatField())))[
-            "seats_sum"
-        ]
-        if seats_reserved is None:
-            seats_reserved = 0
-        seats_taken = registration.signups.count()
-        seats_available = seats_capacity - (seats_reserved + seats_taken)
-
-        if request.data.get("seats", 0) > seats_available:
+        if reserved is None:
             return Response(
                 status=status.HTTP_409_CONFLICT, data="Not enough seats available."
             )
         else:
-            code = SeatReservationCode()
-            code.registration = registration
-            code.seats = request.data.get("seats")
-            free_seats = maximum_attendee_capacity - registration.signups.count()
-            code.save()
+            code, seats_at_event = reserved
             data = SeatReservationCodeSerializer(code).data
-            data["seats_at_event"] = (
-                min(free_seats, code.seats) if free_seats > 0 else 0
-            )
+            data["seats_at_event"] = seats_at_event
             waitlist_spots = code.seats - data["seats_at_event"]
             data["waitlist_spots"] = waitlist_spots if waitlist_spots else 0
 
             return Response(data, status=status.HTTP_201_CREATED)
 
     @action(methods=["post"], detail=True, permission_classes=[GuestPost])
+    @transaction.atomic
     def signup(self, request, pk=None, version=None):
         attending = []
         waitlisted = []
@@ -263,8 +234,14 @@ class RegistrationViewSet(
                 {"registration": "Reservation code is missing"}
             )
 
+        # lock the registration before the reservation like reserve_seats does
         try:
-            reservation = SeatReservationCode.objects.get(
+            lock_registration(pk)
+        except (Registration.DoesNotExist, ValueError):
+            pass
+        try:
+            # the code can only be used once by concurrent requests
+            reservation = SeatReservationCode.objects.select_for_update().get(
                 code=request.data["reservation_code"]
             )
         except SeatReservationCode.DoesNotExist:
@@ -290,15 +267,17 @@ class RegistrationViewSet(
             i["registration"] = pk
 
         # First check that all the signups are valid and then actually create them
-        for i in request.data["signups"]:
-            serializer = SignUpSerializer(data=i)
-            if not serializer.is_valid():
-                raise serializers.ValidationError(serializer.errors)
+        serializer = SignUpSerializer(data=request.data["signups"], many=True)
+        if not serializer.is_valid():
+            errors = serializer.errors
+            if isinstance(errors, list):
+                # the errors of the first invalid signup, as before
+                errors = next(
+                    signup_errors for signup_errors in errors if signup_errors
+                )
+            raise serializers.ValidationError(errors)
 
-        for i in request.data["signups"]:
-            signup = SignUpSerializer(data=i, many=False)
-            signup.is_valid()
-            signee = signup.create(validated_data=signup.validated_data)
+        for signee in serializer.save():
             if signee.attendee_status == SignUp.AttendeeStatus.ATTENDING:
                 attending.append({"id": signee.id, "name": signee.name})
             else:
@@ -0,0 +1,110 @@
+"""
+Seat capacity of registrations.
+
+Reserving seats and signing up both lock the registration row with
+SELECT ... FOR UPDATE before counting the seats taken, so that concurrent
+requests for the same registration are serialized and cannot exceed its
+capacity. The functions taking a registration expect it to be locked with
+lock_registration in the current transaction, so that its signup counts are
+up to date.
+"""
+from typing import NamedTuple
+
+from django.db.models import Sum
+
+from registrations.models import Registration, SeatReservationCode, SignUp
+
+# Null maximum_attendee_capacity or waiting_list_capacity means unlimited seats
+UNLIMITED_SEATS = 10000
+
+
+class SeatCounts(NamedTuple):
+    attending: int
+    waitlisted: int
+    reserved: int
+
+    @property
+    def signups(self):
+        return self.attending + self.waitlisted
+
+
+def _capacity(value):
+    return UNLIMITED_SEATS if value is None else value
+
+
+def lock_registration(registration_id):
+    """Lock the registration for the rest of the transaction and return it"""
+    return Registration.objects.select_for_update().get(id=registration_id)
+
+
+def get_seat_counts(registration):
+    """
+    Return the attending and waitlisted signups of the registration, and the
+    seats held by its unexpired reservations.
+    """
+    reserved = (
+        SeatReservationCode.objects.live()
+        .filter(registration=registration)
+        .aggregate(seats=Sum("seats"))["seats"]
+    )
+    return SeatCounts(
+        registration.current_attendee_count,
+        registration.current_waiting_list_count,
+        reserved or 0,
+    )
+
+
+def create_reservation(registration, seats, waitlist=False):
+    """
+    Reserve seats from the registration, using its waiting list if allowed.
+
+    Returns the reservation and the number of its seats that are at the event
+    rather than on the waiting list, or None if there are not enough seats.
+    """
+    counts = get_seat_counts(registration)
+    attendee_capacity = _capacity(registration.maximum_attendee_capacity)
+    capacity = attendee_capacity
+    if waitlist:
+        capacity += _capacity(registration.waiting_list_capacity)
+    if seats > capacity - counts.reserved - counts.signups:
+        return None
+
+    reservation = SeatReservationCode.objects.create(
+        registration=registration, seats=seats
+    )
+    free_seats = attendee_capacity - counts.signups
+    return reservation, max(min(free_seats, seats), 0)
+
+
+def get_attendee_statuses(registration, n_signups):
+    """
+    Return the statuses of new signups to the registration in signup order,
+    with None for the signups that fit neither the event nor its waiting list.
+    """
+    counts = get_seat_counts(registration)
+    result = []
+    for status, capacity, taken in (
+        (
+            SignUp.AttendeeStatus.ATTENDING,
+            registration.maximum_attendee_capacity,
+            counts.attending,
+        ),
+        (
+            SignUp.AttendeeStatus.WAITING_LIST,
+            registration.waiting_list_capacity,
+            counts.waitlisted,
+        ),
+    ):
+        n_seats = n_signups - len(result)
+        if capacity is not None:
+            n_seats = min(max(capacity - taken, 0), n_seats)
+        result += [status] * n_seats
+    return result + [None] * (n_signups - len(result))
+
+
+def get_attendee_status(registration):
+    """
+    Return the status of a new signup to the registration, or None if both the
+    event and its waiting list are full.
+    """
+    return get_attendee_statuses(registration, 1)[0]
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management import BaseCommand
+
+from registrations.models import SeatReservationCode
+
+
+class Command(BaseCommand):
+    help = "Delete the seat reservations that can no longer be used to sign up"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of reservations deleted in one query",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Keep running and delete the expired reservations every INTERVAL seconds",
+        )
+
+    def delete_expired(self, batch_size):
+        n_deleted = 0
+        while True:
+            ids = list(
+                SeatReservationCode.objects.expired().values_list("id", flat=True)[
+                    :batch_size
+                ]
+            )
+            if not ids:
+                return n_deleted
+            n_deleted += SeatReservationCode.objects.filter(id__in=ids).delete()[0]
+
+    def handle(self, batch_size, interval, **kwargs):
+        while True:
+            n_deleted = self.delete_expired(batch_size)
+            if n_deleted or interval is None:
+                self.stdout.write("Deleted %s expired reservations." % n_deleted)
+            if interval is None:
+                break
+            time.sleep(interval)
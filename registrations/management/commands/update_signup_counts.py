@@ -0,0 +1,24 @@
+from django.core.management import BaseCommand
+
+from events.response_cache import bump_generation
+from registrations.models import Registration
+
+
+class Command(BaseCommand):
+    help = "Recompute the attendee and waiting list counts of registrations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "registration_ids",
+            nargs="*",
+            type=int,
+            help="Registrations to update, all registrations by default",
+        )
+
+    def handle(self, registration_ids, **kwargs):
+        registrations = Registration.objects.all()
+        if registration_ids:
+            registrations = registrations.filter(id__in=registration_ids)
+        n_updated = registrations.update_signup_counts()
+        bump_generation("registration")
+        self.stdout.write("Updated the signup counts of %s registrations." % n_updated)
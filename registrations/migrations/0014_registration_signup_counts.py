@@ -0,0 +1,48 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_signup_counts(apps, schema_editor):
+    Registration = apps.get_model("registrations", "Registration")
+    SignUp = apps.get_model("registrations", "SignUp")
+    counts = {}
+    for field, attendee_status in (
+        ("current_attendee_count", "attending"),
+        ("current_waiting_list_count", "waitlisted"),
+    ):
+        signups = (
+            SignUp.objects.filter(
+                registration=models.OuterRef("pk"), attendee_status=attendee_status
+            )
+            .order_by()
+            .values("registration")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        counts[field] = Coalesce(models.Subquery(signups), 0)
+    Registration.objects.update(**counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrations", "0013_alter_signup_registration"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="registration",
+            name="current_attendee_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Current attendee count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="registration",
+            name="current_waiting_list_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Current waiting list count"
+            ),
+        ),
+        migrations.RunPython(populate_signup_counts, migrations.RunPython.noop),
+    ]
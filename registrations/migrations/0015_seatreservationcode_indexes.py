@@ -0,0 +1,37 @@
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("registrations", "0014_registration_signup_counts"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="seatreservationcode",
+            name="code",
+            field=models.UUIDField(
+                db_index=True,
+                default=uuid.uuid4,
+                editable=False,
+                verbose_name="Seat reservation code",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="seatreservationcode",
+            name="timestamp",
+            field=models.DateTimeField(
+                auto_now_add=True, blank=True, db_index=True, verbose_name="Timestamp"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seatreservationcode",
+            index=models.Index(
+                fields=["registration", "timestamp"],
+                name="registratio_registr_13ba19_idx",
+            ),
+        ),
+    ]
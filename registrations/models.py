@@ -1,16 +1,20 @@
-from smtplib import SMTPException
+from datetime import timedelta
 from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.sites.models import Site
-from django.core.mail import send_mail
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.forms.fields import MultipleChoiceField
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from events.models import Event, Language
+from notifications.models import queue_email
 
 User = settings.AUTH_USER_MODEL
 
@@ -52,6 +56,24 @@ class ChoiceArrayField(ArrayField):
         )
 
 
+class RegistrationQuerySet(models.QuerySet):
+    def update_signup_counts(self):
+        """Recompute the signup counts of the registrations from their signups"""
+        counts = {}
+        for field, attendee_status in SIGNUP_COUNT_FIELDS.items():
+            signups = (
+                SignUp.objects.filter(
+                    registration=models.OuterRef("pk"), attendee_status=attendee_status
+                )
+                .order_by()
+                .values("registration")
+                .annotate(count=models.Count("id"))
+                .values("count")
+            )
+            counts[field] = Coalesce(models.Subquery(signups), 0)
+        return self.update(**counts)
+
+
 class Registration(models.Model):
     event = models.OneToOneField(
         Event,
@@ -123,6 +145,26 @@ class Registration(models.Model):
         verbose_name=_("Mandatory fields"),
     )
 
+    # maintained from the signups, see RegistrationQuerySet.update_signup_counts
+    current_attendee_count = models.PositiveIntegerField(
+        verbose_name=_("Current attendee count"), default=0, editable=False
+    )
+    current_waiting_list_count = models.PositiveIntegerField(
+        verbose_name=_("Current waiting list count"), default=0, editable=False
+    )
+
+    objects = RegistrationQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # never overwrite the signup counts with the values loaded earlier
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in SIGNUP_COUNT_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
     @property
     def data_source(self):
         return self.event.data_source
@@ -297,16 +339,55 @@ class SignUp(models.Model):
             % {"event_name": self.registration.event.name},
         }
 
-        try:
-            send_mail(
-                confirmation_subjects[confirmation_type],
-                rendered_body,
-                f"letest@{Site.objects.get_current().domain}",
-                [self.email],
-                html_message=rendered_body,
+        queue_email(
+            confirmation_subjects[confirmation_type],
+            rendered_body,
+            f"letest@{Site.objects.get_current().domain}",
+            [self.email],
+            html_message=rendered_body,
+        )
+
+
+SIGNUP_COUNT_FIELDS = {
+    "current_attendee_count": SignUp.AttendeeStatus.ATTENDING,
+    "current_waiting_list_count": SignUp.AttendeeStatus.WAITING_LIST,
+}
+
+
+@receiver(post_save, sender=SignUp)
+@receiver(post_delete, sender=SignUp)
+def update_registration_signup_counts(sender, instance, **kwargs):
+    Registration.objects.filter(id=instance.registration_id).update_signup_counts()
+
+
+class SeatReservationCodeQuerySet(models.QuerySet):
+    def live(self):
+        """Reservations whose seats are still held from other reservations"""
+        return self.filter(
+            timestamp__gte=timezone.now()
+            - timedelta(minutes=settings.SEAT_RESERVATION_DURATION)
+        )
+
+    def expired(self):
+        """Reservations that can no longer be used to sign up"""
+        # the validity grows with the number of seats, see code_validity_duration
+        seats_duration = models.ExpressionWrapper(
+            models.F("seats") * timedelta(minutes=1),
+            output_field=models.DurationField(),
+        )
+        validity_start = timezone.now() - timedelta(
+            minutes=settings.SEAT_RESERVATION_DURATION
+        )
+        return (
+            self.filter(timestamp__lt=validity_start)
+            .annotate(
+                validity_end=models.ExpressionWrapper(
+                    models.F("timestamp") + seats_duration,
+                    output_field=models.DateTimeField(),
+                )
             )
-        except SMTPException:
-            pass
+            .filter(validity_end__lt=validity_start)
+        )
 
 
 class SeatReservationCode(models.Model):
@@ -317,8 +398,16 @@ class SeatReservationCode(models.Model):
         Registration, on_delete=models.CASCADE, null=False, related_name="reservations"
     )
     code = models.UUIDField(
-        verbose_name=_("Seat reservation code"), default=uuid4, editable=False
+        verbose_name=_("Seat reservation code"),
+        default=uuid4,
+        editable=False,
+        db_index=True,
     )
     timestamp = models.DateTimeField(
-        verbose_name=_("Timestamp"), auto_now_add=True, blank=True
+        verbose_name=_("Timestamp"), auto_now_add=True, blank=True, db_index=True
     )
+
+    objects = SeatReservationCodeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["registration", "timestamp"])]
@@ -2,44 +2,76 @@ from datetime import timedelta
 
 import pytz
 from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
 from django.utils.timezone import localdate
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied as DRFPermissionDenied
 from rest_framework.fields import DateTimeField
 
+from events.response_cache import bump_generation
+from registrations.capacity import (
+    get_attendee_status,
+    get_attendee_statuses,
+    lock_registration,
+)
 from registrations.models import Registration, SeatReservationCode, SignUp
 from registrations.utils import code_validity_duration
 
 
+class SignUpListSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        """
+        Create the signups with one insert, locking and counting the seats of
+        each registration once.
+        """
+        signups = []
+        with transaction.atomic():
+            for registration_id in sorted(
+                {data["registration"].id for data in validated_data}
+            ):
+                registration = lock_registration(registration_id)
+                registration_data = [
+                    data
+                    for data in validated_data
+                    if data["registration"].id == registration_id
+                ]
+                statuses = get_attendee_statuses(registration, len(registration_data))
+                if None in statuses:
+                    raise DRFPermissionDenied(_("The waiting list is already full"))
+                signups += [
+                    SignUp(
+                        **dict(data, registration=registration, attendee_status=status)
+                    )
+                    for data, status in zip(registration_data, statuses)
+                ]
+            signups = SignUp.objects.bulk_create(signups)
+            # bulk_create does not send the signals maintaining the signup counts
+            # and invalidating the cached responses
+            Registration.objects.filter(
+                id__in={signup.registration_id for signup in signups}
+            ).update_signup_counts()
+            bump_generation("registration")
+            for signup in signups:
+                if signup.attendee_status == SignUp.AttendeeStatus.ATTENDING:
+                    signup.send_notification("confirmation")
+        return signups
+
+
 class SignUpSerializer(serializers.ModelSerializer):
     view_name = "signup"
 
     def create(self, validated_data):
-        registration = validated_data["registration"]
-        already_attending = SignUp.objects.filter(
-            registration=registration, attendee_status=SignUp.AttendeeStatus.ATTENDING
-        ).count()
-        already_waitlisted = SignUp.objects.filter(
-            registration=registration,
-            attendee_status=SignUp.AttendeeStatus.WAITING_LIST,
-        ).count()
-        attendee_capacity = registration.maximum_attendee_capacity
-        waiting_list_capacity = registration.waiting_list_capacity
-
-        if (attendee_capacity is None) or (already_attending < attendee_capacity):
-            signup = super().create(validated_data)
-            signup.send_notification("confirmation")
-            return signup
-        elif (waiting_list_capacity is None) or (
-            already_waitlisted < waiting_list_capacity
-        ):
+        with transaction.atomic():
+            registration = lock_registration(validated_data["registration"].id)
+            attendee_status = get_attendee_status(registration)
+            if attendee_status is None:
+                raise DRFPermissionDenied(_("The waiting list is already full"))
+            validated_data["attendee_status"] = attendee_status
             signup = super().create(validated_data)
-            signup.attendee_status = SignUp.AttendeeStatus.WAITING_LIST
-            signup.save()
-            return signup
-        else:
-            raise DRFPermissionDenied(_("The waiting list is already full"))
+            if attendee_status == SignUp.AttendeeStatus.ATTENDING:
+                signup.send_notification("confirmation")
+        return signup
 
     def validate(self, data):
         errors = {}
@@ -87,6 +119,7 @@ class SignUpSerializer(serializers.ModelSerializer):
     class Meta:
         fields = "__all__"
         model = SignUp
+        list_serializer_class = SignUpListSerializer
 
 
 # Don't use this serializer directly but use events.api.RegistrationSerializer instead.
@@ -96,10 +129,6 @@ class RegistrationBaseSerializer(serializers.ModelSerializer):
 
     signups = serializers.SerializerMethodField()
 
-    current_attendee_count = serializers.SerializerMethodField()
-
-    current_waiting_list_count = serializers.SerializerMethodField()
-
     data_source = serializers.SerializerMethodField()
 
     publisher = serializers.SerializerMethodField()
@@ -133,16 +162,6 @@ class RegistrationBaseSerializer(serializers.ModelSerializer):
         else:
             return None
 
-    def get_current_attendee_count(self, obj):
-        return obj.signups.filter(
-            attendee_status=SignUp.AttendeeStatus.ATTENDING
-        ).count()
-
-    def get_current_waiting_list_count(self, obj):
-        return obj.signups.filter(
-            attendee_status=SignUp.AttendeeStatus.WAITING_LIST
-        ).count()
-
     def get_data_source(self, obj):
         return obj.data_source.id
 
@@ -0,0 +1,110 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+
+from registrations.capacity import create_reservation, lock_registration
+from registrations.models import SeatReservationCode, SignUp
+from registrations.serializers import SignUpSerializer
+
+N_THREADS = 20
+
+
+def run_concurrently(target, n_threads=N_THREADS):
+    """Run target(i) in threads released at the same time, each with its own connection"""
+    barrier = threading.Barrier(n_threads)
+    results = [None] * n_threads
+
+    def run(i):
+        try:
+            barrier.wait()
+            results[i] = target(i)
+        except Exception as e:
+            results[i] = e
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_reservations_do_not_exceed_capacity(registration):
+    registration.maximum_attendee_capacity = 3
+    registration.waiting_list_capacity = 2
+    registration.save()
+
+    def reserve(i):
+        with transaction.atomic():
+            return create_reservation(
+                lock_registration(registration.id), 1, waitlist=True
+            )
+
+    results = run_concurrently(reserve)
+
+    assert not [result for result in results if isinstance(result, Exception)]
+    assert len([result for result in results if result is not None]) == 5
+    assert SeatReservationCode.objects.aggregate(seats=Sum("seats"))["seats"] == 5
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_signups_do_not_exceed_capacity(registration):
+    registration.maximum_attendee_capacity = 3
+    registration.waiting_list_capacity = 2
+    registration.save()
+    date_of_birth = date(date.today().year - 10, 1, 1).isoformat()
+
+    def sign_up(i):
+        serializer = SignUpSerializer(
+            data={
+                "registration": registration.id,
+                "name": f"Participant {i}",
+                "email": f"participant{i}@example.com",
+                "date_of_birth": date_of_birth,
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    results = run_concurrently(sign_up)
+
+    assert len([r for r in results if isinstance(r, PermissionDenied)]) == 15
+    signups = SignUp.objects.filter(registration=registration)
+    assert signups.filter(attendee_status=SignUp.AttendeeStatus.ATTENDING).count() == 3
+    assert (
+        signups.filter(attendee_status=SignUp.AttendeeStatus.WAITING_LIST).count() == 2
+    )
+
+
+def create_reservation_at(registration, seats, minutes_ago):
+    reservation = SeatReservationCode.objects.create(
+        registration=registration, seats=seats
+    )
+    SeatReservationCode.objects.filter(id=reservation.id).update(
+        timestamp=timezone.now() - timedelta(minutes=minutes_ago)
+    )
+    return reservation
+
+
+@pytest.mark.django_db
+def test_delete_expired_reservations(registration, settings):
+    settings.SEAT_RESERVATION_DURATION = 15
+    live = create_reservation_at(registration, 1, 5)
+    # still valid for signing up thanks to the extra minute per seat
+    valid = create_reservation_at(registration, 10, 20)
+    create_reservation_at(registration, 1, 20)
+    create_reservation_at(registration, 10, 30)
+
+    call_command("delete_expired_reservations", batch_size=1)
+
+    assert set(SeatReservationCode.objects.all()) == {live, valid}
+    assert list(SeatReservationCode.objects.live()) == [live]
@@ -1,9 +1,10 @@
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from django_orghierarchy.models import Organization
 
 from events.models import DataSource, Event
-from registrations.models import Registration
+from registrations.models import Registration, SignUp
 
 
 class TestRegistration(TestCase):
@@ -54,3 +55,38 @@ class TestRegistration(TestCase):
 
         can_be_edited = self.registration.can_be_edited_by(self.user)
         self.assertTrue(can_be_edited)
+
+    def assert_signup_counts(self, attending, waitlisted):
+        self.registration.refresh_from_db()
+        self.assertEqual(self.registration.current_attendee_count, attending)
+        self.assertEqual(self.registration.current_waiting_list_count, waitlisted)
+
+    def test_signup_counts_follow_signups(self):
+        signup = SignUp.objects.create(registration=self.registration)
+        SignUp.objects.create(
+            registration=self.registration,
+            attendee_status=SignUp.AttendeeStatus.WAITING_LIST,
+        )
+        self.assert_signup_counts(1, 1)
+
+        signup.attendee_status = SignUp.AttendeeStatus.WAITING_LIST
+        signup.save()
+        self.assert_signup_counts(0, 2)
+
+        signup.delete()
+        self.assert_signup_counts(0, 1)
+
+    def test_save_does_not_overwrite_signup_counts(self):
+        registration = Registration.objects.get(id=self.registration.id)
+        SignUp.objects.create(registration=self.registration)
+
+        registration.maximum_attendee_capacity = 10
+        registration.save()
+        self.assert_signup_counts(1, 0)
+
+    def test_update_signup_counts_command(self):
+        SignUp.objects.create(registration=self.registration)
+        Registration.objects.update(current_attendee_count=5)
+
+        call_command("update_signup_counts")
+        self.assert_signup_counts(1, 0)
@@ -11,7 +11,13 @@ from rest_framework import status
 from events.models import Event
 from events.tests.utils import versioned_reverse as reverse
 from helevents.tests.factories import UserFactory
-from registrations.models import MandatoryFields, Registration, SignUp
+from notifications.models import send_queued_emails
+from registrations.models import (
+    MandatoryFields,
+    Registration,
+    SeatReservationCode,
+    SignUp,
+)
 
 
 def sign_up(api_client, registration_id, sign_up_data):
@@ -445,6 +451,7 @@ def test_email_sent_on_successful_signup(api_client, registration):
     assert response.status_code == status.HTTP_201_CREATED
     assert sign_up_data["name"] in response.data["attending"]["people"][0]["name"]
     #  assert that the email was sent
+    send_queued_emails()
     assert len(mail.outbox) == 1
 
 
@@ -815,6 +822,48 @@ def test_group_signup_successful_with_waitlist(api_client, registration):
     assert registration.signups.count() == 2
 
 
+@pytest.mark.django_db
+def test_group_signup_fills_event_then_waitlist(api_client, registration):
+    reservation_url = reverse(
+        "registration-reserve-seats", kwargs={"pk": registration.id}
+    )
+    signup_url = reverse("registration-signup", kwargs={"pk": registration.id})
+    registration.maximum_attendee_capacity = 3
+    registration.waiting_list_capacity = 2
+    registration.save()
+    payload = {"seats": 5, "waitlist": True}
+    response = api_client.post(reservation_url, payload, format="json")
+    sign_up_payload = {
+        "reservation_code": response.data["code"],
+        "signups": [
+            {
+                "name": f"Pupil {i}",
+                "date_of_birth": "2011-04-07",
+                "email": f"pupil{i}@test.com",
+            }
+            for i in range(5)
+        ],
+    }
+
+    response = api_client.post(signup_url, sign_up_payload, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["attending"]["count"] == 3
+    assert response.data["waitlisted"]["count"] == 2
+    assert [person["name"] for person in response.data["attending"]["people"]] == [
+        "Pupil 0",
+        "Pupil 1",
+        "Pupil 2",
+    ]
+    assert not SeatReservationCode.objects.filter(registration=registration).exists()
+    # only the attending signups are sent a confirmation
+    send_queued_emails()
+    assert sorted(message.to[0] for message in mail.outbox) == [
+        "pupil0@test.com",
+        "pupil1@test.com",
+        "pupil2@test.com",
+    ]
+
+
 @pytest.mark.django_db
 def test_seat_reservation_without_code():
     pass